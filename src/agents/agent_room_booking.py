@@ -1,6 +1,10 @@
+import re
 from owlready2 import *
-from ontology.dei_department import *
+from ontology.dei_department import save
 from datetime import datetime, timedelta, time
+from instrumentation import instrumented
+from schedulers import allocator, slot_search
+from ontology.snapshot import Snapshot, weekdays
 
 class BookingAgent:
     def __init__(self, ontology):
@@ -26,6 +30,7 @@ class BookingAgent:
 
         return True, "Success"
 
+    @instrumented("booking.get_available_rooms")
     def get_available_rooms(self, capacity_needed, start_t, end_t, needs_projector=False):
         """Searches for the smallest suitable room within DEI constraints."""
         all_rooms = list(self.onto.Room.instances())
@@ -47,8 +52,16 @@ class BookingAgent:
         available.sort(key=lambda x: x.has_capacity)
         return available
     
-    def get_available_slots_in_interval(self, capacity, start_date, end_date, start_hour, num_hours, needs_proj):
-        """Returns a list of (date, room) tuples that are available."""
+    @instrumented("booking.get_available_slots_in_interval")
+    def get_available_slots_in_interval(self, capacity, start_date, end_date, start_hour, num_hours, needs_proj, workers=None):
+        """
+        Returns a list of (date, room) tuples that are available.
+        Long ranges are searched on a snapshot, sharded across worker processes
+        when there is more than one core (workers=1 keeps it in this process).
+        """
+        if len(weekdays(start_date, end_date)) >= slot_search.PARALLEL_MIN_DAYS:
+            return self._parallel_slots(capacity, start_date, end_date, start_hour, num_hours, needs_proj, workers)
+
         available_slots = []
         delta = (end_date - start_date).days
 
@@ -107,6 +120,30 @@ class BookingAgent:
         available_slots.sort(key=lambda x: (x['date'], x["start"], x['room'].has_capacity))
         return available_slots
 
+    @instrumented("booking.parallel_slots")
+    def _parallel_slots(self, capacity, start_date, end_date, start_hour, num_hours, needs_proj, workers):
+        """Search over a snapshot, returned in the format of get_available_slots_in_interval."""
+        snapshot = Snapshot.from_ontology(self.onto)
+        found = slot_search.available_slots(snapshot, capacity, start_date, end_date, start_hour, num_hours, needs_proj, workers)
+        if not found or found[0]["suggestion"]:
+            print("\n[Notice]: Requested time slot is full or invalid. Finding alternative hypotheses...")
+
+        rooms = {}
+        available_slots = []
+        for s in found:
+            if s["room"] not in rooms:
+                rooms[s["room"]] = self.get_room(s["room"])
+            available_slots.append({
+                "date": s["date"],
+                "duration": (s["start"].strftime('%H:%M'), s["end"].strftime('%H:%M')),
+                "room": rooms[s["room"]],
+                "start": s["start"],
+                "end": s["end"],
+                "suggestion": s["suggestion"]
+            })
+        return available_slots
+
+    @instrumented("booking.is_room_busy")
     def _is_room_busy(self, room, start_t, end_t):
         """Conflict check against existing RoomBookings."""
         if room in self.onto.AvailableRoom.instances():
@@ -118,7 +155,14 @@ class BookingAgent:
                 return True
         return False
 
+    @instrumented("booking.create_booking")
     def create_booking(self, prof, room, start_t, end_t, b_type, capacity, needs_proj=False, course=None):
+        new_b = self._build_booking(prof, room, start_t, end_t, b_type, capacity, needs_proj, course)
+        save()
+        return new_b
+
+    def _build_booking(self, prof, room, start_t, end_t, b_type, capacity, needs_proj=False, course=None):
+        """Creates the booking individuals without reasoning or saving."""
         with self.onto:
             b_id = f"Booking_{int(start_t.timestamp())}_{room.name}"
             new_b = self.onto.RoomBooking(b_id)
@@ -136,6 +180,10 @@ class BookingAgent:
                 # Courses always need the projector if the room has one
                 if room.has_equipment:
                     act.requires_equipment = room.has_equipment
+            elif b_type == "Exam":
+                act = self.onto.Exam()
+                if needs_proj and room.has_equipment:
+                    act.requires_equipment = room.has_equipment
             else:
                 act = self.onto.Meeting()
                 # Meetings only link equipment if the teacher explicitly requested it
@@ -145,35 +193,173 @@ class BookingAgent:
             # Universal capacity assignment
             act.required_capacity = capacity
             new_b.for_activity = act
-        save()
         return new_b
+
+    @instrumented("booking.commit_schedule")
+    def commit_schedule(self, schedule, mode, start_date, end_date=None, semester=None, persist=True):
+        """
+        Materializes a planner schedule as RoomBookings with one reasoner run and one save
+        (no save with persist=False: the caller saves once after a batch).
+        Exams: 'DayN' is the N-th day of the epoch starting at start_date.
+        Lectures: 'Mon'..'Fri' repeat every week from start_date to end_date (the semester).
+        Returns (created bookings, skipped items as (item, reason) pairs).
+        """
+        weekdays = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4}
+        rooms = {r.has_name.replace(".", "_").replace(" ", "_").lower(): r for r in self.onto.Room.instances()}
+
+        # Intervals booked by this batch, since the reasoner only runs at the end
+        batch_intervals = {}
+        created = []
+        skipped = []
+
+        for item in schedule:
+            room = rooms.get(item["room"].lower())
+            course = self._find_course(item["course"], semester)
+            if not room:
+                skipped.append((item, f"Room '{item['room']}' does not exist."))
+                continue
+            if not course:
+                skipped.append((item, f"Course '{item['course'].upper()}' does not exist."))
+                continue
+
+            hours = re.match(r"slot_(\d+)_(\d+)", item["slot"].lower())
+            if not hours:
+                skipped.append((item, f"Unknown slot '{item['slot']}'."))
+                continue
+            start_h, end_h = int(hours.group(1)), int(hours.group(2))
+
+            day = item["day"].lower()
+            if mode == "exams":
+                dates = [start_date + timedelta(days=int(day[3:]) - 1)]
+            else:
+                last = end_date or start_date
+                dates = [
+                    start_date + timedelta(days=i) for i in range((last - start_date).days + 1)
+                    if (start_date + timedelta(days=i)).weekday() == weekdays.get(day)
+                ]
+
+            prof = self.onto.search_one(type=self.onto.Teacher, teaches=course)
+            b_type = "Exam" if mode == "exams" else "Course"
+
+            for target_day in dates:
+                dt_start = datetime.combine(target_day, time.min).replace(hour=start_h)
+                dt_end = datetime.combine(target_day, time.min).replace(hour=end_h)
+
+                is_valid, msg = self.validate_time_slots(dt_start, dt_end)
+                if not is_valid:
+                    skipped.append((item, f"{target_day}: {msg}"))
+                    continue
+                booked = batch_intervals.setdefault(room, [])
+                if any(dt_start < e and dt_end > s for s, e in booked) or self._is_room_busy(room, dt_start, dt_end):
+                    skipped.append((item, f"{target_day}: {room.has_name} is already booked."))
+                    continue
+
+                created.append(self._build_booking(prof, room, dt_start, dt_end, b_type,
+                                                   course.required_capacity, False, course))
+                booked.append((dt_start, dt_end))
+
+        if created and persist:
+            save()
+        return created, skipped
+
+    def _find_course(self, name, semester=None):
+        """Finds a course by its code, preferring the given semester when there are several."""
+        courses = self.onto.search(type=self.onto.Course, has_name=name.upper())
+        if semester is not None:
+            for c in courses:
+                if c.has_semester == semester:
+                    return c
+        return courses[0] if courses else None
     
     
     # Helper Functions to interact with ontology
 
 
+    @instrumented("booking.allocate_batch")
+    def allocate_batch(self, requests, timeout=5, persist=True):
+        """
+        Books many requests together (schedulers/allocator.py): most requests
+        satisfied, then fewest wasted seats, against one snapshot of the rooms
+        and bookings, with one reasoner run and one save (none with persist=False).
+        Requests: [{"prof", "course" (or None), "capacity", "projector", "date",
+        "end_date", "hour", "to_hour", "hours"}].
+        Returns (created [(request, booking)], unassigned requests, allocation result).
+        """
+        rooms = {}
+        for r in self.onto.Room.instances():
+            working = bool(r.has_equipment) and not any(eq.is_broken for eq in r.has_equipment)
+            rooms[r.has_name] = (r, {"name": r.has_name, "capacity": r.has_capacity or 0, "projector": working})
+
+        busy = {}
+        for b in self.onto.RoomBooking.instances():
+            if b.booked_in_room and b.has_start_time and b.has_end_time:
+                busy.setdefault(b.booked_in_room.has_name, []).append((b.has_start_time, b.has_end_time))
+
+        result = allocator.allocate(requests, [spec for _, spec in rooms.values()], busy, timeout)
+
+        created = []
+        for index, (room_name, start_t, end_t) in sorted(result["assigned"].items()):
+            req = requests[index]
+            b_type = "Course" if req.get("course") else "Meeting"
+            booking = self._build_booking(req["prof"], rooms[room_name][0], start_t, end_t, b_type,
+                                          req["capacity"], req.get("projector", False), req.get("course"))
+            created.append((req, booking))
+        if created and persist:
+            save()
+        return created, [requests[i] for i in result["unassigned"]], result
+
+    @instrumented("booking.find_overbooked")
+    def find_overbooked(self):
+        """
+        Returns [(room, [(booking1, booking2), ...])] for every room with overlapping bookings.
+        Rooms with bookings (the OverBookedRoom class) are found by grouping the bookings,
+        so the report does not depend on the reasoner having run.
+        """
+        bookings_by_room = {}
+        for b in self.onto.RoomBooking.instances():
+            if b.booked_in_room is not None:
+                bookings_by_room.setdefault(b.booked_in_room, []).append(b)
+
+        report = []
+        for room, bookings in bookings_by_room.items():
+            # Sort bookings by start time for easier comparison
+            bookings.sort(key=lambda x: x.has_start_time)
+
+            # Compare every pair of bookings in the room to find overlaps
+            # Overlap logic: (Start1 < End2) AND (Start2 < End1)
+            room_conflicts = []
+            for i in range(len(bookings)):
+                for j in range(i + 1, len(bookings)):
+                    b1 = bookings[i]
+                    b2 = bookings[j]
+                    if (b1.has_start_time < b2.has_end_time) and (b2.has_start_time < b1.has_end_time):
+                        room_conflicts.append((b1, b2))
+            if room_conflicts:
+                report.append((room, room_conflicts))
+        return report
+
     def get_room(self, name):
-        return self.onto.search_one(type=Room, has_name=name)
+        return self.onto.search_one(type=self.onto.Room, has_name=name)
 
     def get_person_by_id(self, id_num):
         return self.onto.search_one(has_id=id_num)
 
     def get_maintenance_books(self):
-        return self.onto.search(type=RoomBooking, has_name="Maintenance")
+        return self.onto.search(type=self.onto.RoomBooking, has_name="Maintenance")
 
     def get_class_by_name(self, class_name, ac_year):
-        return self.onto.search_one(type=AcademicClass, has_name=class_name, has_year=ac_year)
+        return self.onto.search_one(type=self.onto.AcademicClass, has_name=class_name, has_year=ac_year)
 
     def add_room(self, name, capacity, has_proj):
         if self.get_room(name):
             return False, f"Error: Room '{name}' already exists."
         with self.onto:
-            r = Room(name.replace(" ", "_"))
+            r = self.onto.Room(name.replace(" ", "_"))
             r.has_name = name
             r.has_capacity = capacity
             if has_proj:
                 # Create a unique projector instance for this specific room
-                proj = Equipment(f"Projector_{r.name}")
+                proj = self.onto.Equipment(f"Projector_{r.name}")
                 proj.has_name = f"Projector {name}"
                 proj.is_broken = False
                 r.has_equipment = [proj]
@@ -185,11 +371,11 @@ class BookingAgent:
         if prof:
             return False, f"Error: ID {id_num} already assigned to {prof.has_name}."
         with self.onto:
-            t = Teacher(f"T_{id_num}")
+            t = self.onto.Teacher(f"T_{id_num}")
             t.has_name = name
             t.has_id = id_num
             for c_name in course_names:
-                course = self.onto.search_one(type=Course, has_name=c_name)
+                course = self.onto.search_one(type=self.onto.Course, has_name=c_name)
                 if course: t.teaches.append(course)
         save()
         return True, f"Teacher {name} added."
@@ -198,47 +384,48 @@ class BookingAgent:
         if self.get_person_by_id(id_num):
             return False, f"Error: ID {id_num} already exists."
         with self.onto:
-            s = Student(f"S_{id_num}")
+            s = self.onto.Student(f"S_{id_num}")
             s.has_name = name
             s.has_id = id_num
             s.has_class_code = class_code
             s.has_year = year
 
-            ac = self.onto.search_one(type=AcademicClass, has_name=class_code, has_year=year)
+            ac = self.onto.search_one(type=self.onto.AcademicClass, has_name=class_code, has_year=year)
             if ac:
                 s.belongs_to_class = ac
             else:
                 print(f"[Warning] Academic Class '{class_code}' for year {year} not found. Link not created.")
 
             for c_name in course_names:
-                course = self.onto.search_one(type=Course, has_name=c_name)
+                course = self.onto.search_one(type=self.onto.Course, has_name=c_name)
                 if course: s.enrolled_in.append(course)
         save()
         return True, f"Student {name} added."
 
-    def add_course(self, name, year, semester, capacity):
+    def add_course(self, name, year, semester, capacity, sessions=2):
         # Updated conjunction check: Name AND Year AND Semester
-        if self.onto.search_one(type=Course, has_name=name, has_year=year, has_semester=semester):
+        if self.onto.search_one(type=self.onto.Course, has_name=name, has_year=year, has_semester=semester):
             return False, f"Error: Course '{name}' (Year {year}, Sem {semester}) already exists."
         
         with self.onto:
             # Create a unique IRI including the semester
-            c = Course(f"{name.replace(' ', '_')}_Y{year}_S{semester}")
+            c = self.onto.Course(f"{name.replace(' ', '_')}_Y{year}_S{semester}")
             c.has_name = name
             c.has_year = year
             c.has_semester = semester
             c.required_capacity = capacity
+            c.has_weekly_sessions = sessions
         save()
         return True, f"Course {name} (Y{year}/S{semester}) added successfully."
 
     def add_academic_class(self, name, year):
         # Conjunction check: verify if this class name and year already exist
-        if self.onto.search_one(type=AcademicClass, has_name=name, has_year=year):
+        if self.onto.search_one(type=self.onto.AcademicClass, has_name=name, has_year=year):
             return False, f"Error: Academic Class '{name}' for year {year} already exists."
         
         with self.onto:
             # Create unique IRI
-            ac = AcademicClass(f"Class_{name.replace(' ', '_')}_{year}")
+            ac = self.onto.AcademicClass(f"Class_{name.replace(' ', '_')}_{year}")
             ac.has_name = name
             ac.has_year = year
         save() # Ensure persistence
@@ -246,12 +433,18 @@ class BookingAgent:
 
     def delete_booking(self, room, start, end, prof_id):
         """Deletes a booking with Prof ID validation."""
+        deleted, msg = self._remove_booking(room, start, end, prof_id)
+        if deleted:
+            save()
+        return deleted, msg
 
-        prof = self.onto.search_one(type=Teacher, has_id=prof_id)
+    def _remove_booking(self, room, start, end, prof_id):
+        """Removes the booking without reasoning or saving."""
+        prof = self.onto.search_one(type=self.onto.Teacher, has_id=prof_id)
 
         if prof:
             booking = self.onto.search_one(
-                type=RoomBooking,
+                type=self.onto.RoomBooking,
                 booked_in_room=room,
                 booked_by=prof,
                 has_start_time=start,
@@ -269,6 +462,4 @@ class BookingAgent:
         
         # Remove the activity and the booking
         destroy_entity(booking)
-
-        save()
         return True, "Booking successfully deleted."
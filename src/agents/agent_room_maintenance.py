@@ -1,13 +1,15 @@
 import random
 from datetime import datetime, timedelta, time
-from ontology.dei_department import RoomBooking, save, MaintenanceActivity
+from ontology.dei_department import save
 from agents.agent_room_booking import BookingAgent
+from instrumentation import instrumented
 
 class MaintenanceAgent:
     def __init__(self, ontology):
         self.onto = ontology
         self.booking_agent = BookingAgent(ontology)
 
+    @instrumented("maintenance.get_maintenance_slots")
     def get_maintenance_slots(self, room, num_days=5):
         """
         Simulates a phone call from maintenance providing 3-6 random valid slots.
@@ -79,14 +81,15 @@ class MaintenanceAgent:
         """Business logic for maintenance bookings moved to Ontology."""
         with self.onto:
             m_id = f"Maint_{int(start_t.timestamp())}_{room.name}"
-            m_book = RoomBooking(m_id)
+            m_book = self.onto.RoomBooking(m_id)
             m_book.booked_in_room = room
             m_book.has_start_time = start_t
             m_book.has_end_time = end_t
-            m_book.for_activity = MaintenanceActivity()
+            m_book.for_activity = self.onto.MaintenanceActivity()
             m_book.has_name = "Maintenance"
         return m_book
 
+    @instrumented("maintenance.auto_relocate_affected")
     def auto_relocate_affected(self, room):
         """
         Orchestrates the relocation of all bookings in a broken room
@@ -116,6 +119,7 @@ class MaintenanceAgent:
         save()
         return relocated_list
     
+    @instrumented("maintenance.emergency_relocate")
     def emergency_relocate(self, booking):
         """
         Finds a new room for a specific booking.
@@ -0,0 +1,172 @@
+"""
+Timed scenarios over seeded synthetic departments (benchmarks/department.py):
+startup load, slot search, booking creation, relocation after a failure,
+the overbooking report and save().
+
+Every size runs in its own process on a scratch ontology file (DEI_ONTOLOGY_FILE),
+so the real dei_room_management.owl is never touched.
+
+Run from src/:  python -m benchmarks.bench_department [--sizes small medium] [--json out.json]
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime, timedelta
+
+SIZES = {
+    "small": {},
+    "medium": {"rooms": 40, "courses": 80, "teachers": 40, "students": 400, "bookings_per_week": 300, "weeks": 4},
+    "large": {"rooms": 100, "courses": 200, "teachers": 100, "students": 2000, "bookings_per_week": 1000, "weeks": 4},
+}
+
+SCENARIOS = ["populate", "save", "startup_load", "slot_search", "booking_creation", "relocation", "overbooking_report"]
+
+def _timed(fn, *args):
+    """Runs fn with its prints silenced. Returns (seconds, result)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args)
+        return time.perf_counter() - start, result
+
+def _summary(times):
+    return {
+        "runs": len(times),
+        "median": round(statistics.median(times), 6) if times else None,
+        "min": round(min(times), 6) if times else None,
+        "max": round(max(times), 6) if times else None,
+        "times": [round(t, 6) for t in times],
+    }
+
+def run_size(size, seed, repeat):
+    """Child process side: builds the department and times every scenario."""
+    # Imported here: DEI_ONTOLOGY_FILE is set by the parent before this process starts
+    from ontology import dei_department
+    from agents.agent_room_booking import BookingAgent
+    from agents.agent_room_maintenance import MaintenanceAgent
+    from benchmarks import department
+
+    onto = dei_department.onto
+    agent = BookingAgent(onto)
+    maintenance = MaintenanceAgent(onto)
+    rng = random.Random(seed)
+    times = {name: [] for name in SCENARIOS}
+
+    seconds, created = _timed(department.populate, onto, agent, size, seed)
+    times["populate"].append(seconds)
+    counts = {kind: len(items) for kind, items in created.items()}
+    start = department.first_monday()
+
+    for _ in range(repeat):
+        times["save"].append(_timed(dei_department.save)[0])
+
+    env = dict(os.environ)
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "from ontology import dei_department; dei_department.load()"], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times["startup_load"].append(time.perf_counter() - begin)
+
+    for _ in range(repeat):
+        capacity = rng.choice([20, 60, 100, 150])
+        times["slot_search"].append(_timed(
+            agent.get_available_slots_in_interval, capacity, start, start + timedelta(days=4), 9, 2, False
+        )[0])
+
+    # New bookings go after the generated weeks, so they never collide
+    free_week = start + timedelta(days=7 * (size.get("weeks") or department.DEFAULT_SIZE["weeks"]))
+    teachers = created["teachers"]
+    rooms = created["rooms"]
+    for i in range(repeat):
+        start_t = datetime.combine(free_week + timedelta(days=i % 5), datetime.min.time()).replace(hour=9 + 2 * (i // 5))
+        prof = teachers[i % len(teachers)]
+        room = rooms[i % len(rooms)]
+        times["booking_creation"].append(_timed(
+            agent.create_booking, prof, room, start_t, start_t + timedelta(hours=1), "Meeting", 1
+        )[0])
+
+    # Relocation: a room fails, its bookings move one by one
+    busiest = max(rooms, key=lambda r: sum(1 for b in created["bookings"] if b.booked_in_room == r))
+    affected = [b for b in created["bookings"] if b.booked_in_room == busiest][:repeat]
+    for b in affected:
+        times["relocation"].append(_timed(maintenance.emergency_relocate, b)[0])
+
+    for _ in range(repeat):
+        times["overbooking_report"].append(_timed(agent.find_overbooked)[0])
+
+    return {"counts": counts, "scenarios": {name: _summary(t) for name, t in times.items()}}
+
+def run_in_child(name, size, seed, repeat):
+    """Runs one size in a fresh process with its own scratch ontology file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DEI_ONTOLOGY_FILE=os.path.join(tmp, f"bench_{name}.owl"))
+        out = os.path.join(tmp, "result.json")
+        cmd = [sys.executable, "-m", "benchmarks.bench_department", "--child", json.dumps(size),
+               "--seed", str(seed), "--repeat", str(repeat), "--child-output", out]
+        subprocess.run(cmd, env=env, check=True)
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=sorted(SIZES))
+    parser.add_argument("--rooms", type=int)
+    parser.add_argument("--courses", type=int)
+    parser.add_argument("--teachers", type=int)
+    parser.add_argument("--students", type=int)
+    parser.add_argument("--bookings-per-week", type=int)
+    parser.add_argument("--weeks", type=int)
+    parser.add_argument("--broken-rate", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_size(json.loads(args.child), args.seed, args.repeat)
+        with open(args.child_output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return result
+
+    sizes = {name: SIZES[name] for name in args.sizes}
+    custom = {key: getattr(args, key) for key in ["rooms", "courses", "teachers", "students",
+                                                  "bookings_per_week", "weeks", "broken_rate"]}
+    custom = {key: value for key, value in custom.items() if value is not None}
+    if custom:
+        sizes = {"custom": custom}
+
+    report = {
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+    print(f"{'SIZE':<8} | {'SCENARIO':<19} | {'RUNS':>4} | {'MEDIAN':>9} | {'MIN':>9} | {'MAX':>9}")
+    print("-" * 72)
+    for name, size in sizes.items():
+        result = run_in_child(name, size, args.seed, args.repeat)
+        result["size"] = size
+        report["sizes"][name] = result
+        for scenario, s in result["scenarios"].items():
+            if s["runs"]:
+                print(f"{name:<8} | {scenario:<19} | {s['runs']:>4} | {s['median']:>8.4f}s | {s['min']:>8.4f}s | {s['max']:>8.4f}s")
+        print(f"{name:<8} | {', '.join(f'{k}={v}' for k, v in result['counts'].items())}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+"""
+Compares the static exam encoding (domain_exams.pddl: a conditional forall/when
+spacing effect over every day and hand-listed days_too_close facts) with the
+generated compact encoding (per-class-group day cursors over precomputed
+gap_successor chains, no weekend days) on 30-, 45- and 60-day epochs.
+
+Run from src/:  python -m benchmarks.bench_exam_encodings [--days 30 45 60] [--json out.json]
+"""
+import sys
+import json
+import time
+import datetime
+import argparse
+from unified_planning.io import PDDLReader
+from schedulers import planner, generator
+
+ENCODINGS = {
+    "baseline": (generator.exam_domain_baseline, generator.exam_problem_baseline),
+    "compact": (generator.exam_domain_compact, generator.exam_problem_compact),
+}
+
+def run_case(encoding, department, start, num_days, min_gap, planner_name, timeout):
+    domain_fn, problem_fn = ENCODINGS[encoding]
+    domain_text, problem_text = domain_fn(), problem_fn(department, start, num_days, min_gap)
+
+    begin = time.monotonic()
+    problem = PDDLReader().parse_problem_string(domain_text, problem_text)
+    parse_time = time.monotonic() - begin
+
+    # Both encodings keep (?c ?cg ?r ?d ?s ?ds) as the first parameters of schedule_exam
+    outcome = planner.solve_problem("exams", problem, planner_name, timeout=timeout)
+    total_time = time.monotonic() - begin
+
+    stats = outcome["stats"]
+    schedule = outcome["schedule"]
+    return {
+        "encoding": encoding,
+        "planner": planner_name,
+        "status": outcome["status"],
+        "parse_time": round(parse_time, 3),
+        "total_time": round(total_time, 3),
+        "grounded_actions": stats.get("grounded_actions"),
+        "grounded_facts": stats.get("grounded_facts"),
+        "expanded": stats.get("expanded"),
+        "search_time": stats.get("search_time"),
+        "valid": None if schedule is None else not schedule_violations(schedule, start, min_gap),
+    }
+
+def schedule_violations(schedule, start, min_gap):
+    """Rules of the exam season, checked on the extracted schedule (never trust the encoding)."""
+    violations = []
+    rooms = set()
+    daily_slots = set()
+    group_days = {}
+    for item in schedule:
+        day = int(item["day"][3:])
+        if (start + datetime.timedelta(days=day - 1)).weekday() >= 5:
+            violations.append(("weekend", item["course"]))
+        if (item["room"], day, item["slot"]) in rooms:
+            violations.append(("room", item["course"]))
+        if (day, item["daily_slot"]) in daily_slots:
+            violations.append(("daily_slot", item["course"]))
+        rooms.add((item["room"], day, item["slot"]))
+        daily_slots.add((day, item["daily_slot"]))
+        group_days.setdefault(item["class"], []).append(day)
+
+    for group, days in group_days.items():
+        days.sort()
+        for d1, d2 in zip(days, days[1:]):
+            if d2 - d1 < min_gap:
+                violations.append(("spacing", group))
+    return violations
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 45, 60])
+    parser.add_argument("--groups", type=int, default=8)
+    parser.add_argument("--courses-per-group", type=int, default=3)
+    parser.add_argument("--rooms", type=int, default=12)
+    parser.add_argument("--min-gap", type=int, default=generator.DEFAULT_EXAM_GAP)
+    parser.add_argument("--start", default="2025-01-06", help="epoch start date (YYYY-MM-DD)")
+    parser.add_argument("--planner", nargs="+", default=["fast-downward"])
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    start = datetime.date.fromisoformat(args.start)
+    department = generator.synthetic_exam_department(args.groups, args.courses_per_group, args.rooms, seed=args.seed)
+
+    results = []
+    print(f"{'DAYS':<5} | {'ENCODING':<9} | {'PLANNER':<17} | {'STATUS':<19} | {'ACTIONS':>8} | {'FACTS':>6} | {'EXPANDED':>8} | {'VALID':<5} | {'TIME':>7}")
+    print("-" * 108)
+    for num_days in args.days:
+        for planner_name in args.planner:
+            for encoding in ENCODINGS:
+                row = run_case(encoding, department, start, num_days, args.min_gap, planner_name, args.timeout)
+                row["days"] = num_days
+                results.append(row)
+                print(f"{num_days:<5} | {encoding:<9} | {planner_name:<17} | {row['status']:<19} | "
+                      f"{row['grounded_actions'] or '-':>8} | {row['grounded_facts'] or '-':>6} | "
+                      f"{row['expanded'] or '-':>8} | {str(row['valid']):<5} | {row['total_time']:>6.1f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
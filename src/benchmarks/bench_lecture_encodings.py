@@ -0,0 +1,94 @@
+"""
+Compares the static lecture encoding (domain_lectures.pddl: two symmetric
+actions over every room and slot) with the generated session encoding
+(ordered sessions, per-session day windows, interchangeable rooms filled in order)
+on synthetic departments of 50+ courses.
+
+The session encoding also puts the sessions of a course on different days, a
+rule the static domain does not have: its rows ("spread") solve a stricter
+problem, not the same one faster.
+
+Run from src/:  python -m benchmarks.bench_lecture_encodings [--courses 50 60 80] [--json out.json]
+"""
+import sys
+import json
+import time
+import argparse
+from unified_planning.io import PDDLReader
+from schedulers import planner, generator
+
+ENCODINGS = {
+    "baseline": (generator.lecture_domain_baseline, generator.lecture_problem_baseline),
+    "spread": (generator.lecture_domain_sessions, generator.lecture_problem_sessions),
+}
+
+def run_case(encoding, department, planner_name, timeout):
+    domain_fn, problem_fn = ENCODINGS[encoding]
+    domain_text, problem_text = domain_fn(), problem_fn(department)
+
+    start = time.monotonic()
+    problem = PDDLReader().parse_problem_string(domain_text, problem_text)
+    parse_time = time.monotonic() - start
+
+    outcome = planner.solve_problem("lectures_generated", problem, planner_name, timeout=timeout)
+    total_time = time.monotonic() - start
+
+    stats = outcome["stats"]
+    return {
+        "encoding": encoding,
+        "planner": planner_name,
+        "status": outcome["status"],
+        "parse_time": round(parse_time, 3),
+        "total_time": round(total_time, 3),
+        "grounded_actions": stats.get("grounded_actions"),
+        "grounded_facts": stats.get("grounded_facts"),
+        "expanded": stats.get("expanded"),
+        "search_time": stats.get("search_time"),
+        "valid": None if outcome["schedule"] is None else not schedule_conflicts(outcome["schedule"]),
+    }
+
+def schedule_conflicts(schedule):
+    """Rooms booked twice in the same day and slot (must never happen in either encoding)."""
+    conflicts = []
+    used = set()
+    for item in schedule:
+        key = (item["room"], item["day"], item["slot"])
+        if key in used:
+            conflicts.append(("room", key))
+        used.add(key)
+    return conflicts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, nargs="+", default=[50, 60, 80])
+    parser.add_argument("--rooms-per-course", type=float, default=0.35)
+    parser.add_argument("--planner", nargs="+", default=["fast-downward"])
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'COURSES':<8} | {'ENCODING':<9} | {'PLANNER':<17} | {'STATUS':<19} | {'ACTIONS':>8} | {'FACTS':>6} | {'EXPANDED':>8} | {'TIME':>7}")
+    print("-" * 100)
+    print("(spread: session encoding, sessions of a course on different days; baseline allows the same day)")
+    for num_courses in args.courses:
+        department = generator.synthetic_department(
+            num_courses, max(4, int(num_courses * args.rooms_per_course)), seed=args.seed
+        )
+        for planner_name in args.planner:
+            for encoding in ENCODINGS:
+                row = run_case(encoding, department, planner_name, args.timeout)
+                row["courses"] = num_courses
+                results.append(row)
+                print(f"{num_courses:<8} | {encoding:<9} | {planner_name:<17} | {row['status']:<19} | "
+                      f"{row['grounded_actions'] or '-':>8} | {row['grounded_facts'] or '-':>6} | "
+                      f"{row['expanded'] or '-':>8} | {row['total_time']:>6.1f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
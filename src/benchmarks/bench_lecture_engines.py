@@ -0,0 +1,79 @@
+"""
+Compares the in-process constraint solver (schedulers/csp.py) with PDDL planning
+(Fast Downward on the generated session encoding, same rules) on the static
+lectures problem and on synthetic departments of growing size. Both engines
+solve the session rules, which put the sessions of a course on different
+days; the static domain itself allows them on the same day.
+
+Run from src/:  python -m benchmarks.bench_lecture_engines [--courses 50 80 120] [--json out.json]
+"""
+import sys
+import json
+import time
+import argparse
+from schedulers import planner, generator, csp
+from schedulers.model import lecture_model, lecture_violations
+
+def run_case(engine, texts, planner_name, timeout):
+    start = time.monotonic()
+    problem = planner.parse_problem(*texts)
+    parse_time = time.monotonic() - start
+
+    start = time.monotonic()
+    if engine == "csp":
+        outcome = csp.solve("lectures_generated", timeout=timeout, problem=problem)
+    else:
+        outcome = planner.solve_problem("lectures_generated", problem, planner_name, timeout=timeout)
+    solve_time = time.monotonic() - start
+
+    schedule = outcome["schedule"]
+    return {
+        "engine": engine if engine == "csp" else planner_name,
+        "status": outcome["status"],
+        "parse_time": round(parse_time, 3),
+        "solve_time": round(solve_time, 3),
+        "valid": None if schedule is None else not lecture_violations(lecture_model(problem), schedule),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, nargs="+", default=[50, 80, 120])
+    parser.add_argument("--rooms-per-course", type=float, default=0.35)
+    parser.add_argument("--planner", default="fast-downward")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    # The static problem, re-encoded with the session rules so both engines solve the same thing
+    static = lecture_model(planner.load_problem("lectures"))
+    cases = [("static", {
+        "courses": [{"name": c, "capacity": 0, "sessions": static["sessions"][c]} for c in static["courses"]],
+        "rooms": [{"name": r, "capacity": 0} for r in static["rooms"]],
+        "capacity_pairs": sorted(static["capacity_ok"]),
+    })]
+    for num_courses in args.courses:
+        department = generator.synthetic_department(
+            num_courses, max(4, int(num_courses * args.rooms_per_course)), seed=args.seed
+        )
+        cases.append((str(num_courses), department))
+
+    results = []
+    # Both engines read the same parsed problem (parsing is memoized, so only the first engine pays it)
+    print(f"{'COURSES':<8} | {'ENGINE':<17} | {'STATUS':<19} | {'VALID':<5} | {'PARSE':>7} | {'SOLVE':>8}")
+    print("-" * 80)
+    for label, department in cases:
+        texts = (generator.lecture_domain_sessions(), generator.lecture_problem_sessions(department))
+        for engine in ["csp", "pddl"]:
+            row = run_case(engine, texts, args.planner, args.timeout)
+            row["courses"] = label
+            results.append(row)
+            print(f"{label:<8} | {row['engine']:<17} | {row['status']:<19} | {str(row['valid']):<5} | {row['parse_time']:>6.2f}s | {row['solve_time']:>7.2f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,150 @@
+"""
+Reasoner and persistence scaling: for departments of 1k to 100k bookings, times
+sync_reasoner, RDF/XML serialization, a cold get_ontology(...).load() and the
+inferred-class queries separately, with the peak RSS of each phase. The
+columnar snapshot (ontology/columnar.py) is written and read back as well.
+
+Phases run in separate processes (peak RSS is per process) on scratch ontology
+files, so the real dei_room_management.owl is never touched. Needs Java for the
+reasoner; without it the reasoning phase is reported as unavailable.
+
+Run from src/:  python -m benchmarks.bench_persistence [--bookings 1000 10000 100000] [--json out.json]
+"""
+import os
+import io
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import contextlib
+
+# Hourly slots per room and week are ~50; keep rooms about a third full
+ROOMS = 50
+BOOKINGS_PER_WEEK = 800
+
+# Classes defined with equivalent_to in ontology/dei_department.py
+INFERRED_CLASSES = ["OverBookedRoom", "UnsuitableProjectorRoomBooking", "AvailableRoom", "RelocatedBooking", "BrokenRoom"]
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MB (ru_maxrss is in KB on Linux)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def _timed(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        return round(time.perf_counter() - start, 4)
+
+def query_inferred(onto):
+    """Times .instances() of every inferred class. Returns {class: {"seconds", "count"}}."""
+    # By name: a file loaded from a plain path gets its entities under another IRI
+    classes = {cls.name: cls for cls in onto.classes()}
+    queries = {}
+    for name in INFERRED_CLASSES:
+        cls = classes[name]
+        start = time.perf_counter()
+        count = len(list(cls.instances()))
+        queries[name] = {"seconds": round(time.perf_counter() - start, 4), "count": count}
+    return queries
+
+def phase_build(num_bookings, seed):
+    """Builds the department, then times reasoning and serialization."""
+    from owlready2 import sync_reasoner
+    from ontology import dei_department, columnar
+    from agents.agent_room_booking import BookingAgent
+    from benchmarks import department
+
+    onto = dei_department.onto
+    weeks = math.ceil(num_bookings / BOOKINGS_PER_WEEK)
+    size = {"rooms": ROOMS, "bookings_per_week": math.ceil(num_bookings / weeks), "weeks": weeks}
+    start = time.perf_counter()
+    created = department.populate(onto, BookingAgent(onto), size, seed)
+    result = {"bookings": len(created["bookings"]), "populate": round(time.perf_counter() - start, 4)}
+
+    try:
+        with onto:
+            result["reasoning"] = _timed(sync_reasoner, onto, infer_property_values=True, debug=False)
+        result["queries_after_reasoning"] = query_inferred(onto)
+    except Exception as e:
+        result["reasoning"] = None
+        result["reasoning_error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+
+    result["serialization"] = _timed(onto.save, file=dei_department.ONTOLOGY_FILE, format="rdfxml")
+    result["file_mb"] = round(os.path.getsize(dei_department.ONTOLOGY_FILE) / 1e6, 2)
+    result["columnar_write"] = _timed(columnar.write, onto, dei_department.COLUMNAR_FILE)
+    result["columnar_mb"] = round(os.path.getsize(dei_department.COLUMNAR_FILE) / 1e6, 2)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+def phase_load():
+    """Cold load of the saved file, then the inferred-class queries."""
+    from owlready2 import get_ontology
+    from ontology import columnar
+    path = os.environ["DEI_ONTOLOGY_FILE"]
+    # Columnar file to a read-side Snapshot, before the RDF/XML load fills the memory
+    result = {"columnar_load": _timed(lambda: columnar.load(columnar.path_for(path)).to_snapshot())}
+    start = time.perf_counter()
+    onto = get_ontology(path).load()
+    result["cold_load"] = round(time.perf_counter() - start, 4)
+    result["queries"] = query_inferred(onto)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+def run_phase(phase, env, args=()):
+    """Runs one phase in a fresh process and returns its JSON result."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out = f.name
+    try:
+        cmd = [sys.executable, "-m", "benchmarks.bench_persistence", "--phase", phase, "--phase-output", out, *args]
+        subprocess.run(cmd, env=env, check=True)
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--phase", choices=["build", "load"], help=argparse.SUPPRESS)
+    parser.add_argument("--phase-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.phase:
+        result = phase_build(args.bookings[0], args.seed) if args.phase == "build" else phase_load()
+        with open(args.phase_output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return result
+
+    report = {"seed": args.seed, "python": platform.python_version(), "platform": platform.platform(), "runs": []}
+    print(f"{'BOOKINGS':>8} | {'REASONING':>9} | {'SAVE':>8} | {'FILE':>8} | {'RSS SAVE':>8} | {'LOAD':>8} | {'QUERIES':>8} | {'RSS LOAD':>8}")
+    print("-" * 88)
+    for num_bookings in args.bookings:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DEI_ONTOLOGY_FILE=os.path.join(tmp, "bench_persistence.owl"))
+            build = run_phase("build", env, ["--bookings", str(num_bookings), "--seed", str(args.seed)])
+            load = run_phase("load", env)
+        report["runs"].append({"requested_bookings": num_bookings, "build": build, "load": load})
+
+        reasoning = f"{build['reasoning']:>8.2f}s" if build["reasoning"] is not None else f"{'n/a':>9}"
+        queries = sum(q["seconds"] for q in load["queries"].values())
+        print(f"{build['bookings']:>8} | {reasoning} | {build['serialization']:>7.2f}s | {build['file_mb']:>6.1f}MB | "
+              f"{build['peak_rss_mb']:>6.0f}MB | {load['cold_load']:>7.2f}s | {queries:>7.3f}s | {load['peak_rss_mb']:>6.0f}MB")
+        print(f"{'':>8}   columnar: {build['columnar_write']:.2f}s to write, {build['columnar_mb']:.1f}MB, "
+              f"{load['columnar_load']:.2f}s to load as a snapshot")
+        if build.get("reasoning_error"):
+            print(f"{'':>8}   reasoner unavailable: {build['reasoning_error']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,124 @@
+"""
+Runs the planning engines over the generated corpus (benchmarks/corpus.py) with
+a time limit per run, and tabulates the solve rate and time of every engine at
+every size: where satisficing and optimal planning stop being viable, and how
+far the alternative engines go.
+
+Lectures: fast-downward, fast-downward-opt (the two run_scheduler choices) and csp.
+Exams: fast-downward, fast-downward-opt, decomposed (per class group) and local-search.
+A schedule only counts as solved when it breaks no rule of the problem.
+
+Run from src/:  python -m benchmarks.bench_planner_corpus [--kinds exams] [--seeds 0 1 2] [--timeout 60] [--json out.json]
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+from schedulers import planner, csp, local_search
+from schedulers.model import lecture_model, lecture_violations, exam_model, exam_violations
+from benchmarks import corpus
+
+ENGINES = {
+    "lectures": ["fast-downward", "fast-downward-opt", "csp"],
+    "exams": ["fast-downward", "fast-downward-opt", "decomposed", "local-search"],
+}
+
+def run_engine(engine, instance, timeout):
+    """Solves one corpus instance. Returns (status, valid, seconds); parsing is not timed."""
+    kind, mode = instance["kind"], instance["mode"]
+    texts = (instance["domain"], instance["problem"])
+    problem = planner.parse_problem(*texts)
+
+    start = time.monotonic()
+    if engine == "csp":
+        outcome = csp.solve(mode, timeout=timeout, problem=problem)
+    elif engine == "decomposed":
+        outcome = planner.solve_decomposed(mode, "fast-downward", timeout=timeout, texts=texts)
+    elif engine == "local-search":
+        outcome = local_search.repair(mode, deadline=timeout, problem=problem, seed=instance["seed"])
+    else:
+        outcome = planner.solve_problem(mode, problem, engine, timeout=timeout)
+    seconds = time.monotonic() - start
+
+    schedule = outcome["schedule"]
+    if schedule is None:
+        return outcome["status"], None, seconds
+    if kind == "lectures":
+        valid = not lecture_violations(lecture_model(problem), schedule)
+    else:
+        valid = not exam_violations(exam_model(problem), schedule)
+    return outcome["status"], valid, seconds
+
+def summarize(runs):
+    solved = [r["seconds"] for r in runs if r["solved"]]
+    return {
+        "runs": len(runs),
+        "solved": len(solved),
+        "median": round(statistics.median(solved), 3) if solved else None,
+        "max": round(max(solved), 3) if solved else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kinds", nargs="+", default=corpus.KINDS, choices=corpus.KINDS)
+    parser.add_argument("--engines", nargs="+", help="only these engines (default: all of each kind)")
+    parser.add_argument("--levels", type=int, help="only the first N sizes of each kind")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--timeout", type=float, default=60, help="seconds per run")
+    parser.add_argument("--no-skip", action="store_true",
+                        help="keep running an engine on larger sizes after it solved nothing at a size")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    report = {"timeout": args.timeout, "seeds": args.seeds, "runs": [], "summary": []}
+    print(f"{'KIND':<8} | {'SIZE':<18} | {'ENGINE':<17} | {'SOLVED':>6} | {'MEDIAN':>8} | {'MAX':>8}")
+    print("-" * 80)
+    for kind in args.kinds:
+        engines = [e for e in ENGINES[kind] if not args.engines or e in args.engines]
+        # Instances grouped by size, smallest first
+        levels = {}
+        for instance in corpus.instances(kind, args.seeds, args.levels):
+            levels.setdefault(instance["level"], []).append(instance)
+
+        viable = {engine: None for engine in engines}
+        missed = set()
+        given_up = set()
+        for level, group in levels.items():
+            for engine in engines:
+                if engine in given_up:
+                    print(f"{kind:<8} | {group[0]['name']:<18} | {engine:<17} | {'skipped (solved nothing at a smaller size)'}")
+                    continue
+                runs = []
+                for instance in group:
+                    status, valid, seconds = run_engine(engine, instance, args.timeout)
+                    run = {"kind": kind, "level": level, "size": instance["name"], "seed": instance["seed"],
+                           "engine": engine, "status": status, "valid": valid, "seconds": round(seconds, 3),
+                           "solved": status in planner.SOLVED_STATUSES and bool(valid)}
+                    runs.append(run)
+                    report["runs"].append(run)
+
+                s = summarize(runs)
+                report["summary"].append(dict(s, kind=kind, level=level, size=group[0]["name"], engine=engine))
+                median = f"{s['median']:>7.2f}s" if s["median"] is not None else f"{'-':>8}"
+                longest = f"{s['max']:>7.2f}s" if s["max"] is not None else f"{'-':>8}"
+                print(f"{kind:<8} | {group[0]['name']:<18} | {engine:<17} | {s['solved']:>2}/{s['runs']:<3} | {median} | {longest}")
+
+                if s["solved"] < s["runs"]:
+                    missed.add(engine)
+                elif engine not in missed:
+                    viable[engine] = group[0]["name"]
+                if not s["solved"] and not args.no_skip:
+                    given_up.add(engine)
+
+        for engine, size in viable.items():
+            print(f"{kind:<8} | {engine} solves every instance up to: {size or 'none'}")
+        print("-" * 80)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+"""
+Start-up budgets: import time of the entry points, time until the interface
+menu is usable and time of the first ontology access, each against a budget.
+
+Every measurement runs in a fresh interpreter (python -X importtime for the
+imports), so nothing is cached from a previous run. The ontology is the one
+the system would load (DEI_ONTOLOGY_FILE is honoured); nothing is saved.
+
+Run from src/:  python -m benchmarks.bench_startup [--repeat 5] [--json out.json]
+Exits with status 1 when a measurement is over its budget.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds (median over the runs); the ontology load depends on the department size
+BUDGETS = {
+    "import interface": 0.3,
+    "import server": 0.3,
+    "import reports": 0.1,
+    "menu start-to-exit": 0.6,
+    "first ontology access": 2.0,
+}
+
+IMPORTS = {"import interface": "interface", "import server": "server", "import reports": "reports"}
+
+# Direct imports listed under each entry point
+TOP_IMPORTS = 3
+
+LOAD_SCRIPT = ("import time\nfrom ontology import dei_department\nstart = time.perf_counter()\n"
+               "dei_department.load()\nprint(time.perf_counter() - start)")
+
+def _run(args, stdin=None):
+    return subprocess.run([sys.executable] + args, cwd=SRC_PATH, input=stdin, capture_output=True, text=True, check=True)
+
+def parse_importtime(output, module):
+    """(cumulative seconds, [(direct import, cumulative seconds)]) of a -X importtime report."""
+    children = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line[12:]:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        if cumulative.strip() == "cumulative":
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative) / 1e6
+        if depth == 0 and name.strip() == module:
+            return seconds, sorted(children, key=lambda c: -c[1])[:TOP_IMPORTS]
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), seconds))
+    raise ValueError(f"{module} not found in the -X importtime output")
+
+def measure_import(module):
+    return parse_importtime(_run(["-X", "importtime", "-c", f"import {module}"]).stderr, module)
+
+def measure_menu():
+    """Wall time of `python interface.py` showing the main menu and exiting on '0'."""
+    start = time.perf_counter()
+    _run(["interface.py"], stdin="0\n")
+    return time.perf_counter() - start
+
+def measure_load():
+    return float(_run(["-c", LOAD_SCRIPT]).stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "results": {}}
+    top = {}
+    for name in BUDGETS:
+        runs = []
+        for _ in range(args.repeat):
+            if name in IMPORTS:
+                seconds, top[name] = measure_import(IMPORTS[name])
+            elif name == "menu start-to-exit":
+                seconds = measure_menu()
+            else:
+                seconds = measure_load()
+            runs.append(seconds)
+        median = statistics.median(runs)
+        report["results"][name] = {"median": round(median, 4), "min": round(min(runs), 4),
+                                   "budget": BUDGETS[name], "ok": median <= BUDGETS[name]}
+
+    print(f"{'STARTUP':<22} | {'MEDIAN':>8} | {'MIN':>8} | {'BUDGET':>8} |")
+    print("-" * 62)
+    for name, r in report["results"].items():
+        print(f"{name:<22} | {r['median']:>7.3f}s | {r['min']:>7.3f}s | {r['budget']:>7.2f}s | {'ok' if r['ok'] else 'OVER'}")
+        for child, seconds in top.get(name, []):
+            print(f"{'':<22}   {child}: {seconds:.3f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    results = main(sys.argv[1:])["results"].values()
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
@@ -0,0 +1,99 @@
+"""
+Corpus of generated planning instances of increasing size (schedulers/generator.py).
+Exams use the encoding of domain_exams.pddl. Lectures use the generated session
+encoding of the 'lectures_generated' mode: domain_lectures.pddl does not keep the
+two sessions of a course on different days, so its plans break the department rules.
+
+Lectures grow in courses and rooms (the week is always Mon-Fri, five slots).
+Exams grow in class groups, courses per group, rooms and epoch days; every
+level keeps enough weekdays for the spacing rule, so each instance is meant
+to be solvable.
+
+Write it to disk from src/:  python -m benchmarks.corpus --out corpus/ [--seeds 0 1 2]
+"""
+import sys
+import datetime
+import argparse
+import pathlib
+from schedulers import generator
+
+LECTURE_LEVELS = [
+    {"courses": 5, "rooms": 3},
+    {"courses": 10, "rooms": 4},
+    {"courses": 20, "rooms": 7},
+    {"courses": 40, "rooms": 14},
+    {"courses": 80, "rooms": 28},
+    {"courses": 160, "rooms": 56},
+]
+
+EXAM_LEVELS = [
+    {"groups": 2, "courses_per_group": 2, "rooms": 3, "days": 15},
+    {"groups": 3, "courses_per_group": 3, "rooms": 4, "days": 20},
+    {"groups": 4, "courses_per_group": 3, "rooms": 6, "days": 30},
+    {"groups": 6, "courses_per_group": 4, "rooms": 8, "days": 30},
+    {"groups": 8, "courses_per_group": 4, "rooms": 10, "days": 45},
+    {"groups": 12, "courses_per_group": 5, "rooms": 12, "days": 60},
+]
+
+# Exam epochs start on a Monday so every level has the same weekend pattern
+EXAM_START = datetime.date(2025, 1, 6)
+
+KINDS = ["lectures", "exams"]
+
+# Planning mode whose schedule extraction matches each kind's encoding
+MODES = {"lectures": "lectures_generated", "exams": "exams"}
+
+def lecture_instance(level, seed=0):
+    department = generator.synthetic_department(level["courses"], level["rooms"], seed=seed)
+    return generator.lecture_domain_sessions(), generator.lecture_problem_sessions(department)
+
+def exam_instance(level, seed=0):
+    department = generator.synthetic_exam_department(
+        level["groups"], level["courses_per_group"], level["rooms"], seed=seed
+    )
+    return generator.exam_domain_baseline(), generator.exam_problem_baseline(department, EXAM_START, level["days"])
+
+def level_name(kind, level):
+    if kind == "lectures":
+        return f"c{level['courses']}_r{level['rooms']}"
+    return f"g{level['groups']}x{level['courses_per_group']}_r{level['rooms']}_d{level['days']}"
+
+def instances(kind, seeds=(0,), levels=None):
+    """
+    Yields every instance of a kind, smallest first:
+    {"kind", "mode", "level", "name", "seed", "size", "domain", "problem"}.
+    levels limits the corpus to its first N levels.
+    """
+    ladder = LECTURE_LEVELS if kind == "lectures" else EXAM_LEVELS
+    build = lecture_instance if kind == "lectures" else exam_instance
+    for index, level in enumerate(ladder[:levels]):
+        for seed in seeds:
+            domain, problem = build(level, seed)
+            yield {"kind": kind, "mode": MODES[kind], "level": index + 1, "name": level_name(kind, level), "seed": seed,
+                   "size": level, "domain": domain, "problem": problem}
+
+def write_corpus(folder, seeds=(0,), kinds=KINDS):
+    """Writes <folder>/<kind>/domain_<kind>.pddl and one problem_<kind>_<level>_s<seed>.pddl per instance."""
+    folder = pathlib.Path(folder)
+    written = 0
+    for kind in kinds:
+        (folder / kind).mkdir(parents=True, exist_ok=True)
+        for instance in instances(kind, seeds):
+            (folder / kind / f"domain_{kind}.pddl").write_text(instance["domain"], encoding="utf-8")
+            name = f"problem_{kind}_{instance['name']}_s{instance['seed']}.pddl"
+            (folder / kind / name).write_text(instance["problem"], encoding="utf-8")
+            written += 1
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", required=True, help="folder to write the corpus to")
+    parser.add_argument("--kinds", nargs="+", default=KINDS, choices=KINDS)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    args = parser.parse_args(argv)
+
+    written = write_corpus(args.out, args.seeds, args.kinds)
+    print(f"{written} problem(s) written to {args.out}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,117 @@
+"""
+Seeded synthetic DEI departments for benchmarks.
+
+The department is built in the ontology loaded by ontology.dei_department, so
+point DEI_ONTOLOGY_FILE at a scratch file before importing it: the real
+dei_room_management.owl must never receive generated data.
+"""
+import random
+from datetime import datetime, timedelta, date
+
+ROOM_CAPACITIES = [15, 30, 50, 90, 120, 160, 280, 320]
+
+# Valid lecture starts (DEI hours, no booking across 13:00-14:00)
+BOOKING_STARTS = {1: [9, 10, 11, 12, 14, 15, 16, 17, 18, 19], 2: [9, 11, 14, 16, 18]}
+
+DEFAULT_SIZE = {
+    "rooms": 13,
+    "courses": 17,
+    "teachers": 10,
+    "students": 16,
+    "bookings_per_week": 40,
+    "weeks": 2,
+    "broken_rate": 0.1,
+}
+
+def first_monday(today=None):
+    """Monday of the week after today (bookings are always in the future)."""
+    today = today or date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+def populate(onto, agent, size=None, seed=0, start=None):
+    """
+    Fills the ontology with a department of the given size (see DEFAULT_SIZE),
+    reproducible for a seed. Bookings never overlap and follow the DEI rules.
+    Nothing is saved. Returns what was created, by kind.
+    """
+    size = dict(DEFAULT_SIZE, **(size or {}))
+    rng = random.Random(seed)
+    start = start or first_monday()
+
+    with onto:
+        rooms = []
+        for i in range(size["rooms"]):
+            r = onto.Room(f"Bench_Room_{i + 1}")
+            r.has_name = f"R.{i + 1}"
+            r.has_capacity = rng.choice(ROOM_CAPACITIES)
+            if rng.random() < 0.8:
+                proj = onto.Equipment(f"Projector_{r.name}")
+                proj.has_name = f"Projector {r.has_name}"
+                proj.is_broken = rng.random() < size["broken_rate"]
+                r.has_equipment = [proj]
+            rooms.append(r)
+        largest = max(r.has_capacity for r in rooms)
+
+        classes = {}
+        for year in [1, 2, 3]:
+            ac = onto.AcademicClass(f"Class_BENCH_{year}")
+            ac.has_name = "BENCH"
+            ac.has_year = year
+            classes[year] = ac
+
+        courses = []
+        for i in range(size["courses"]):
+            year = rng.randint(1, 3)
+            semester = rng.randint(1, 2)
+            c = onto.Course(f"BC{i + 1}_Y{year}_S{semester}")
+            c.has_name = f"BC{i + 1}"
+            c.has_year = year
+            c.has_semester = semester
+            c.required_capacity = rng.randint(10, largest)
+            c.has_weekly_sessions = rng.choice([1, 2, 2, 3])
+            courses.append(c)
+
+        teachers = []
+        for i in range(size["teachers"]):
+            t = onto.Teacher(f"T_{9000 + i}")
+            t.has_name = f"Teacher {i + 1}"
+            t.has_id = 9000 + i
+            t.teaches = rng.sample(courses, min(len(courses), rng.randint(1, 3)))
+            teachers.append(t)
+
+        students = []
+        for i in range(size["students"]):
+            year = rng.randint(1, 3)
+            s = onto.Student(f"S_{900000 + i}")
+            s.has_name = f"Student {i + 1}"
+            s.has_id = 900000 + i
+            s.has_class_code = "BENCH"
+            s.has_year = year
+            s.belongs_to_class = classes[year]
+            s.enrolled_in = rng.sample(courses, min(len(courses), rng.randint(3, 5)))
+            students.append(s)
+
+    # Bookings: random lectures of each teacher's courses in free, big enough rooms
+    occupied = set()
+    bookings = []
+    for week in range(size["weeks"]):
+        for _ in range(size["bookings_per_week"]):
+            for _attempt in range(20):
+                t = rng.choice(teachers)
+                course = rng.choice(t.teaches)
+                hours = rng.choice([1, 2])
+                day = start + timedelta(days=7 * week + rng.randint(0, 4))
+                hour = rng.choice(BOOKING_STARTS[hours])
+                fitting = [r for r in rooms if r.has_capacity >= course.required_capacity
+                           and not any((r, day, h) in occupied for h in range(hour, hour + hours))]
+                if not fitting:
+                    continue
+                room = rng.choice(fitting)
+                start_t = datetime.combine(day, datetime.min.time()).replace(hour=hour)
+                bookings.append(agent._build_booking(
+                    t, room, start_t, start_t + timedelta(hours=hours), "Course", course.required_capacity, course=course
+                ))
+                occupied.update((room, day, h) for h in range(hour, hour + hours))
+                break
+
+    return {"rooms": rooms, "courses": courses, "teachers": teachers, "students": students, "bookings": bookings}
@@ -0,0 +1,404 @@
+"""
+Non-interactive command line for scripted bookings and reports.
+
+Every command runs in one session on the ontology loaded once at start-up.
+Changes are saved once at the end (one reasoner run for the whole batch) and
+the results are printed as JSON on stdout; agent messages go to stderr.
+
+Run from src/:
+  python cli.py book --teacher 9001 --date 2026-11-02 --hour 9 --hours 2 --course IA
+  python cli.py cancel --teacher 9001 --room C.5.1 --date 2026-11-02 --start 9 --end 11
+  python cli.py report-overbooked
+  python cli.py room-schedule --room C.5.1 --date 2026-11-02
+  python cli.py plan --mode exams --commit --start-date 2027-01-11
+  python cli.py allocate meetings.jsonl
+  python cli.py archive --before 2026-09-01
+  python cli.py history --from 2026-01-01 --to 2026-07-31 [--room C.5.1] [--teacher 9001] [--usage]
+  python cli.py import requests.jsonl
+
+import reads a JSON list or JSON lines of requests such as
+{"command": "book", "teacher": 9001, "date": "2026-11-02", "hour": 9, "hours": 2, "capacity": 30}
+with the same fields as the options of each command ("allocate" takes a
+"requests" list of book requests). In allocate, a book request may also give
+"to_hour", the latest start hour of its window.
+"""
+import sys
+import json
+import argparse
+import contextlib
+from datetime import datetime, date, time, timedelta
+from agents.agent_room_booking import BookingAgent
+from ontology.dei_department import onto, save, Teacher, Course, RoomBooking
+from ontology import history
+
+PLAN_MODES = ["lectures", "exams", "lectures_generated"]
+PLAN_ENGINES = ["fast-downward", "fast-downward-opt", "csp", "local-search", "decomposed"]
+
+# Engines that only model one kind of problem (the others solve every mode)
+ENGINE_MODES = {
+    "csp": ["lectures", "lectures_generated"],
+    "local-search": ["exams"],
+    "decomposed": ["exams"],
+}
+
+# Alternative slots listed when the requested one is taken
+MAX_SUGGESTIONS = 10
+
+def _date(value):
+    return value if isinstance(value, date) else datetime.strptime(value, "%Y-%m-%d").date()
+
+def _flag(value):
+    return value in (True, "y", "yes", "true", 1)
+
+def _slot_json(slot):
+    return {"date": slot["date"], "start": slot["duration"][0], "end": slot["duration"][1],
+            "room": slot["room"].has_name, "capacity": slot["room"].has_capacity}
+
+def _booking_json(b):
+    return {
+        "name": b.has_name,
+        "room": b.booked_in_room.has_name if b.booked_in_room else None,
+        "start": b.has_start_time,
+        "end": b.has_end_time,
+        "booked_by": b.booked_by.has_name if b.booked_by else "System/Maintenance",
+    }
+
+class Session:
+    """One CLI run: requests share the loaded ontology and are saved together."""
+    def __init__(self, dry_run=False):
+        self.agent = BookingAgent(onto)
+        self.dry_run = dry_run
+        self.changed = False
+        # Intervals booked or freed by this batch, since the reasoner only runs at the end
+        self.booked = {}
+
+    def run(self, request):
+        """Runs one request dictionary. Returns its result dictionary (with "ok")."""
+        handlers = {
+            "book": self.book,
+            "cancel": self.cancel,
+            "report-overbooked": self.report_overbooked,
+            "room-schedule": self.room_schedule,
+            "plan": self.plan,
+            "allocate": self.allocate,
+            "archive": self.archive,
+            "history": self.history,
+        }
+        command = request.get("command")
+        if command not in handlers:
+            return {"command": command, "ok": False, "error": f"Unknown command '{command}'."}
+        try:
+            result = handlers[command](request)
+        except (KeyError, ValueError, TypeError) as e:
+            result = {"ok": False, "error": f"Invalid request: {e}"}
+        except Exception as e:
+            # One failing request must not lose the results of the rest of the batch
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return dict({"command": command}, **result)
+
+    def _booking_request(self, req):
+        """
+        Validates a book request like the booking menu does. Returns (request, error):
+        {"prof", "course", "capacity", "projector", "date", "end_date", "hour", "to_hour", "hours"}.
+        """
+        prof = onto.search_one(type=Teacher, has_id=int(req["teacher"]))
+        if not prof:
+            return None, "Only registered Teachers/Professors can book."
+
+        course = None
+        if req.get("course"):
+            course = onto.search_one(type=Course, has_name=req["course"].upper())
+            if not course:
+                return None, "Course not found."
+            capacity = course.required_capacity
+            needs_proj = True # Automatic mandatory projector for courses
+        else:
+            capacity = int(req["capacity"])
+            if not 1 <= capacity <= 500:
+                return None, "Capacity must be between 1 and 500."
+            needs_proj = _flag(req.get("projector", False))
+
+        start_date = _date(req["date"])
+        end_date = _date(req["end_date"]) if req.get("end_date") else start_date
+        hour, hours = int(req["hour"]), int(req["hours"])
+        to_hour = int(req["to_hour"]) if req.get("to_hour") else hour
+        if start_date <= date.today():
+            return None, "Bookings must be made at least one day in advance."
+        if start_date.weekday() >= 5:
+            return None, "Starting date cannot be a weekend."
+        if end_date < start_date:
+            return None, "End date must be equal or greater then start date"
+        if hour == 13:
+            return None, "13:00-14:00 is reserved for Maintenance/Lunch."
+        if not 8 < hour < 20 or not hour <= to_hour < 20:
+            return None, "Booking start hour invalid."
+        if not 0 < hours < 5:
+            return None, "Slots must have at least 1h duration and at most 4h duration"
+
+        return {"prof": prof, "course": course, "capacity": capacity, "projector": needs_proj, "date": start_date,
+                "end_date": end_date, "hour": hour, "to_hour": to_hour, "hours": hours}, None
+
+    def book(self, req):
+        request, error = self._booking_request(req)
+        if error:
+            return {"ok": False, "error": error}
+        prof, course, capacity, needs_proj = request["prof"], request["course"], request["capacity"], request["projector"]
+
+        slots = self.agent.get_available_slots_in_interval(capacity, request["date"], request["end_date"],
+                                                           request["hour"], request["hours"], needs_proj)
+        slots = [s for s in slots if not any(
+            s["start"] < e and s["end"] > b for b, e in self.booked.get(s["room"], [])
+        )]
+        if req.get("room"):
+            slots = [s for s in slots if s["room"].has_name == req["room"]]
+        exact = [s for s in slots if not s["suggestion"]]
+        if not exact:
+            return {"ok": False, "error": "No available slots found in that interval and period of time.",
+                    "suggestions": [_slot_json(s) for s in slots[:MAX_SUGGESTIONS]]}
+
+        # Same choice as the first slot listed by the menu: earliest, then smallest room
+        chosen = exact[0]
+        self.agent._build_booking(prof, chosen["room"], chosen["start"], chosen["end"],
+                                  "Course" if course else "Meeting", capacity, needs_proj, course)
+        self.booked.setdefault(chosen["room"], []).append((chosen["start"], chosen["end"]))
+        self.changed = True
+        return {"ok": True, "booking": _slot_json(chosen)}
+
+    def allocate(self, req):
+        """Books a list of book requests together (most satisfied, least wasted capacity)."""
+        results = []
+        valid = []
+        for position, item in enumerate(req["requests"]):
+            try:
+                request, error = self._booking_request(item)
+            except (KeyError, ValueError, TypeError) as e:
+                request, error = None, f"Invalid request: {e}"
+            if error:
+                results.append({"ok": False, "error": error})
+            else:
+                request["position"] = position
+                valid.append(request)
+                results.append(None)
+
+        timeout = float(req["timeout"]) if req.get("timeout") else 5
+        created, unassigned, allocation = self.agent.allocate_batch(valid, timeout, persist=False)
+        for request, booking in created:
+            room, start, end = booking.booked_in_room, booking.has_start_time, booking.has_end_time
+            self.booked.setdefault(room, []).append((start, end))
+            results[request["position"]] = {"ok": True, "booking": {
+                "date": start.date(), "start": start.strftime('%H:%M'), "end": end.strftime('%H:%M'),
+                "room": room.has_name, "capacity": room.has_capacity}}
+        for request in unassigned:
+            results[request["position"]] = {"ok": False, "error": "No room left for this request in its window."}
+        self.changed = self.changed or bool(created)
+
+        return {"ok": all(r["ok"] for r in results), "satisfied": len(created), "requested": len(results),
+                "wasted_capacity": allocation["waste"], "optimal": allocation["optimal"], "results": results}
+
+    def cancel(self, req):
+        room = self.agent.get_room(req["room"])
+        if not room:
+            return {"ok": False, "error": f"Room '{req['room']}' does not exist."}
+        day = _date(req["date"])
+        if day <= date.today():
+            return {"ok": False, "error": "Cancelling Bookings must be made at least one day in advance."}
+
+        dt_start = datetime.combine(day, time.min).replace(hour=int(req["start"]))
+        dt_end = datetime.combine(day, time.min).replace(hour=int(req["end"]))
+        deleted, msg = self.agent._remove_booking(room, dt_start.isoformat(timespec='milliseconds'),
+                                                  dt_end.isoformat(timespec='milliseconds'), int(req["teacher"]))
+        if deleted:
+            self.changed = True
+            intervals = self.booked.get(room, [])
+            if (dt_start, dt_end) in intervals:
+                intervals.remove((dt_start, dt_end))
+        return {"ok": deleted, "message" if deleted else "error": msg}
+
+    def report_overbooked(self, req):
+        report = []
+        for room, pairs in self.agent.find_overbooked():
+            report.append({"room": room.has_name, "conflicts": [[_booking_json(a), _booking_json(b)] for a, b in pairs]})
+        return {"ok": True, "overbooked": report}
+
+    def room_schedule(self, req):
+        room = self.agent.get_room(req["room"])
+        if not room:
+            return {"ok": False, "error": f"Room '{req['room']}' does not exist."}
+        day = _date(req["date"])
+        bookings = [b for b in onto.search(type=RoomBooking, booked_in_room=room) if b.has_start_time.date() == day]
+        bookings.sort(key=lambda b: b.has_start_time)
+        return {"ok": True, "room": room.has_name, "capacity": room.has_capacity,
+                "projector": bool(room.has_equipment), "date": day, "bookings": [_booking_json(b) for b in bookings]}
+
+    def plan(self, req):
+        # The planning engines are only imported when a plan is requested
+        from schedulers import planner, generator, csp, local_search
+
+        mode = req.get("mode", "exams")
+        engine = req.get("planner", "fast-downward")
+        timeout = float(req["timeout"]) if req.get("timeout") else None
+        if mode not in PLAN_MODES or engine not in PLAN_ENGINES:
+            return {"ok": False, "error": f"Unknown mode '{mode}' or planner '{engine}'."}
+        if mode not in ENGINE_MODES.get(engine, PLAN_MODES):
+            return {"ok": False, "error": f"Planner '{engine}' only solves {' and '.join(ENGINE_MODES[engine])}."}
+
+        problem = None
+        if mode == "lectures_generated":
+            department = generator.department_from_ontology(onto, semester=int(req.get("semester") or 2))
+            if not department["courses"] or not department["rooms"]:
+                return {"ok": False, "error": "Register S2 courses and rooms first."}
+            too_many = generator.too_many_sessions(department)
+            if too_many:
+                return {"ok": False, "error": f"More weekly lectures than weekdays: {', '.join(too_many)}."}
+            if self.dry_run:
+                # Solved from the generated texts: a dry run writes no files
+                problem = planner.parse_problem(generator.lecture_domain_sessions(),
+                                                generator.lecture_problem_sessions(department))
+            else:
+                generator.write_generated_lectures(department)
+
+        if engine == "csp":
+            outcome = csp.solve(mode, timeout=timeout, problem=problem)
+        elif engine == "local-search":
+            outcome = local_search.repair(mode, deadline=timeout or 10)
+        elif engine == "decomposed":
+            outcome = planner.solve_decomposed(mode, timeout=timeout)
+        elif problem is not None:
+            outcome = planner.solve_problem(mode, problem, engine, timeout=timeout)
+        else:
+            outcome = planner.solve(mode, engine, timeout=timeout)
+
+        result = {"ok": outcome["schedule"] is not None and not outcome.get("violations"),
+                  "mode": mode, "planner": outcome["planner"], "status": outcome["status"],
+                  "schedule": outcome["schedule"], "stats": outcome.get("stats", {})}
+        if not result["ok"] or not _flag(req.get("commit", False)):
+            return result
+
+        semester = 1 if mode == "exams" else int(req.get("semester") or 2)
+        end_date = _date(req["end_date"]) if req.get("end_date") else None
+        created, skipped = self.agent.commit_schedule(outcome["schedule"], "exams" if mode == "exams" else "lectures",
+                                                      _date(req["start_date"]), end_date, semester, persist=False)
+        self.changed = self.changed or bool(created)
+        result["created"] = len(created)
+        result["skipped"] = [{"item": item, "reason": reason} for item, reason in skipped]
+        return result
+
+    def archive(self, req):
+        """Moves the bookings that ended before the cutoff to the booking history."""
+        cutoff = _date(req["before"]) if req.get("before") else None
+        if self.dry_run:
+            # Only counted: the history must not hold bookings still in the ontology
+            moved = history.archive(onto, None, cutoff, dry_run=True)
+        else:
+            store = history.BookingHistory()
+            try:
+                moved = history.archive(onto, store, cutoff)
+            finally:
+                store.close()
+            self.changed = self.changed or bool(moved)
+        return {"ok": True, "archived": len(moved), "cutoff": cutoff or history.default_cutoff().date()}
+
+    def history(self, req):
+        """Archived bookings (or room usage with "usage") between two dates."""
+        start = _date(req["from"]) if req.get("from") else None
+        end = datetime.combine(_date(req["to"]), time.min) + timedelta(days=1) if req.get("to") else None
+        store = history.BookingHistory()
+        try:
+            if _flag(req.get("usage", False)):
+                return {"ok": True, "usage": store.usage(start, end)}
+            teacher = int(req["teacher"]) if req.get("teacher") else None
+            return {"ok": True, "bookings": store.query(start, end, req.get("room"), teacher)}
+        finally:
+            store.close()
+
+def read_requests(path):
+    """Requests of an import file: a JSON list, or one JSON object per line."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="DEI Room Management System - batch command line.")
+    parser.add_argument("--dry-run", action="store_true", help="run everything but do not save the ontology")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    book = commands.add_parser("book", help="book the first free room for a course or meeting")
+    book.add_argument("--teacher", type=int, required=True, help="teacher ID")
+    what = book.add_mutually_exclusive_group(required=True)
+    what.add_argument("--course", help="course code (capacity and projector come from it)")
+    what.add_argument("--capacity", type=int, help="required capacity of a meeting")
+    book.add_argument("--date", required=True, help="YYYY-MM-DD")
+    book.add_argument("--end-date", help="last day to search (YYYY-MM-DD), default: --date")
+    book.add_argument("--hour", type=int, required=True, help="start hour (9-19)")
+    book.add_argument("--hours", type=int, required=True, help="duration in hours (1-4)")
+    book.add_argument("--projector", action="store_true", help="a working projector is required")
+    book.add_argument("--room", help="only book this room")
+
+    cancel = commands.add_parser("cancel", help="delete one of your bookings")
+    cancel.add_argument("--teacher", type=int, required=True, help="teacher ID (owner of the booking)")
+    cancel.add_argument("--room", required=True)
+    cancel.add_argument("--date", required=True, help="YYYY-MM-DD")
+    cancel.add_argument("--start", type=int, required=True, help="start hour")
+    cancel.add_argument("--end", type=int, required=True, help="end hour")
+
+    commands.add_parser("report-overbooked", help="rooms with overlapping bookings")
+
+    schedule = commands.add_parser("room-schedule", help="bookings of a room on one day")
+    schedule.add_argument("--room", required=True)
+    schedule.add_argument("--date", required=True, help="YYYY-MM-DD")
+
+    plan = commands.add_parser("plan", help="run a planning engine, optionally committing the schedule")
+    plan.add_argument("--mode", choices=PLAN_MODES, default="exams",
+                      help="lectures_generated plans the registered courses of --semester")
+    plan.add_argument("--planner", choices=PLAN_ENGINES, default="fast-downward")
+    plan.add_argument("--timeout", type=float)
+    plan.add_argument("--commit", action="store_true", help="create room bookings from the schedule")
+    plan.add_argument("--start-date", help="exam epoch Day1 or semester start (YYYY-MM-DD)")
+    plan.add_argument("--end-date", help="semester end (YYYY-MM-DD, lectures)")
+    plan.add_argument("--semester", type=int)
+
+    allocate = commands.add_parser("allocate", help="book a file of book requests together, wasting the fewest seats")
+    allocate.add_argument("file", help="JSON list or JSON lines of book requests")
+    allocate.add_argument("--timeout", type=float, default=5, help="search time limit in seconds")
+
+    archive = commands.add_parser("archive", help="move past bookings from the ontology to the booking history")
+    archive.add_argument("--before", help="archive bookings that ended before this day (YYYY-MM-DD), "
+                                          f"default: {history.KEEP_DAYS} days ago")
+
+    past = commands.add_parser("history", help="archived bookings, or room usage, in a period")
+    past.add_argument("--from", help="first day (YYYY-MM-DD)")
+    past.add_argument("--to", help="last day (YYYY-MM-DD)")
+    past.add_argument("--room")
+    past.add_argument("--teacher", type=int)
+    past.add_argument("--usage", action="store_true", help="bookings and hours per room instead of the list")
+
+    batch = commands.add_parser("import", help="run a file of requests (JSON list or JSON lines)")
+    batch.add_argument("file")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "import":
+        requests = read_requests(args.file)
+    elif args.command == "allocate":
+        requests = [{"command": "allocate", "requests": read_requests(args.file), "timeout": args.timeout}]
+    else:
+        requests = [{k: v for k, v in vars(args).items() if v is not None and k != "dry_run"}]
+
+    session = Session(args.dry_run)
+    results = []
+    # Agent prints would break the JSON output
+    with contextlib.redirect_stdout(sys.stderr):
+        for request in requests:
+            results.append(session.run(request))
+        saved = session.changed and not args.dry_run
+        if saved:
+            save()
+
+    print(json.dumps({"results": results, "saved": saved}, indent=2, default=str))
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,146 @@
+"""
+Operation timers and counters, to see where the time of a slow action goes
+(ontology searches, the reasoner, serialization, slot searches, planner runs).
+
+Everything is off unless DEI_METRICS is set, and then costs next to nothing:
+instrumented() returns the function unchanged and timed() a shared no-op context.
+
+    DEI_METRICS=1              prints a summary of every timer and counter on exit
+    DEI_METRICS=metrics.json   also writes the summary to that file
+    DEI_PROFILE=action.prof    profiles the first main-menu action with cProfile
+                               (pstats file + the slowest functions printed)
+
+Times are inclusive: a timer around save() also counts the sync_reasoner inside it.
+Ontology search results are lazy, so iterating them is charged to the caller.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import pstats
+import cProfile
+import threading
+import functools
+import contextlib
+
+METRICS = os.environ.get("DEI_METRICS", "")
+PROFILE = os.environ.get("DEI_PROFILE", "")
+ENABLED = bool(METRICS)
+
+# Functions printed after a profiled action
+PROFILE_TOP = 25
+
+_timers = {}
+_counters = {}
+_lock = threading.Lock()
+_noop = contextlib.nullcontext()
+
+def add_time(name, seconds):
+    with _lock:
+        calls, total, longest = _timers.get(name, (0, 0.0, 0.0))
+        _timers[name] = (calls + 1, total + seconds, max(longest, seconds))
+
+def count(name, n=1):
+    """Adds n to a counter (does nothing when metrics are off)."""
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+@contextlib.contextmanager
+def _timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start)
+
+def timed(name):
+    """Context manager timing its block under name."""
+    return _timer(name) if ENABLED else _noop
+
+def instrumented(name):
+    """Decorator timing every call of a function under name."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def instrument_methods(obj, prefix, names):
+    """Times the given methods of one object (e.g. search and search_one of the ontology)."""
+    if not ENABLED:
+        return
+    for method in names:
+        setattr(obj, method, instrumented(f"{prefix}.{method}")(getattr(obj, method)))
+
+def summary():
+    """{"timers": {name: {calls, total, mean, max}}, "counters": {name: n}}"""
+    with _lock:
+        timers = {
+            name: {"calls": calls, "total": round(total, 6), "mean": round(total / calls, 6), "max": round(longest, 6)}
+            for name, (calls, total, longest) in _timers.items()
+        }
+        return {"timers": timers, "counters": dict(_counters)}
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+def dump(file=None):
+    """Prints the summary (slowest first) and writes it to DEI_METRICS when that is a file name."""
+    data = summary()
+    if not data["timers"] and not data["counters"]:
+        return data
+
+    out = file or sys.stdout
+    print("\n[Metrics]", file=out)
+    print(f"{'OPERATION':<40} | {'CALLS':>7} | {'TOTAL':>9} | {'MEAN':>9} | {'MAX':>9}", file=out)
+    print("-" * 86, file=out)
+    for name, t in sorted(data["timers"].items(), key=lambda item: -item[1]["total"]):
+        print(f"{name:<40} | {t['calls']:>7} | {t['total']:>8.3f}s | {t['mean']:>8.4f}s | {t['max']:>8.4f}s", file=out)
+    for name, n in sorted(data["counters"].items()):
+        print(f"{name:<40} | {n:>7}", file=out)
+
+    if METRICS not in ("1", "true", "yes"):
+        try:
+            with open(METRICS, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"Could not write metrics to {METRICS}: {e}", file=out)
+    return data
+
+if ENABLED:
+    atexit.register(dump)
+
+_profiled = False
+
+@contextlib.contextmanager
+def profiled(label):
+    """
+    Profiles the block with cProfile when DEI_PROFILE is set, only the first
+    time it is used (one menu action). Otherwise does nothing.
+    """
+    global _profiled
+    if not PROFILE or _profiled:
+        yield
+        return
+    _profiled = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(PROFILE)
+        print(f"\n[Profile of '{label}' saved to {PROFILE}]")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP)
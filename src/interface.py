@@ -1,19 +1,50 @@
 import sys
+import atexit
 import random
+import pathlib
+from owlready2 import destroy_entity
 from agents.agent_room_booking import BookingAgent
 from agents.agent_room_maintenance import MaintenanceAgent
-from schedulers import planner
-from ontology.dei_department import *
-from datetime import datetime, date, time
+from schedulers.jobs import JobRunner
+from schedulers.service import PlannerService
+from ontology.dei_department import load, save, clean_onto
+from ontology import history
+from instrumentation import profiled
+from datetime import datetime, date, time, timedelta
 
 BASE_PATH = pathlib.Path(__file__).parent.resolve()
 ONTOLOGY_FILE = str(BASE_PATH / "ontology" / "dei_room_management.owl")
 
-# Initialization of Agent 1 (room booking manager)
-agent = BookingAgent(onto)
-
-# Initialization of Agent 2 (room maintenance booking manager)
-agent2 = MaintenanceAgent(onto)
+# The ontology and the agents (Agent 1: room booking manager, Agent 2: room maintenance
+# booking manager) are set by load_ontology(), so the main menu shows up before the
+# ontology is parsed
+onto = None
+agent = None
+agent2 = None
+
+# Background planner runs (cancelled on exit)
+jobs = JobRunner()
+atexit.register(jobs.shutdown)
+
+# Resident planner process, started on the first visit to the planning menu
+service = PlannerService()
+atexit.register(service.stop)
+
+# Last schedule shown for each planning mode, used by incremental replanning
+last_plans = {}
+
+def load_ontology():
+    """Loads the ontology (shared through ontology.dei_department) and starts the agents, once."""
+    global onto, agent, agent2
+    if agent is None:
+        onto = load()
+        agent = BookingAgent(onto)
+        agent2 = MaintenanceAgent(onto)
+
+def load_planners():
+    """Imports the planning engines (unified_planning takes about a second) on the first planning visit."""
+    global planner, plan_cache, generator, csp, local_search
+    from schedulers import planner, plan_cache, generator, csp, local_search
 
 def main_menu():
     """Displays the primary navigation menu."""
@@ -27,14 +58,12 @@ def main_menu():
         
         choice = input("\nSelect an option: ")
         
-        if choice == '1':
-            management_menu()
-        elif choice == '2':
-            maintenance_menu()
-        elif choice == '3':
-            booking_menu()
-        elif choice == '4':
-            planning_menu()
+        actions = {'1': management_menu, '2': maintenance_menu, '3': booking_menu, '4': planning_menu}
+        if choice in actions:
+            # With DEI_PROFILE set, the first action is profiled with cProfile
+            with profiled(actions[choice].__name__):
+                load_ontology()
+                actions[choice]()
         elif choice == '0':
             print("Exiting system. Goodbye!")
             sys.exit(0)
@@ -49,8 +78,9 @@ def management_menu():
         print("3. Student Management")
         print("4. Course Management")
         print("5. Class Management")
-        print("6. Check Overbooked Rooms\n")
-        print("7. Clear All Data")
+        print("6. Check Overbooked Rooms")
+        print("7. Booking History (Archive)\n")
+        print("8. Clear All Data")
         print("0. Back to Main Menu")
         
         choice = input("\nSelect: ")
@@ -60,7 +90,8 @@ def management_menu():
         elif choice == '4': course_mgmt()
         elif choice == '5': class_mgmt()
         elif choice == '6': check_overbooked()
-        elif choice == '7': clean_onto()
+        elif choice == '7': history_menu()
+        elif choice == '8': clean_onto()
         elif choice == '0': main_menu()
         else:
             print("Invalid option. Please try again.")
@@ -328,7 +359,18 @@ def course_mgmt():
                 except ValueError:
                     print("Error: Number of Students must be a valid number.")
 
-            _ , msg = agent.add_course(name, year, semester, capacity)
+            # 5. Validate Weekly Lectures (used by the generated lecture planning)
+            while True:
+                try:
+                    sessions_str = input("Weekly Lectures (1-5) [Press Enter for 2]: ")
+                    sessions = int(sessions_str) if sessions_str else 2
+                    if 1 <= sessions <= 5:
+                        break
+                    print("Error: Weekly Lectures must be between 1 and 5.")
+                except ValueError:
+                    print("Error: Weekly Lectures must be a valid number.")
+
+            _ , msg = agent.add_course(name, year, semester, capacity, sessions)
             print(msg)
         elif c == '2':
             courses = list(onto.Course.instances())
@@ -337,7 +379,7 @@ def course_mgmt():
             else:
                 print("\n[List of Courses]\n")
                 for crs in courses:
-                    print(f"- {crs.has_name} (Year: {crs.has_year}, Sem: {crs.has_semester}, Cap: {crs.required_capacity})")
+                    print(f"- {crs.has_name} (Year: {crs.has_year}, Sem: {crs.has_semester}, Cap: {crs.required_capacity}, Weekly Lectures: {crs.has_weekly_sessions or 2})")
         elif c == '0':
             return
         else:
@@ -375,7 +417,7 @@ def class_mgmt():
                 print("\n[List of Academic Classes]\n")
                 for ac in classes:
                     # FOL: {s | Student(s) ^ belongs_to_class(s, ac)}
-                    students = onto.search(type=Student, belongs_to_class=ac)
+                    students = onto.search(type=onto.Student, belongs_to_class=ac)
                     student_names = [s.has_name for s in students]
                     
                     print(f"Class: {ac.has_name} | Year: {ac.has_year}")
@@ -387,47 +429,65 @@ def class_mgmt():
             print("Invalid option. Please try again.")
 
 def check_overbooked():
-    """Queries the ontology for rooms that have at least one booking."""
+    """Reports the rooms that have overlapping bookings."""
     print("\n[Overbooked Rooms Report]")
-    
-    # Get rooms that the ontology identifies as having bookings
-    potential_conflict_rooms = onto.OverBookedRoom.instances()
-    
-    conflict_found = False
 
-    for room in potential_conflict_rooms:
-        # Get all bookings for this specific room
-        bookings = [b for b in onto.RoomBooking.instances() if b.booked_in_room == room]
-        
-        # Sort bookings by start time for easier comparison
-        bookings.sort(key=lambda x: x.has_start_time)
-        
-        room_conflicts = []
-        
-        # Compare every pair of bookings in the room to find overlaps
-        for i in range(len(bookings)):
-            for j in range(i + 1, len(bookings)):
-                b1 = bookings[i]
-                b2 = bookings[j]
-                
-                # Overlap logic: (Start1 < End2) AND (Start2 < End1)
-                # Since these are datetime objects, this handles both same-day and time overlaps
-                if (b1.has_start_time < b2.has_end_time) and (b2.has_start_time < b1.has_end_time):
-                    room_conflicts.append((b1, b2))
-        
-        if room_conflicts:
-            conflict_found = True
-            print(f"\n[!] CONFLICT DETECTED in Room: {room.has_name}")
-            for b1, b2 in room_conflicts:
-                print(f"  Overlap found between:")
-                print(f"    - {b1.has_name} ({b1.has_start_time.strftime('%Y-%m-%d %H:%M')} to {b1.has_end_time.strftime('%H:%M')})")
-                print(f"    - {b2.has_name} ({b2.has_start_time.strftime('%Y-%m-%d %H:%M')} to {b2.has_end_time.strftime('%H:%M')})")
-
-    if not conflict_found:
+    report = agent.find_overbooked()
+    for room, room_conflicts in report:
+        print(f"\n[!] CONFLICT DETECTED in Room: {room.has_name}")
+        for b1, b2 in room_conflicts:
+            print(f"  Overlap found between:")
+            print(f"    - {b1.has_name} ({b1.has_start_time.strftime('%Y-%m-%d %H:%M')} to {b1.has_end_time.strftime('%H:%M')})")
+            print(f"    - {b2.has_name} ({b2.has_start_time.strftime('%Y-%m-%d %H:%M')} to {b2.has_end_time.strftime('%H:%M')})")
+
+    if not report:
         print("No time-slot conflicts found. All room schedules are valid.")
     
     print("\n" + "-"*40)
 
+def history_menu():
+    """Archives past bookings out of the ontology and reports on the archived ones."""
+    archive = history.BookingHistory()
+    while True:
+        print("\n[Booking History]\n")
+        print(f"Archived bookings: {archive.count()}\n")
+        print("1. Archive Past Bookings")
+        print("2. Room Usage Report")
+        print("3. List Archived Bookings")
+        print("0. Back\n")
+        c = input("Choice: ")
+        if c == '1':
+            cutoff = history.default_cutoff()
+            print(f"Bookings that ended before {cutoff.date()} will be moved to the history.")
+            if input("Continue? (y/n): ").lower().strip() != 'y':
+                continue
+            moved = history.archive(onto, archive, cutoff)
+            if moved:
+                save()
+            print(f"{len(moved)} booking(s) archived.")
+        elif c in ['2', '3']:
+            start_date = ask_date("From (YYYY-MM-DD): ")
+            end_date = ask_date("To (YYYY-MM-DD): ")
+            end = datetime.combine(end_date, time.min) + timedelta(days=1)
+            if c == '2':
+                usage = archive.usage(start_date, end)
+                if not usage:
+                    print("No archived bookings in this period.")
+                for u in usage:
+                    print(f"- Room: {u['room']} | Bookings: {u['bookings']} | Hours: {u['hours']} | Maintenance: {u['maintenance']}")
+            else:
+                room = input("Room Name (empty for all): ").strip() or None
+                records = archive.query(start_date, end, room=room)
+                if not records:
+                    print("No archived bookings in this period.")
+                for b in records:
+                    print(f"- {b['start'].strftime('%Y-%m-%d %H:%M')}-{b['end'].strftime('%H:%M')} | {b['room']} | {b['name']} | {b['teacher_name']}")
+        elif c == '0':
+            archive.close()
+            return
+        else:
+            print("Invalid option. Please try again.")
+
 def booking_menu():
     while True:
         print("\n[Room Bookings]\n")
@@ -443,7 +503,7 @@ def booking_menu():
             print("Invalid ID format.")
             continue
 
-        prof = onto.search_one(type=Teacher, has_id=prof_id)
+        prof = onto.search_one(type=onto.Teacher, has_id=prof_id)
         
         if not prof:
             print("\nAccess Denied: Only registered Teachers/Professors can book.")
@@ -463,7 +523,7 @@ def booking_menu():
 
             if is_course:
                 c_name = input("Enter Course Code: ").upper()
-                course_obj = onto.search_one(type=Course, has_name=c_name)
+                course_obj = onto.search_one(type=onto.Course, has_name=c_name)
                 if not course_obj:
                     return print("Course not found.")
                 cap_needed = course_obj.required_capacity
@@ -600,7 +660,7 @@ def booking_menu():
                 print(f"Error: Room '{room_name}' does not exist.")
             else:
                 # Fetch and sort bookings
-                bookings = [b for b in onto.search(type=RoomBooking, booked_in_room=room) if b.has_start_time.date() == target_date]
+                bookings = [b for b in onto.search(type=onto.RoomBooking, booked_in_room=room) if b.has_start_time.date() == target_date]
                 sorted_bookings = sorted(bookings, key=lambda x: x.has_start_time)
                 has_projector = "Yes" if room.has_equipment else "No"
 
@@ -699,8 +759,8 @@ def maintenance_menu():
                         if rebook in ['y', 'n']:
                             if rebook == 'y':
                                 maintenance_bookings = [
-                                    b for b in onto.search(type=RoomBooking, booked_in_room=room)
-                                    if isinstance(b.for_activity, MaintenanceActivity)
+                                    b for b in onto.search(type=onto.RoomBooking, booked_in_room=room)
+                                    if isinstance(b.for_activity, onto.MaintenanceActivity)
                                 ]
                                 for b in maintenance_bookings:
                                     print(f"Removing maintenance booking from schedule: {b.has_start_time.strftime('%Y-%m-%d %H:%M')}")
@@ -774,7 +834,7 @@ def maintenance_menu():
                 if p_id == 0:
                     continue
                 prof = agent.get_person_by_id(p_id)
-                if not prof or not isinstance(prof, Teacher):
+                if not prof or not isinstance(prof, onto.Teacher):
                     print(f"Error: Professor with ID {p_id} not found.")
                     continue
             except ValueError:
@@ -806,10 +866,10 @@ def maintenance_menu():
             print(f"\nAdjusting schedule for: {old_booking.has_name}")
             
             # 1. Determine requirements from the old booking
-            is_course = isinstance(old_booking.for_activity, Lecture)
+            is_course = isinstance(old_booking.for_activity, onto.Lecture)
             cap_needed = old_booking.for_activity.required_capacity or 0
             needs_proj = True if old_booking.for_activity.requires_equipment else False
-            course_obj = onto.search_one(type=Course, has_name=old_booking.has_name.split(": ")[1]) if is_course else None
+            course_obj = onto.search_one(type=onto.Course, has_name=old_booking.has_name.split(": ")[1]) if is_course else None
 
             # 2. Get new timing preferences
             print("Enter your new preferred timing:")
@@ -881,8 +941,8 @@ def maintenance_menu():
             # 2. Validate that a maintenance booking exists for this room
             # We look for bookings where the activity is a MaintenanceActivity
             maintenance_bookings = [
-                b for b in onto.search(type=RoomBooking, booked_in_room=room)
-                if isinstance(b.for_activity, MaintenanceActivity)
+                b for b in onto.search(type=onto.RoomBooking, booked_in_room=room)
+                if isinstance(b.for_activity, onto.MaintenanceActivity)
             ]
             
             if not maintenance_bookings:
@@ -924,35 +984,219 @@ def maintenance_menu():
         else:
             print("Invalid option. Please try again.")
         
+def ask_time_limit():
+    """Asks for a planning time limit in seconds."""
+    while True:
+        try:
+            budget = int(input("Time limit in seconds (e.g., 60): "))
+            if budget > 0:
+                return budget
+            print("Error: Time limit must be greater than 0.")
+        except ValueError:
+            print("Error: Time limit must be a valid number.")
+
+def ask_date(prompt):
+    """Asks for a date in YYYY-MM-DD format."""
+    while True:
+        try:
+            return datetime.strptime(input(prompt), "%Y-%m-%d").date()
+        except ValueError:
+            print("Invalid format. Use YYYY-MM-DD.")
+
+def handle_plan(mode, schedule):
+    """Remembers a planner schedule (for replanning) and offers to turn it into room bookings."""
+    if not schedule:
+        return
+    last_plans[mode] = schedule
+    while True:
+        commit = input("\nCommit this schedule as room bookings? (y/n): ").lower().strip()
+        if commit in ['y', 'n']:
+            break
+        print("Error: Please enter only 'y' for yes or 'n' for no.")
+    if commit == 'n':
+        return
+
+    if mode == "exams":
+        start_date = ask_date("Exam epoch first day (Day1) (YYYY-MM-DD): ")
+        end_date = None
+        semester = 1
+    else:
+        start_date = ask_date("Semester start date (YYYY-MM-DD): ")
+        while True:
+            end_date = ask_date("Semester end date (YYYY-MM-DD): ")
+            if end_date >= start_date:
+                break
+            print("Error: End date must be equal or greater then start date")
+        semester = 2
+
+    print("\n[System] Creating bookings...")
+    created, skipped = agent.commit_schedule(schedule, mode, start_date, end_date, semester)
+    print(f"Success: {len(created)} booking(s) created.")
+    if skipped:
+        print(f"{len(skipped)} item(s) were not booked:")
+        for item, reason in skipped:
+            print(f" - {item['course'].upper()} in {item['room']}: {reason}")
+
+def run_planning(mode):
+    """Asks for the planning algorithm and runs the scheduler for the given mode."""
+    print("\nSelect Algorithm:")
+    print("1. Fast/Heuristic")
+    print("2. Best Possible")
+    print("3. Portfolio (race several configurations within a time limit)")
+    print("4. Anytime (quick schedule, improved until a time limit)")
+    if mode == "exams":
+        print("5. Decomposed (one sub-problem per class group, solved in parallel)")
+        print("6. Local Search Repair (repairs the last plan, or builds one, within a time limit)")
+    else:
+        print("5. Constraint Solver (in-process, no PDDL planner)")
+    algo = input("Choice: ")
+    if algo in ['1', '2']:
+        while True:
+            background = input("Run in the background? (y/n): ").lower().strip()
+            if background in ['y', 'n']:
+                break
+            print("Error: Please enter only 'y' for yes or 'n' for no.")
+        if background == 'y':
+            planner_name = "fast-downward" if algo == '1' else "fast-downward-opt"
+            job = jobs.submit(mode, planner_name)
+            print(f"Started planning job #{job.id}. Follow it in 'Planning Jobs'.")
+        else:
+            handle_plan(mode, planner.run_scheduler(mode, algo))
+    elif algo == '3':
+        budget = ask_time_limit()
+        while True:
+            wait = input("Wait for the best plan within the limit? (y/n): ").lower().strip()
+            if wait in ['y', 'n']:
+                break
+            print("Error: Please enter only 'y' for yes or 'n' for no.")
+        handle_plan(mode, planner.run_portfolio_scheduler(mode, budget, "best" if wait == 'y' else "first"))
+    elif algo == '4':
+        handle_plan(mode, planner.run_anytime_scheduler(mode, ask_time_limit()))
+    elif algo == '5' and mode == "exams":
+        handle_plan(mode, planner.run_scheduler(mode, '1', decompose=True))
+    elif algo == '5':
+        handle_plan(mode, csp.run_csp_scheduler(mode))
+    elif algo == '6' and mode == "exams":
+        handle_plan(mode, local_search.run_local_search_scheduler(mode, ask_time_limit(), last_plans.get(mode)))
+    else:
+        print("Invalid algorithm choice.")
+
+def replanning_menu():
+    """Repairs the last lectures/exams plan after rooms become unusable."""
+    print("\n[Replan After Room Failure]\n")
+    print("1. Lectures\n2. Exams\n0. Back\n")
+    c = input("Choice: ")
+    if c not in ['1', '2']:
+        return
+    mode = "lectures" if c == '1' else "exams"
+
+    schedule = last_plans.get(mode)
+    if not schedule:
+        print(f"No {mode} plan generated yet. Generate one first.")
+        return
+
+    rooms_raw = input("Unavailable Rooms (comma separated, e.g., G.5.1): ").split(",")
+    broken = [r.strip().replace(".", "_").replace(" ", "_").lower() for r in rooms_raw if r.strip()]
+    if not broken:
+        print("Error: Please enter at least one room.")
+        return
+
+    handle_plan(mode, planner.run_replanning(mode, schedule, broken, service))
+
+def jobs_menu():
+    """Lists the background planning jobs and lets the user inspect or cancel them."""
+    while True:
+        print("\n[Planning Jobs]\n")
+        all_jobs = jobs.list_jobs()
+        if not all_jobs:
+            print("No planning jobs were started.")
+            return
+        for job in all_jobs:
+            print(job.summary())
+
+        print("\n1. View Job Result\n2. Cancel Job\n3. Refresh\n0. Back\n")
+        c = input("Choice: ")
+        if c in ['1', '2']:
+            try:
+                job = jobs.get(int(input("Job number: ")))
+            except ValueError:
+                print("Invalid job number.")
+                continue
+            if not job:
+                print("Job not found.")
+                continue
+
+            if c == '1':
+                if job.status == "done" and job.result.get("stats"):
+                    print(f"Metrics: {planner.format_metrics(job.result['stats'])}")
+                if job.status == "done" and job.result["schedule"] is not None:
+                    planner.print_schedule(job.mode, job.result["schedule"])
+                    handle_plan(job.mode, job.result["schedule"])
+                elif job.status == "done":
+                    print(f"No plan found. Status: {job.result['status']}")
+                elif job.status == "failed":
+                    print(f"Error running planner: {job.error}")
+                else:
+                    print(f"Job #{job.id} is {job.status}.")
+            else:
+                _, msg = job.cancel()
+                print(msg)
+        elif c == '3':
+            continue
+        elif c == '0':
+            return
+        else:
+            print("Invalid option. Please try again.")
+
 def planning_menu():
     """Triggers the PDDL Automated Planners."""
+    # Warms up in the background while the user picks an option
+    service.start()
+    load_planners()
     while True:
         print("\n [Semester Planning]\n")
         print("1. Generate Weekly Course Lectures Schedule (S2)")
         print("2. Generate Exam Epoch Schedule (S1)")
+        print("3. Planning Jobs (background runs)")
+        print("4. Clear Cached Plans")
+        print("5. Replan After Room Failure")
         print("0. Back to Main Menu")
         
         choice = input("\nSelect: ")
         
         if choice == '1':
-            print("\nSelect Algorithm:")
-            print("1. Fast/Heuristic")
-            print("2. Best Possible")
-            algo = input("Choice: ")
-            if algo in ['1', '2']:
-                planner.run_scheduler("lectures", algo)
+            print("\nSelect Problem Source:")
+            print("1. Static PDDL Files (2 lectures per course)")
+            print("2. Registered S2 Courses and Rooms (weekly lectures per course)")
+            source = input("Choice: ")
+            if source == '1':
+                run_planning("lectures")
+            elif source == '2':
+                department = generator.department_from_ontology(onto, semester=2)
+                if not department["courses"] or not department["rooms"]:
+                    print("Error: Register S2 courses and rooms first.")
+                    continue
+                too_many = generator.too_many_sessions(department)
+                if too_many:
+                    print(f"Error: More weekly lectures than weekdays for {', '.join(too_many)}.")
+                    continue
+                generator.write_generated_lectures(department)
+                run_planning("lectures_generated")
             else:
-                print("Invalid algorithm choice.")
+                print("Invalid option.")
                 
         elif choice == '2':
-            print("\nSelect Algorithm:")
-            print("1. Fast/Heuristic")
-            print("2. Best Possible")
-            algo = input("Choice: ")
-            if algo in ['1', '2']:
-                planner.run_scheduler("exams", algo)
-            else:
-                print("Invalid algorithm choice.")
+            run_planning("exams")
+
+        elif choice == '3':
+            jobs_menu()
+
+        elif choice == '4':
+            removed = plan_cache.clear()
+            print(f"Removed {removed} cached plan(s).")
+
+        elif choice == '5':
+            replanning_menu()
                 
         elif choice == '0':
             return
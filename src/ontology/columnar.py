@@ -0,0 +1,441 @@
+"""
+Compact columnar snapshot of the ontology's instance data (".deic" files).
+
+The classes and properties are defined in dei_department.py; only the
+individuals are stored: one table per kind (rooms, equipment, courses,
+classes, people, teaches, enrollments, activities, requires, bookings), each
+kept as typed arrays (one per column), and every string once in a shared
+string table. Loading is reading a few byte blobs into arrays, with no RDF/XML
+parsing. From the loaded data, to_snapshot() builds the read-side Snapshot
+directly (no owlready2 world at all) and rebuild() recreates the owlready2
+individuals in an empty ontology.
+
+dei_department.save() writes it after the RDF/XML, and start-up rebuilds the
+ontology from it instead of parsing the RDF/XML while it is current (not
+older than the .owl file). RDF/XML stays the export and interchange format.
+
+Run from src/:
+    python -m ontology.columnar pack [FILE.deic]      ontology -> columnar file
+    python -m ontology.columnar export FILE.owl       columnar file -> RDF/XML
+    python -m ontology.columnar stats [FILE.deic]
+"""
+import os
+import sys
+import array
+import struct
+import pathlib
+import datetime
+from owlready2 import rdf_type, owl_named_individual, to_literal, from_literal
+
+BASE_PATH = pathlib.Path(__file__).parent.resolve()
+ONTOLOGY_FILE = os.environ.get("DEI_ONTOLOGY_FILE", str(BASE_PATH / "dei_room_management.owl"))
+
+MAGIC = b"DEIC"
+FORMAT_VERSION = 1
+
+# Column kinds: s string (index in the string table), i int32, q int64,
+# b small int / bool, t datetime (int64 seconds), r row of another table
+NONE = {"s": -1, "i": -2 ** 31, "q": -2 ** 63, "b": -1, "t": -2 ** 63, "r": -1}
+TYPECODES = {"s": "i", "i": "i", "q": "q", "b": "b", "t": "q", "r": "i"}
+
+# Every table starts with the individual's name and its classes ("Room,OverBookedRoom")
+TABLES = {
+    "rooms": [("iri", "s"), ("types", "s"), ("name", "s"), ("capacity", "i")],
+    "equipment": [("iri", "s"), ("types", "s"), ("name", "s"), ("broken", "b"), ("room", "r")],
+    "courses": [("iri", "s"), ("types", "s"), ("name", "s"), ("year", "i"), ("semester", "i"),
+                ("capacity", "i"), ("sessions", "i")],
+    "classes": [("iri", "s"), ("types", "s"), ("name", "s"), ("year", "i")],
+    "people": [("iri", "s"), ("types", "s"), ("id", "q"), ("name", "s"), ("class_code", "s"),
+               ("year", "i"), ("academic_class", "r")],
+    "teaches": [("teacher", "r"), ("course", "r")],
+    "enrollments": [("student", "r"), ("course", "r")],
+    "activities": [("iri", "s"), ("types", "s"), ("capacity", "i")],
+    "requires": [("activity", "r"), ("equipment", "r")],
+    "bookings": [("iri", "s"), ("types", "s"), ("room", "r"), ("start", "t"), ("end", "t"), ("name", "s"),
+                 ("teacher", "r"), ("activity", "r"), ("relocated", "b"), ("original_start", "t"),
+                 ("original_end", "t")],
+}
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Datatype id of xsd:dateTime literals (parsed with fromisoformat, much faster than from_literal)
+DATETIME_TYPE = to_literal(EPOCH)[1]
+
+def path_for(ontology_file):
+    return os.path.splitext(ontology_file)[0] + ".deic"
+
+def is_current(path, ontology_file):
+    """True when the columnar file exists and the RDF/XML was not changed after it."""
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(ontology_file) or os.path.getmtime(ontology_file) <= os.path.getmtime(path)
+
+def current_snapshot(ontology_file=None, version=0):
+    """Snapshot read from the columnar file when it is current (no ontology loaded), else None."""
+    ontology_file = ontology_file or ONTOLOGY_FILE
+    path = path_for(ontology_file)
+    return load(path).to_snapshot(version) if is_current(path, ontology_file) else None
+
+def _seconds(value):
+    return (value - EPOCH) // datetime.timedelta(seconds=1)
+
+class _Writer:
+    def __init__(self):
+        self.strings = {}
+        self.columns = {name: {col: [] for col, _ in cols} for name, cols in TABLES.items()}
+        self.rows = {name: {} for name in TABLES}
+
+    def string(self, value):
+        if value is None:
+            return NONE["s"]
+        return self.strings.setdefault(value, len(self.strings))
+
+    def add(self, table, entity=None, **values):
+        """Appends a row; entity rows can be referenced later (kind "r")."""
+        columns = self.columns[table]
+        index = len(columns[TABLES[table][0][0]])
+        if entity is not None:
+            self.rows[table][entity["storid"]] = index
+            values = dict(values, iri=entity["iri"], types=",".join(entity["types"]))
+        for col, kind in TABLES[table]:
+            value = values.get(col)
+            if value is None:
+                columns[col].append(NONE[kind])
+            elif kind == "s":
+                columns[col].append(self.string(value))
+            elif kind == "t":
+                columns[col].append(_seconds(value))
+            else:
+                columns[col].append(int(value))
+        return index
+
+    def ref(self, table, storids):
+        """Row of the first referenced individual (object property values are lists of ids)."""
+        return self.rows[table].get(storids[0]) if storids else None
+
+    def write(self, path, base_iri):
+        blob = bytearray()
+        offsets = array.array("I", [0])
+        for value in self.strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+
+        parts = [struct.pack("<4sHI", MAGIC, FORMAT_VERSION, len(self.strings)), _blob(base_iri.encode("utf-8")),
+                 _blob(offsets), _blob(bytes(blob))]
+        parts.append(struct.pack("<I", len(TABLES)))
+        for table, cols in TABLES.items():
+            name = table.encode("ascii")
+            parts.append(struct.pack("<B", len(name)) + name)
+            parts.append(struct.pack("<I", len(self.columns[table][cols[0][0]])))
+            for col, kind in cols:
+                parts.append(_blob(array.array(TYPECODES[kind], self.columns[table][col])))
+
+        # Written aside and renamed, so a reader never sees half a file
+        temp = f"{path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(temp, path)
+
+def _blob(data):
+    if isinstance(data, array.array):
+        if sys.byteorder != "little":
+            data = array.array(data.typecode, data)
+            data.byteswap()
+        data = data.tobytes()
+    return struct.pack("<Q", len(data)) + data
+
+def _individuals(onto):
+    """
+    Every individual of the ontology read straight from the quadstore (much faster than
+    through the Python objects): [{"storid", "iri", "types", property python_name: value}],
+    object property values being lists of individual ids.
+    """
+    graph = onto.graph
+    classes = {c.storid: c.name for c in onto.classes()}
+    props = {p.storid: p.python_name for p in onto.properties()}
+    found = {}
+
+    def entity(s):
+        if s not in found:
+            iri = graph._unabbreviate(s)
+            name = iri[len(onto.base_iri):] if iri.startswith(onto.base_iri) else iri.rsplit("#", 1)[-1]
+            found[s] = {"storid": s, "iri": name, "types": []}
+        return found[s]
+
+    for s, p, o in graph.execute("SELECT s, p, o FROM objs WHERE c = ?", (graph.c,)):
+        if p == rdf_type and o in classes:
+            entity(s)["types"].append(classes[o])
+        elif p in props:
+            entity(s).setdefault(props[p], []).append(o)
+    for s, p, o, d in graph.execute("SELECT s, p, o, d FROM datas WHERE c = ?", (graph.c,)):
+        if p in props:
+            entity(s)[props[p]] = datetime.datetime.fromisoformat(o) if d == DATETIME_TYPE else from_literal(o, d)
+    return [e for e in found.values() if e["types"]]
+
+def write(onto, path):
+    """Stores every individual of the ontology in a columnar file."""
+    def kinds(cls):
+        return {c.name for c in cls.descendants()}
+    rooms, equipment, courses, classes = kinds(onto.Room), kinds(onto.Equipment), kinds(onto.Course), kinds(onto.AcademicClass)
+    teachers, students, activities, bookings = kinds(onto.Teacher), kinds(onto.Student), kinds(onto.Activity), kinds(onto.RoomBooking)
+
+    by_kind = {}
+    for e in _individuals(onto):
+        types = set(e["types"])
+        for table, names in (("rooms", rooms), ("equipment", equipment), ("courses", courses), ("classes", classes),
+                             ("people", teachers | students), ("activities", activities), ("bookings", bookings)):
+            if types & names:
+                by_kind.setdefault(table, []).append(e)
+                break
+
+    w = _Writer()
+    for r in by_kind.get("rooms", []):
+        w.add("rooms", r, name=r.get("has_name"), capacity=r.get("has_capacity"))
+    for eq in by_kind.get("equipment", []):
+        w.add("equipment", eq, name=eq.get("has_name"), broken=eq.get("is_broken"))
+    # An equipment belongs to the room that lists it
+    room_column = w.columns["equipment"]["room"]
+    for r in by_kind.get("rooms", []):
+        for eq in r.get("has_equipment", []):
+            room_column[w.ref("equipment", [eq])] = w.ref("rooms", [r["storid"]])
+    for c in by_kind.get("courses", []):
+        w.add("courses", c, name=c.get("has_name"), year=c.get("has_year"), semester=c.get("has_semester"),
+              capacity=c.get("required_capacity"), sessions=c.get("has_weekly_sessions"))
+    for ac in by_kind.get("classes", []):
+        w.add("classes", ac, name=ac.get("has_name"), year=ac.get("has_year"))
+    for p in by_kind.get("people", []):
+        w.add("people", p, id=p.get("has_id"), name=p.get("has_name"), class_code=p.get("has_class_code"),
+              year=p.get("has_year"), academic_class=w.ref("classes", p.get("belongs_to_class")))
+    for p in by_kind.get("people", []):
+        for c in p.get("teaches", []):
+            w.add("teaches", teacher=w.ref("people", [p["storid"]]), course=w.ref("courses", [c]))
+        for c in p.get("enrolled_in", []):
+            w.add("enrollments", student=w.ref("people", [p["storid"]]), course=w.ref("courses", [c]))
+    for act in by_kind.get("activities", []):
+        w.add("activities", act, capacity=act.get("required_capacity"))
+        for eq in act.get("requires_equipment", []):
+            w.add("requires", activity=w.ref("activities", [act["storid"]]), equipment=w.ref("equipment", [eq]))
+    for b in by_kind.get("bookings", []):
+        w.add("bookings", b, room=w.ref("rooms", b.get("booked_in_room")), start=b.get("has_start_time"),
+              end=b.get("has_end_time"), name=b.get("has_name"), teacher=w.ref("people", b.get("booked_by")),
+              activity=w.ref("activities", b.get("for_activity")), relocated=b.get("is_relocated"),
+              original_start=b.get("original_start_time"), original_end=b.get("original_end_time"))
+    w.write(path, onto.base_iri)
+
+class ColumnarData:
+    """A loaded columnar file: the ontology IRI, strings, and {table: {column: array}}."""
+    def __init__(self, base_iri, strings, tables):
+        self.base_iri = base_iri
+        self.strings = strings
+        self.tables = tables
+
+    def rows(self, table):
+        return len(self.tables[table][TABLES[table][0][0]])
+
+    def column(self, table, col):
+        """Column values decoded: strings, datetimes, bools and None for missing ones."""
+        kind = dict(TABLES[table])[col]
+        raw, none = self.tables[table][col], NONE[kind]
+        if kind == "s":
+            strings = self.strings
+            return [strings[v] if v != none else None for v in raw]
+        if kind == "t":
+            return [EPOCH + datetime.timedelta(seconds=v) if v != none else None for v in raw]
+        if kind == "b":
+            return [bool(v) if v != none else None for v in raw]
+        return [v if v != none else None for v in raw]
+
+    def records(self, table):
+        cols = [col for col, _ in TABLES[table]]
+        return [dict(zip(cols, values)) for values in zip(*(self.column(table, col) for col in cols))]
+
+    def to_snapshot(self, version=0):
+        """The read-side Snapshot of this data, without loading the ontology."""
+        from ontology.snapshot import Snapshot
+
+        rooms = self.records("rooms")
+        equipment = self.records("equipment")
+        people = self.records("people")
+        courses = self.records("courses")
+        classes = self.records("classes")
+
+        room_records = {}
+        for r in rooms:
+            room_records[r["name"]] = {"name": r["name"], "capacity": r["capacity"] or 0, "_equipment": []}
+        for eq in equipment:
+            if eq["room"] is not None:
+                room_records[rooms[eq["room"]]["name"]]["_equipment"].append(eq)
+        for record in room_records.values():
+            items = record.pop("_equipment")
+            broken = [eq["name"] for eq in items if eq["broken"]]
+            record.update(projector=bool(items), working_projector=bool(items) and not broken, broken=broken)
+
+        by_room = {name: [] for name in room_records}
+        for b in self.records("bookings"):
+            if b["room"] is None or b["start"] is None or b["end"] is None:
+                continue
+            prof = people[b["teacher"]] if b["teacher"] is not None else None
+            room = rooms[b["room"]]["name"]
+            by_room.setdefault(room, []).append({
+                "id": b["iri"], "room": room, "start": b["start"], "end": b["end"], "name": b["name"],
+                "teacher": prof["id"] if prof else None,
+                "teacher_name": prof["name"] if prof else "System/Maintenance",
+                "maintenance": b["name"] == "Maintenance", "relocated": bool(b["relocated"]),
+            })
+        by_room = {name: tuple(sorted(items, key=lambda x: x["start"])) for name, items in by_room.items()}
+
+        taught, enrolled = {}, {}
+        for row in self.records("teaches"):
+            c = courses[row["course"]]
+            taught.setdefault(row["teacher"], []).append({"name": c["name"], "year": c["year"], "semester": c["semester"]})
+        for row in self.records("enrollments"):
+            enrolled.setdefault(row["student"], []).append(courses[row["course"]]["name"])
+
+        teachers, students = [], []
+        for i, p in enumerate(people):
+            kinds = p["types"].split(",")
+            if "Teacher" in kinds:
+                teachers.append({"id": p["id"], "name": p["name"], "courses": taught.get(i, [])})
+            if "Student" in kinds:
+                students.append({"id": p["id"], "name": p["name"], "class": p["class_code"], "year": p["year"],
+                                 "courses": enrolled.get(i, [])})
+        return Snapshot(version, room_records, by_room, tuple(teachers), tuple(students))
+
+    def rebuild(self, onto):
+        """
+        Recreates the individuals in an ontology that only holds the classes, writing
+        the triples to the quadstore in bulk (as the RDF/XML parser does).
+        """
+        graph = onto.graph
+        props = {p.python_name: p.storid for p in onto.properties()}
+        classes = {c.name: c.storid for c in onto.classes()}
+        objs, datas = [], []
+        ids = {}
+
+        def add_entities(table):
+            made = []
+            for iri, types in zip(self.column(table, "iri"), self.column(table, "types")):
+                s = graph._abbreviate(onto.base_iri + iri)
+                objs.append((graph.c, s, rdf_type, owl_named_individual))
+                objs.extend((graph.c, s, rdf_type, classes[name]) for name in types.split(","))
+                made.append(s)
+            ids[table] = made
+            return made
+
+        def add_values(table, column, prop, target=None):
+            """Values of a column as property triples of the table's individuals (or of `target` rows)."""
+            for s, value in zip(ids[table], self.column(table, column)):
+                if value is None:
+                    continue
+                if target:
+                    objs.append((graph.c, s, props[prop], ids[target][value]))
+                else:
+                    o, d = to_literal(value)
+                    datas.append((graph.c, s, props[prop], o, d))
+
+        def add_links(table, subject, prop, obj, subject_table, obj_table):
+            for a, b in zip(self.column(table, subject), self.column(table, obj)):
+                objs.append((graph.c, ids[subject_table][a], props[prop], ids[obj_table][b]))
+
+        for table in ("rooms", "equipment", "courses", "classes", "people", "activities", "bookings"):
+            add_entities(table)
+        for table, column, prop, target in [
+            ("rooms", "name", "has_name", None), ("rooms", "capacity", "has_capacity", None),
+            ("equipment", "name", "has_name", None), ("equipment", "broken", "is_broken", None),
+            ("courses", "name", "has_name", None), ("courses", "year", "has_year", None),
+            ("courses", "semester", "has_semester", None), ("courses", "capacity", "required_capacity", None),
+            ("courses", "sessions", "has_weekly_sessions", None),
+            ("classes", "name", "has_name", None), ("classes", "year", "has_year", None),
+            ("people", "id", "has_id", None), ("people", "name", "has_name", None),
+            ("people", "class_code", "has_class_code", None), ("people", "year", "has_year", None),
+            ("people", "academic_class", "belongs_to_class", "classes"),
+            ("activities", "capacity", "required_capacity", None),
+            ("bookings", "name", "has_name", None), ("bookings", "start", "has_start_time", None),
+            ("bookings", "end", "has_end_time", None), ("bookings", "relocated", "is_relocated", None),
+            ("bookings", "original_start", "original_start_time", None),
+            ("bookings", "original_end", "original_end_time", None),
+            ("bookings", "room", "booked_in_room", "rooms"), ("bookings", "teacher", "booked_by", "people"),
+            ("bookings", "activity", "for_activity", "activities"),
+        ]:
+            add_values(table, column, prop, target)
+        # Equipment rows point at their room; the ontology links room -> equipment
+        for eq, room in zip(ids["equipment"], self.column("equipment", "room")):
+            if room is not None:
+                objs.append((graph.c, ids["rooms"][room], props["has_equipment"], eq))
+        add_links("teaches", "teacher", "teaches", "course", "people", "courses")
+        add_links("enrollments", "student", "enrolled_in", "course", "people", "courses")
+        add_links("requires", "activity", "requires_equipment", "equipment", "activities", "equipment")
+
+        graph.db.executemany("INSERT INTO objs VALUES (?, ?, ?, ?)", objs)
+        graph.db.executemany("INSERT INTO datas VALUES (?, ?, ?, ?, ?)", datas)
+
+def load(path):
+    """Reads a columnar file into a ColumnarData."""
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+
+    magic, version, string_count = struct.unpack_from("<4sHI", data, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} columnar snapshot.")
+    pos = struct.calcsize("<4sHI")
+
+    def blob():
+        nonlocal pos
+        (size,) = struct.unpack_from("<Q", data, pos)
+        pos += 8 + size
+        return data[pos - size:pos]
+
+    def column(typecode):
+        values = array.array(typecode)
+        values.frombytes(blob())
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    base_iri = bytes(blob()).decode("utf-8")
+    offsets = column("I")
+    text = bytes(blob()).decode("utf-8")
+    if len(text) == offsets[-1]:
+        # ASCII only: byte offsets are character offsets
+        strings = [text[offsets[i]:offsets[i + 1]] for i in range(string_count)]
+    else:
+        raw = text.encode("utf-8")
+        strings = [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(string_count)]
+
+    (table_count,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    tables = {}
+    for _ in range(table_count):
+        (length,) = struct.unpack_from("<B", data, pos)
+        name = bytes(data[pos + 1:pos + 1 + length]).decode("ascii")
+        pos += 1 + length + 4
+        tables[name] = {col: column(TYPECODES[kind]) for col, kind in TABLES[name]}
+    return ColumnarData(base_iri, strings, tables)
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if not argv or argv[0] not in ("pack", "export", "stats"):
+        print(__doc__)
+        return 1
+    command = argv[0]
+    if command == "pack":
+        from ontology.dei_department import onto
+        path = argv[1] if len(argv) > 1 else path_for(ONTOLOGY_FILE)
+        write(onto, path)
+        print(f"[System] Columnar snapshot written to {path} ({os.path.getsize(path)} bytes).")
+    elif command == "export":
+        if len(argv) < 2:
+            print("Usage: python -m ontology.columnar export FILE.owl")
+            return 1
+        from ontology.dei_department import onto
+        onto.save(file=argv[1], format="rdfxml")
+        print(f"[System] RDF/XML exported to {argv[1]}.")
+    else:
+        data = load(argv[1] if len(argv) > 1 else path_for(ONTOLOGY_FILE))
+        print(f"{len(data.strings)} strings")
+        for table in TABLES:
+            print(f"{table}: {data.rows(table)} rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,194 +3,268 @@ import sys
 import datetime
 import time
 import pathlib
+import threading
 from owlready2 import *
+import instrumentation
+from ontology import columnar
 
 BASE_PATH = pathlib.Path(__file__).parent.resolve()
-ONTOLOGY_FILE = str(BASE_PATH / "dei_room_management.owl")
+# DEI_ONTOLOGY_FILE points the system (or a benchmark) at another ontology file
+ONTOLOGY_FILE = os.environ.get("DEI_ONTOLOGY_FILE", str(BASE_PATH / "dei_room_management.owl"))
+
+# Columnar copy of the individuals (ontology/columnar.py), written by save(). When it
+# is up to date it is loaded instead of parsing the RDF/XML (DEI_COLUMNAR=0 disables it)
+COLUMNAR_FILE = columnar.path_for(ONTOLOGY_FILE)
 
 owlready2.JAVA_EXE = "java"
 
-if os.path.exists(ONTOLOGY_FILE):
-    onto = get_ontology(ONTOLOGY_FILE).load()
-else:
-    onto = get_ontology(ONTOLOGY_FILE)
-
-with onto:
-    # ONTOLOGY CLASSES (Categories)
-
-    # Room related classes
-    class Room(Thing):
-        pass
-
-    class RoomBooking(Thing):
-        pass
-
-    class Equipment(Thing):
-        pass
-
-    class Course(Thing):
-        pass
-
-    class AcademicClass(Thing):
-        pass
-    
-    # Person related classes
-    class Person(Thing):
-        pass
-    class Teacher(Person):
-        pass
-    class Student(Person):
-        pass
-    
-    # Activity related classes
-    class Activity(Thing):
-        pass
-    class Lecture(Activity):
-        pass
-    class Meeting(Activity):
-        pass
-    class Exam(Activity):
-        pass
-    class MaintenanceActivity(Activity):
-        pass
-    
-    # Other classes
-    class DayOfWeek(Thing):
-        pass
-
-    # OBJECT PROPERTIES (Relations)
-
-    class BookedInRoom(RoomBooking >> Room, FunctionalProperty):
-        python_name = "booked_in_room"
-
-    class ForActivity(RoomBooking >> Activity, FunctionalProperty):
-        python_name = "for_activity"
-
-    class HasEquipment(Room >> Equipment):
-        python_name = "has_equipment"
-
-    class RequiresEquipment(Activity >> Equipment):
-        python_name = "requires_equipment"
-
-    class OccursOnDay(RoomBooking >> DayOfWeek, FunctionalProperty):
-        python_name = "occurs_on_day"
-
-    class Teaches(Teacher >> Course):
-        python_name = "teaches"
-
-    class EnrolledIn(Student >> Course):
-        python_name = "enrolled_in"
-
-    class BelongsToClass(Student >> AcademicClass, FunctionalProperty):
-        python_name = "belongs_to_class"
-
-    # DATA PROPERTIES
-
-    class HasId(DataProperty, FunctionalProperty):
-        domain = [Person]
-        range = [int]
-        python_name = "has_id"
-
-    class HasName(DataProperty, FunctionalProperty):
-        domain = [Thing]
-        range = [str]
-        python_name = "has_name"
-
-    class HasCapacity(DataProperty, FunctionalProperty):
-        domain = [Room]
-        range = [int]
-        python_name = "has_capacity"
-
-    class RequiredCapacity(DataProperty, FunctionalProperty):
-        domain = [Activity | Course]
-        range = [int]
-        python_name = "required_capacity"
-
-    class IsBroken(DataProperty, FunctionalProperty):
-        domain = [Equipment]
-        range = [bool]
-        python_name = "is_broken"
-
-    class StartHour(DataProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [int]
-        python_name = "start_hour"
-
-    class HasYear(DataProperty, FunctionalProperty):
-        domain = [Student | Course | AcademicClass]
-        range = [int]
-        python_name = "has_year"
-
-    class HasClassCode(DataProperty, FunctionalProperty):
-        domain = [Student]
-        range = [str]
-        python_name = "has_class_code"
-    class HasSemester(DataProperty, FunctionalProperty):
-        domain = [Course]
-        range = [int]
-        python_name = "has_semester"
-
-    class HasStartTime(DataProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [datetime.datetime]
-        python_name = "has_start_time"
-
-    class HasEndTime(DataProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [datetime.datetime]
-        python_name = "has_end_time"
-
-    class BookedBy(ObjectProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [Teacher]
-        python_name = "booked_by"
-
-    class OriginalStartTime(DataProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [datetime.datetime]
-        python_name = "original_start_time"
+def _load_columnar():
+    # Not when the RDF/XML was changed after the last save (e.g. edited in Protege)
+    if os.environ.get("DEI_COLUMNAR") == "0" or not columnar.is_current(COLUMNAR_FILE, ONTOLOGY_FILE):
+        return None
+    try:
+        return columnar.load(COLUMNAR_FILE)
+    except (OSError, ValueError) as e:
+        print(f"[Warning] Columnar snapshot not loaded, using the RDF/XML: {e}")
+        return None
+
+# load() adds `onto`, `columnar_data` (the columnar file it was rebuilt from) and the classes
+_loaded = None
+_lock = threading.Lock()
+
+def load():
+    """
+    Loads the ontology and defines its classes, once per process; every module
+    shares the result. Importing this module does not load anything: the first
+    access to `onto` or to a class (e.g. dei_department.Room) calls load().
+    """
+    global _loaded
+    with _lock:
+        if _loaded is not None:
+            return _loaded
+        with instrumentation.timed("startup.ontology_load"):
+            data = _load_columnar()
+            if data is not None:
+                # The individuals are added once the classes are defined
+                ontology = get_ontology(data.base_iri)
+            elif os.path.exists(ONTOLOGY_FILE):
+                ontology = get_ontology(ONTOLOGY_FILE).load()
+            else:
+                ontology = get_ontology(ONTOLOGY_FILE)
+
+            # Ontology searches show up in the metrics (DEI_METRICS)
+            instrumentation.instrument_methods(ontology, "onto", ["search", "search_one"])
+            globals().update(_define_classes(ontology))
+            if data is not None:
+                data.rebuild(ontology)
+        globals().update(onto=ontology, columnar_data=data)
+        _loaded = ontology
+        return ontology
+
+def __getattr__(name):
+    # Module attributes (PEP 562): only reached for names load() has not defined yet
+    if name.startswith("__"):
+        raise AttributeError(name)
+    load()
+    try:
+        return globals()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+def _define_classes(onto):
+    with onto:
+        # ONTOLOGY CLASSES (Categories)
+
+        # Room related classes
+        class Room(Thing):
+            pass
+
+        class RoomBooking(Thing):
+            pass
+
+        class Equipment(Thing):
+            pass
+
+        class Course(Thing):
+            pass
+
+        class AcademicClass(Thing):
+            pass
+
+        # Person related classes
+        class Person(Thing):
+            pass
+        class Teacher(Person):
+            pass
+        class Student(Person):
+            pass
+
+        # Activity related classes
+        class Activity(Thing):
+            pass
+        class Lecture(Activity):
+            pass
+        class Meeting(Activity):
+            pass
+        class Exam(Activity):
+            pass
+        class MaintenanceActivity(Activity):
+            pass
+
+        # Other classes
+        class DayOfWeek(Thing):
+            pass
+
+        # OBJECT PROPERTIES (Relations)
+
+        class BookedInRoom(RoomBooking >> Room, FunctionalProperty):
+            python_name = "booked_in_room"
+
+        class ForActivity(RoomBooking >> Activity, FunctionalProperty):
+            python_name = "for_activity"
+
+        class HasEquipment(Room >> Equipment):
+            python_name = "has_equipment"
+
+        class RequiresEquipment(Activity >> Equipment):
+            python_name = "requires_equipment"
+
+        class OccursOnDay(RoomBooking >> DayOfWeek, FunctionalProperty):
+            python_name = "occurs_on_day"
+
+        class Teaches(Teacher >> Course):
+            python_name = "teaches"
+
+        class EnrolledIn(Student >> Course):
+            python_name = "enrolled_in"
+
+        class BelongsToClass(Student >> AcademicClass, FunctionalProperty):
+            python_name = "belongs_to_class"
+
+        # DATA PROPERTIES
+
+        class HasId(DataProperty, FunctionalProperty):
+            domain = [Person]
+            range = [int]
+            python_name = "has_id"
+
+        class HasName(DataProperty, FunctionalProperty):
+            domain = [Thing]
+            range = [str]
+            python_name = "has_name"
+
+        class HasCapacity(DataProperty, FunctionalProperty):
+            domain = [Room]
+            range = [int]
+            python_name = "has_capacity"
+
+        class RequiredCapacity(DataProperty, FunctionalProperty):
+            domain = [Activity | Course]
+            range = [int]
+            python_name = "required_capacity"
+
+        class IsBroken(DataProperty, FunctionalProperty):
+            domain = [Equipment]
+            range = [bool]
+            python_name = "is_broken"
 
-    class OriginalEndTime(DataProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [datetime.datetime]
-        python_name = "original_end_time"
+        class StartHour(DataProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [int]
+            python_name = "start_hour"
 
-    class IsRelocated(DataProperty, FunctionalProperty):
-        domain = [RoomBooking]
-        range = [bool]
-        python_name = "is_relocated"
+        class HasYear(DataProperty, FunctionalProperty):
+            domain = [Student | Course | AcademicClass]
+            range = [int]
+            python_name = "has_year"
 
-    # INFERRED CLASSES (First-Order Logic)
+        class HasClassCode(DataProperty, FunctionalProperty):
+            domain = [Student]
+            range = [str]
+            python_name = "has_class_code"
+        class HasSemester(DataProperty, FunctionalProperty):
+            domain = [Course]
+            range = [int]
+            python_name = "has_semester"
+
+        class HasWeeklySessions(DataProperty, FunctionalProperty):
+            domain = [Course]
+            range = [int]
+            python_name = "has_weekly_sessions"
+
+        class HasStartTime(DataProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [datetime.datetime]
+            python_name = "has_start_time"
 
-    class OverBookedRoom(Room):
-        equivalent_to = [Room & Inverse(BookedInRoom).some(RoomBooking)]
-    
-    class UnsuitableProjectorRoomBooking(RoomBooking):
-        equivalent_to = [RoomBooking & ForActivity.some(Activity & RequiresEquipment.some(Equipment & IsBroken.value(True)))]
+        class HasEndTime(DataProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [datetime.datetime]
+            python_name = "has_end_time"
 
+        class BookedBy(ObjectProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [Teacher]
+            python_name = "booked_by"
 
-    class AvailableRoom(Room):
-        equivalent_to = [Room & Not(Inverse(BookedInRoom).some(RoomBooking))]
+        class OriginalStartTime(DataProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [datetime.datetime]
+            python_name = "original_start_time"
 
-    class RelocatedBooking(RoomBooking):
-        equivalent_to = [RoomBooking & IsRelocated.value(True)]
+        class OriginalEndTime(DataProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [datetime.datetime]
+            python_name = "original_end_time"
 
-    class BrokenRoom(Room):
-        equivalent_to = [Room & HasEquipment.some(Equipment & IsBroken.value(True))]
+        class IsRelocated(DataProperty, FunctionalProperty):
+            domain = [RoomBooking]
+            range = [bool]
+            python_name = "is_relocated"
+
+        # INFERRED CLASSES (First-Order Logic)
+
+        class OverBookedRoom(Room):
+            equivalent_to = [Room & Inverse(BookedInRoom).some(RoomBooking)]
+
+        class UnsuitableProjectorRoomBooking(RoomBooking):
+            equivalent_to = [RoomBooking & ForActivity.some(Activity & RequiresEquipment.some(Equipment & IsBroken.value(True)))]
+
+
+        class AvailableRoom(Room):
+            equivalent_to = [Room & Not(Inverse(BookedInRoom).some(RoomBooking))]
+
+        class RelocatedBooking(RoomBooking):
+            equivalent_to = [RoomBooking & IsRelocated.value(True)]
+
+        class BrokenRoom(Room):
+            equivalent_to = [Room & HasEquipment.some(Equipment & IsBroken.value(True))]
+    return {name: value for name, value in locals().items() if isinstance(value, type)}
 
 
 # Helper Functions to interact with ontology
 
 
+@instrumentation.instrumented("save")
 def save():
+    load()
     with onto:
         try:
-            sync_reasoner(onto, infer_property_values=True, debug=False)
-            onto.save(file=ONTOLOGY_FILE, format="rdfxml")
+            with instrumentation.timed("save.sync_reasoner"):
+                sync_reasoner(onto, infer_property_values=True, debug=False)
+            _write_files()
             print("[System] Data reasoned and saved successfully.")
         except Exception as e:
+            instrumentation.count("save.reasoner_failures")
             print(f"[Warning] Reasoner found an inconsistency: {e}")
-            onto.save(file=ONTOLOGY_FILE, format="rdfxml")
+            _write_files()
+
+def _write_files():
+    with instrumentation.timed("save.serialize"):
+        onto.save(file=ONTOLOGY_FILE, format="rdfxml")
+    # Written last, so it is never older than the RDF/XML it mirrors
+    with instrumentation.timed("save.columnar"):
+        columnar.write(onto, COLUMNAR_FILE)
 
 def clean_onto():
 
@@ -198,6 +272,8 @@ def clean_onto():
 
     if os.path.exists(ONTOLOGY_FILE):
         try:
+            if os.path.exists(COLUMNAR_FILE):
+                os.remove(COLUMNAR_FILE)
             os.remove(ONTOLOGY_FILE)
             print(f"Successfully deleted Ontology!\n")
             print("!! NOTICE !!\nThe program must be restarted to clear Python class definitions.")
@@ -209,4 +285,4 @@ def clean_onto():
             print(f"Error deleting Ontology: {e}")
             return
     else:
-        print("No Ontology initialized!")
\ No newline at end of file
+        print("No Ontology initialized!")
@@ -0,0 +1,167 @@
+"""
+Booking history: past bookings moved out of the live ontology into SQLite.
+
+RoomBooking individuals are never removed when their date passes, so every
+search, reasoner run and save keeps paying for the whole history. archive()
+moves the bookings that ended before a cutoff (with their activity) into a
+compact table, and the live ontology only holds the active window. The
+history is read with BookingHistory.query() and usage() for reports.
+
+DEI_HISTORY_FILE points at the database; by default it sits next to the
+ontology file ("<ontology>_history.sqlite").
+"""
+import os
+import sqlite3
+import pathlib
+import datetime
+from owlready2 import destroy_entity
+
+BASE_PATH = pathlib.Path(__file__).parent.resolve()
+ONTOLOGY_FILE = os.environ.get("DEI_ONTOLOGY_FILE", str(BASE_PATH / "dei_room_management.owl"))
+HISTORY_FILE = os.environ.get("DEI_HISTORY_FILE", os.path.splitext(ONTOLOGY_FILE)[0] + "_history.sqlite")
+
+# Bookings that ended in the last KEEP_DAYS days stay in the ontology
+KEEP_DAYS = 7
+
+COLUMNS = ["id", "room", "start", "end", "name", "activity", "capacity", "teacher", "teacher_name",
+           "maintenance", "relocated", "original_start", "original_end", "archived_at"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id TEXT PRIMARY KEY,
+    room TEXT,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    name TEXT,
+    activity TEXT,
+    capacity INTEGER,
+    teacher INTEGER,
+    teacher_name TEXT,
+    maintenance INTEGER,
+    relocated INTEGER,
+    original_start TEXT,
+    original_end TEXT,
+    archived_at TEXT
+);
+CREATE INDEX IF NOT EXISTS bookings_start ON bookings (start);
+CREATE INDEX IF NOT EXISTS bookings_room ON bookings (room, start);
+CREATE INDEX IF NOT EXISTS bookings_teacher ON bookings (teacher, start);
+"""
+
+def _text(value):
+    return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value
+
+def archive_record(booking):
+    """Row of the history table for a RoomBooking individual."""
+    prof = booking.booked_by
+    act = booking.for_activity
+    return {
+        "id": booking.name,
+        "room": booking.booked_in_room.has_name if booking.booked_in_room else None,
+        "start": booking.has_start_time,
+        "end": booking.has_end_time,
+        "name": booking.has_name,
+        "activity": type(act).__name__ if act else None,
+        "capacity": act.required_capacity if act else None,
+        "teacher": prof.has_id if prof else None,
+        "teacher_name": prof.has_name if prof else "System/Maintenance",
+        "maintenance": booking.has_name == "Maintenance",
+        "relocated": bool(booking.is_relocated),
+        "original_start": booking.original_start_time,
+        "original_end": booking.original_end_time,
+    }
+
+class BookingHistory:
+    def __init__(self, path=None):
+        self.path = path or HISTORY_FILE
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def add(self, records, archived_at=None):
+        """Stores booking records (archive_record); a booking archived twice is replaced."""
+        archived_at = _text(archived_at or datetime.datetime.now())
+        rows = [[_text(r.get(c)) for c in COLUMNS[:-1]] + [archived_at] for r in records]
+        with self.db:
+            self.db.executemany(f"INSERT OR REPLACE INTO bookings ({', '.join(COLUMNS)}) "
+                                f"VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+        return len(rows)
+
+    def query(self, start=None, end=None, room=None, teacher=None):
+        """Archived bookings overlapping [start, end) (dates or datetimes), by start time."""
+        where, args = self._where(start, end, room, teacher)
+        rows = self.db.execute(f"SELECT * FROM bookings{where} ORDER BY start, room", args)
+        return [self._record(row) for row in rows]
+
+    def usage(self, start=None, end=None):
+        """Per room: number of archived bookings and hours booked, busiest first."""
+        where, args = self._where(start, end)
+        rows = self.db.execute(
+            "SELECT room, COUNT(*) AS bookings, "
+            "SUM((julianday(end) - julianday(start)) * 24) AS hours, "
+            f"SUM(maintenance) AS maintenance FROM bookings{where} GROUP BY room ORDER BY hours DESC, room",
+            args)
+        return [{"room": r["room"], "bookings": r["bookings"], "hours": round(r["hours"] or 0, 2),
+                 "maintenance": r["maintenance"]} for r in rows]
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def _where(self, start=None, end=None, room=None, teacher=None):
+        clauses, args = [], []
+        if start is not None:
+            clauses.append("end > ?")
+            args.append(_text(_moment(start)))
+        if end is not None:
+            clauses.append("start < ?")
+            args.append(_text(_moment(end)))
+        if room is not None:
+            clauses.append("room = ?")
+            args.append(room)
+        if teacher is not None:
+            clauses.append("teacher = ?")
+            args.append(teacher)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def _record(self, row):
+        record = dict(row)
+        for key in ("start", "end", "original_start", "original_end", "archived_at"):
+            if record[key]:
+                record[key] = datetime.datetime.fromisoformat(record[key])
+        record["maintenance"] = bool(record["maintenance"])
+        record["relocated"] = bool(record["relocated"])
+        return record
+
+def _moment(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.combine(value, datetime.time.min)
+
+def default_cutoff(today=None):
+    return _moment((today or datetime.date.today()) - datetime.timedelta(days=KEEP_DAYS))
+
+def archive(onto, history, cutoff=None, dry_run=False):
+    """
+    Moves the bookings that ended before the cutoff (default: KEEP_DAYS ago) to the
+    history and removes them, and their activity, from the ontology. The rows are
+    committed first, so an interrupted run never loses a booking. Nothing is saved:
+    the caller saves the ontology. Returns the archived records.
+    """
+    cutoff = _moment(cutoff) if cutoff is not None else default_cutoff()
+    old = [b for b in onto.RoomBooking.instances() if b.has_end_time and b.has_end_time <= cutoff]
+    records = [archive_record(b) for b in old]
+    if dry_run or not records:
+        return records
+
+    history.add(records)
+    with onto:
+        for b in old:
+            act = b.for_activity
+            destroy_entity(b)
+            # Activities belong to a single booking
+            if act is not None:
+                destroy_entity(act)
+    return records
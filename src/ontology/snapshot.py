@@ -0,0 +1,172 @@
+"""
+Read-only snapshots of the rooms and bookings, in plain Python objects.
+
+A Snapshot is never modified: a change makes a new one (with_changes) that
+shares every untouched room with the old one. Any number of threads can read
+it while one writer prepares the next version, and none of them touches the
+owlready2 world. Slot searches here follow BookingAgent's rules and order.
+
+Rooms: {name: {"name", "capacity", "projector", "working_projector", "broken"}}
+Bookings: {"id", "room", "start", "end", "name", "teacher", "teacher_name", "maintenance", "relocated"}
+Teachers: ({"id", "name", "courses": [{"name", "year", "semester"}]})
+Students: ({"id", "name", "class", "year", "courses": [name]})
+"""
+import datetime
+
+# DEI hours: 09:00-20:00 with 13:00-14:00 reserved
+OPEN_HOUR = 9
+CLOSE_HOUR = 20
+LUNCH_HOUR = 13
+
+def valid_block(start_hour, hours):
+    """True when a booking of whole hours follows the DEI opening and lunch rules."""
+    end_hour = start_hour + hours
+    return OPEN_HOUR <= start_hour and end_hour <= CLOSE_HOUR and not (start_hour < LUNCH_HOUR + 1 and end_hour > LUNCH_HOUR)
+
+def weekdays(start_date, end_date):
+    days = (start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days + 1))
+    return [d for d in days if d.weekday() < 5]
+
+def suggestion_hours(start_hour):
+    """Start hours tried when the requested one is full (the agent's hypothesis search)."""
+    return [h for h in range(OPEN_HOUR, CLOSE_HOUR) if h not in (LUNCH_HOUR, start_hour)]
+
+def room_record(room):
+    broken = [eq.has_name for eq in room.has_equipment if eq.is_broken]
+    return {"name": room.has_name, "capacity": room.has_capacity or 0, "projector": bool(room.has_equipment),
+            "working_projector": bool(room.has_equipment) and not broken, "broken": broken}
+
+def booking_record(booking):
+    prof = booking.booked_by
+    return {
+        "id": booking.name,
+        "room": booking.booked_in_room.has_name if booking.booked_in_room else None,
+        "start": booking.has_start_time,
+        "end": booking.has_end_time,
+        "name": booking.has_name,
+        "teacher": prof.has_id if prof else None,
+        "teacher_name": prof.has_name if prof else "System/Maintenance",
+        "maintenance": booking.has_name == "Maintenance",
+        "relocated": bool(booking.is_relocated),
+    }
+
+def teacher_record(teacher):
+    return {"id": teacher.has_id, "name": teacher.has_name,
+            "courses": [{"name": c.has_name, "year": c.has_year, "semester": c.has_semester} for c in teacher.teaches]}
+
+def student_record(student):
+    return {"id": student.has_id, "name": student.has_name, "class": student.has_class_code,
+            "year": student.has_year, "courses": [c.has_name for c in student.enrolled_in]}
+
+class Snapshot:
+    def __init__(self, version, rooms, by_room, teachers=(), students=()):
+        self.version = version
+        self.rooms = rooms
+        # Room name -> tuple of its bookings sorted by start
+        self.by_room = by_room
+        self.teachers = teachers
+        self.students = students
+        self.created = datetime.datetime.now()
+
+    def age(self):
+        """Seconds since the snapshot was read."""
+        return (datetime.datetime.now() - self.created).total_seconds()
+
+    @classmethod
+    def from_ontology(cls, onto, version=0):
+        """Reads every room and booking of the ontology (call it from the thread that owns the world)."""
+        rooms = {}
+        for r in onto.Room.instances():
+            rooms[r.has_name] = room_record(r)
+        by_room = {name: [] for name in rooms}
+        for b in onto.RoomBooking.instances():
+            if b.booked_in_room and b.has_start_time and b.has_end_time:
+                record = booking_record(b)
+                by_room.setdefault(record["room"], []).append(record)
+        by_room = {name: tuple(sorted(items, key=lambda x: x["start"])) for name, items in by_room.items()}
+        teachers = tuple(teacher_record(t) for t in onto.Teacher.instances())
+        students = tuple(student_record(s) for s in onto.Student.instances())
+        return cls(version, rooms, by_room, teachers, students)
+
+    def with_changes(self, added=(), removed=(), rooms=()):
+        """
+        Next version: added booking records, removed (room, booking id) pairs and
+        updated room records. Rooms without changes are shared with this snapshot.
+        """
+        by_room = dict(self.by_room)
+        changed = {}
+        for room, booking_id in removed:
+            changed.setdefault(room, list(by_room.get(room, ())))
+            changed[room] = [b for b in changed[room] if b["id"] != booking_id]
+        for record in added:
+            changed.setdefault(record["room"], list(by_room.get(record["room"], ())))
+            changed[record["room"]].append(record)
+        for room, items in changed.items():
+            by_room[room] = tuple(sorted(items, key=lambda x: x["start"]))
+
+        room_map = dict(self.rooms)
+        for record in rooms:
+            room_map[record["name"]] = record
+        return Snapshot(self.version + 1, room_map, by_room, self.teachers, self.students)
+
+    def bookings(self, room):
+        return self.by_room.get(room, ())
+
+    def is_busy(self, room, start, end):
+        return any(start < b["end"] and end > b["start"] for b in self.bookings(room))
+
+    def conflicts(self, room, start, end):
+        return [b for b in self.bookings(room) if start < b["end"] and end > b["start"]]
+
+    def available_rooms(self, capacity, start, end, needs_projector=False):
+        """Free rooms for the interval, smallest first (BookingAgent.get_available_rooms)."""
+        rooms = [
+            r for r in self.rooms.values()
+            if r["capacity"] >= capacity and (r["working_projector"] or not needs_projector)
+            and not self.is_busy(r["name"], start, end)
+        ]
+        rooms.sort(key=lambda r: r["capacity"])
+        return rooms
+
+    def slots_on(self, days, hours, capacity, num_hours, needs_proj, suggestion=False):
+        """Free (day, start hour, room) slots of the given weekdays and start hours, sorted."""
+        slots = []
+        for day in days:
+            for hour in hours:
+                if not valid_block(hour, num_hours):
+                    continue
+                start = datetime.datetime.combine(day, datetime.time.min).replace(hour=hour)
+                end = start + datetime.timedelta(hours=num_hours)
+                slots.extend({"date": day, "start": start, "end": end, "room": r["name"],
+                              "capacity": r["capacity"], "suggestion": suggestion}
+                             for r in self.available_rooms(capacity, start, end, needs_proj))
+        slots.sort(key=lambda s: (s["date"], s["start"], s["capacity"]))
+        return slots
+
+    def available_slots(self, capacity, start_date, end_date, start_hour, num_hours, needs_proj):
+        """
+        Same result as BookingAgent.get_available_slots_in_interval, without the world:
+        the requested hour on every weekday, or else every other hour as suggestions.
+        """
+        days = weekdays(start_date, end_date)
+        slots = self.slots_on(days, [start_hour], capacity, num_hours, needs_proj)
+        if not slots:
+            slots = self.slots_on(days, suggestion_hours(start_hour), capacity, num_hours, needs_proj, True)
+        return slots
+
+    def room_schedule(self, room, day):
+        return [b for b in self.bookings(room) if b["start"].date() == day]
+
+    def overbooked(self):
+        """[(room, [(booking, booking), ...])] for every room with overlapping bookings."""
+        report = []
+        for room, items in self.by_room.items():
+            pairs = []
+            for i, a in enumerate(items):
+                for b in items[i + 1:]:
+                    if b["start"] >= a["end"]:
+                        break
+                    pairs.append((a, b))
+            if pairs:
+                report.append((room, pairs))
+        return report
@@ -1,19 +1,5 @@
-import os
-import pathlib
-
 from agents.agent_room_booking import BookingAgent
-from owlready2 import *
-from ontology.dei_department import *
-
-BASE_PATH = pathlib.Path(__file__).parent.resolve()
-ONTOLOGY_FILE = str(BASE_PATH / "ontology" /"dei_room_management.owl")
-
-owlready2.JAVA_EXE = "java"
-
-if os.path.exists(ONTOLOGY_FILE):
-    onto = get_ontology(ONTOLOGY_FILE).load()
-else:
-    onto = get_ontology(ONTOLOGY_FILE)
+from ontology.dei_department import onto, save
 
 agent = BookingAgent(onto)
 
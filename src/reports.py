@@ -0,0 +1,157 @@
+"""
+Department reports computed from read-only Snapshots instead of the live ontology.
+
+A report never holds the owlready2 world, so it cannot stall a booking being
+saved. ReportReplica keeps a snapshot that is refreshed at most every
+`staleness` seconds and caches each report for the snapshot version it was
+computed on; with workers > 0 the reports run in separate processes (a
+Snapshot is plain data and is sent to them as is).
+
+Standalone, from src/ (reads the saved files in its own process, the columnar
+snapshot when it is current):
+    python reports.py overbooked|teachers|students|maintenance [--json]
+"""
+import sys
+import json
+import argparse
+import threading
+from datetime import datetime, date
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# Seconds a report may lag behind the bookings
+STALENESS = 30
+
+def overbooked(snap):
+    """Rooms with overlapping bookings (same result as BookingAgent.find_overbooked)."""
+    return [{"room": room, "conflicts": pairs} for room, pairs in snap.overbooked()]
+
+def teachers(snap):
+    return sorted(snap.teachers, key=lambda t: t["id"])
+
+def students(snap):
+    return sorted(snap.students, key=lambda s: s["id"])
+
+def maintenance(snap, today=None):
+    """Broken rooms, upcoming maintenance bookings and relocated bookings."""
+    today = today or date.today()
+    bookings = [b for items in snap.by_room.values() for b in items]
+    return {
+        "broken_rooms": [{"room": r["name"], "equipment": r["broken"]}
+                         for r in sorted(snap.rooms.values(), key=lambda r: r["name"]) if r["broken"]],
+        "maintenance": sorted((b for b in bookings if b["maintenance"] and b["start"].date() >= today),
+                              key=lambda b: b["start"]),
+        "relocated": sorted((b for b in bookings if b["relocated"]), key=lambda b: b["start"]),
+    }
+
+REPORTS = {
+    "overbooked": overbooked,
+    "teachers": teachers,
+    "students": students,
+    "maintenance": maintenance,
+}
+
+class ReportReplica:
+    """
+    Read replica for reports. `source` returns the latest Snapshot (e.g. the
+    one a server committed, or Snapshot.from_ontology on a private world).
+    """
+    def __init__(self, source, staleness=STALENESS, workers=0):
+        self.source = source
+        self.staleness = staleness
+        self.pool = ProcessPoolExecutor(workers) if workers else None
+        self.snap = None
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, max_age=None):
+        """The replica's snapshot, refreshed when older than max_age (default: the staleness)."""
+        max_age = self.staleness if max_age is None else max_age
+        with self._lock:
+            if self.snap is None or self.snap.age() > max_age:
+                self.snap = self.source()
+            return self.snap
+
+    def run(self, name, max_age=None):
+        """Returns (report, snapshot) for a report name; computed once per snapshot."""
+        report = REPORTS[name]
+        snap = self.snapshot(max_age)
+        compute = False
+        with self._lock:
+            cached = self.results.get(name)
+            if cached and cached[0] is snap:
+                future = cached[1]
+            else:
+                future = self.pool.submit(report, snap) if self.pool else Future()
+                compute = not self.pool
+                self.results[name] = (snap, future)
+        # In-process reports run outside the lock; other callers wait on the future
+        if compute:
+            try:
+                future.set_result(report(snap))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result(), snap
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+def print_report(name, result):
+    if name == "overbooked":
+        print("\n[Overbooked Rooms Report]")
+        for entry in result:
+            print(f"\n[!] CONFLICT DETECTED in Room: {entry['room']}")
+            for b1, b2 in entry["conflicts"]:
+                print("  Overlap found between:")
+                for b in (b1, b2):
+                    print(f"    - {b['name']} ({b['start'].strftime('%Y-%m-%d %H:%M')} to {b['end'].strftime('%H:%M')})")
+        if not result:
+            print("No time-slot conflicts found. All room schedules are valid.")
+    elif name == "teachers":
+        print("\n[List of Registered Teachers]\n")
+        for t in result:
+            details = [f"{c['name']} (Y{c['year']}S{c['semester']})" for c in t["courses"]]
+            print(f"ID: {t['id']}\n - Name: {t['name']}\n - Courses Taught: {', '.join(details) or 'None Assigned'}")
+            print("-" * 20)
+    elif name == "students":
+        print("\nList of Registered Students")
+        for s in result:
+            print(f"ID: {s['id']}\n - Name: {s['name']}\n - Class: {s['class']} (Year {s['year']})")
+            print(f" - Enrolled In: {', '.join(s['courses']) or 'None'}")
+            print("-" * 20)
+    else:
+        print("\n[Maintenance Report]\n")
+        for r in result["broken_rooms"]:
+            print(f"- Room: {r['room']} | Status: BROKEN | Affected Equipment: {', '.join(r['equipment'])}")
+        for b in result["maintenance"]:
+            print(f"- Maintenance: {b['room']} at {b['start'].strftime('%Y-%m-%d %H:%M')} - {b['end'].strftime('%H:%M')}")
+        for b in result["relocated"]:
+            print(f"- {b['name']}: Now in {b['room']} at {b['start'].strftime('%Y-%m-%d %H:%M')}")
+        if not any(result.values()):
+            print("All room equipment is currently functional. No repairs needed.")
+    print("\n" + "-" * 40)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DEI Room Management System - reports from the saved ontology.")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    from ontology import columnar
+    # The columnar file gives the snapshot without loading the ontology at all
+    snap = columnar.current_snapshot()
+    if snap is None:
+        from ontology.dei_department import onto
+        from ontology.snapshot import Snapshot
+        snap = Snapshot.from_ontology(onto)
+    result = REPORTS[args.report](snap)
+    if args.json:
+        print(json.dumps(result, default=_json_default, indent=2))
+    else:
+        print_report(args.report, result)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
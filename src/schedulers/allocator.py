@@ -0,0 +1,254 @@
+"""
+Batch allocation of many booking requests against one availability snapshot.
+
+Booking one request at a time in the smallest free room can block later,
+larger requests. Here all requests are placed together: first the most
+requests satisfied, then the fewest wasted seats (room capacity beyond what
+each request asked for).
+
+The root relaxation is a min-cost matching of requests to (room, day, start
+hour): when its placements do not overlap (e.g. every request has the same
+duration and start hours) it is already optimal. Otherwise it bounds a
+branch and bound search started from the greedy allocation.
+
+Rooms: [{"name", "capacity", "projector"}] (projector: has a working one)
+Busy: {room name: [(start datetime, end datetime)]} of the existing bookings
+Requests: [{"capacity", "projector", "date", "end_date", "hour", "to_hour", "hours"}]
+  any weekday from date to end_date, starting between hour and to_hour
+"""
+import sys
+import time
+import heapq
+from datetime import datetime, timedelta, time as day_time
+from ontology.snapshot import valid_block
+
+def busy_cells(busy):
+    """Hourly (room, day, hour) cells of the existing bookings."""
+    cells = set()
+    for room, intervals in busy.items():
+        for start, end in intervals:
+            t = start.replace(minute=0, second=0, microsecond=0)
+            while t < end:
+                cells.add((room, t.date(), t.hour))
+                t += timedelta(hours=1)
+    return cells
+
+def candidates(request, rooms, taken):
+    """Every free placement of a request as (waste, room, day, start hour), least waste first."""
+    fitting = [r for r in rooms if r["capacity"] >= request["capacity"] and (r["projector"] or not request.get("projector"))]
+    first_day = request["date"]
+    last_day = request.get("end_date") or first_day
+    hours = request["hours"]
+
+    found = []
+    for i in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=i)
+        if day.weekday() >= 5:
+            continue
+        for hour in range(request["hour"], (request.get("to_hour") or request["hour"]) + 1):
+            if not valid_block(hour, hours):
+                continue
+            for r in fitting:
+                if not any((r["name"], day, h) in taken for h in range(hour, hour + hours)):
+                    found.append((r["capacity"] - request["capacity"], r["name"], day, hour))
+    found.sort(key=lambda c: (c[0], c[2], c[3], c[1]))
+    return found
+
+def min_cost_matching(cands, deadline=None):
+    """
+    Most requests matched to distinct (room, day, start hour) placements at the least
+    total waste: successive shortest paths with potentials (all waste costs are >= 0).
+    Returns {request index: candidate}, or None when the deadline was reached.
+    """
+    n = len(cands)
+    cell_ids = {}
+    for options in cands:
+        for cand in options:
+            cell_ids.setdefault(cand[1:], len(cell_ids))
+    source, sink = n + len(cell_ids), n + len(cell_ids) + 1
+
+    # Edges as [to, capacity, cost, index of the reverse edge]
+    graph = [[] for _ in range(sink + 1)]
+    def add_edge(a, b, cost):
+        graph[a].append([b, 1, cost, len(graph[b])])
+        graph[b].append([a, 0, -cost, len(graph[a]) - 1])
+    for i, options in enumerate(cands):
+        add_edge(source, i, 0)
+        for cand in options:
+            add_edge(i, n + cell_ids[cand[1:]], cand[0])
+    for cell in cell_ids.values():
+        add_edge(n + cell, sink, 0)
+
+    potential = [0] * len(graph)
+    while True:
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        dist = [None] * len(graph)
+        back = [None] * len(graph)
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for e, (to, cap, cost, _) in enumerate(graph[v]):
+                nd = d + cost + potential[v] - potential[to]
+                if cap and (dist[to] is None or nd < dist[to]):
+                    dist[to] = nd
+                    back[to] = (v, e)
+                    heapq.heappush(heap, (nd, to))
+        if dist[sink] is None:
+            break
+        for v, d in enumerate(dist):
+            if d is not None:
+                potential[v] += d
+        v = sink
+        while v != source:
+            u, e = back[v]
+            graph[u][e][1] -= 1
+            graph[v][graph[u][e][3]][1] += 1
+            v = u
+
+    cells = {cell: key for key, cell in cell_ids.items()}
+    matching = {}
+    for i, options in enumerate(cands):
+        for to, cap, cost, _ in graph[i]:
+            if n <= to < source and not cap:
+                room, day, hour = cells[to - n]
+                matching[i] = (cost, room, day, hour)
+    return matching
+
+class BatchAllocator:
+    """Branch and bound over the requests, most constrained first."""
+    def __init__(self, requests, rooms, busy):
+        self.requests = requests
+        taken = busy_cells(busy)
+        self.cands = [candidates(req, rooms, taken) for req in requests]
+        # Fewest placements first, then the largest requests
+        self.order = sorted(range(len(requests)), key=lambda i: (len(self.cands[i]), -requests[i]["capacity"]))
+
+        self.used = set()
+        self.current = {}
+        self.best = {}
+        self.best_key = (-1, 0)
+        # Best possible (satisfied, -waste), from the relaxation
+        self.upper_key = None
+        self.nodes = 0
+        self.complete = True
+
+    def _cells(self, index, cand):
+        _, room, day, hour = cand
+        return [(room, day, h) for h in range(hour, hour + self.requests[index]["hours"])]
+
+    def overlapping(self, assignment):
+        """True when two placements of the assignment share an hour of a room."""
+        seen = set()
+        for index, cand in assignment.items():
+            for cell in self._cells(index, cand):
+                if cell in seen:
+                    return True
+                seen.add(cell)
+        return False
+
+    def relax(self, deadline):
+        """Solves the matching relaxation. Returns True when its answer is feasible (hence optimal)."""
+        matching = min_cost_matching(self.cands, deadline)
+        if matching is None:
+            return False
+        self.upper_key = (len(matching), -sum(c[0] for c in matching.values()))
+        if self.overlapping(matching):
+            return False
+        self.best_key = self.upper_key
+        self.best = matching
+        return True
+
+    def _record(self, satisfied, waste):
+        if (satisfied, -waste) > self.best_key:
+            self.best_key = (satisfied, -waste)
+            self.best = dict(self.current)
+
+    def greedy(self):
+        """Smallest free room for each request in order: the first incumbent."""
+        for index in self.order:
+            for cand in self.cands[index]:
+                cells = self._cells(index, cand)
+                if not any(c in self.used for c in cells):
+                    self.used.update(cells)
+                    self.current[index] = cand
+                    break
+        self._record(len(self.current), sum(c[0] for c in self.current.values()))
+        self.used.clear()
+        self.current.clear()
+
+    def remaining(self, k):
+        """(Requests from order[k:] with a free placement left, sum of their least free waste)."""
+        count, min_waste = 0, 0
+        for index in self.order[k:]:
+            # Candidates are sorted by waste: the first free one is the cheapest
+            free = next((cand for cand in self.cands[index]
+                         if not any(c in self.used for c in self._cells(index, cand))), None)
+            if free is not None:
+                count += 1
+                min_waste += free[0]
+        return count, min_waste
+
+    def search(self, k, satisfied, waste, deadline):
+        self.nodes += 1
+        if deadline is not None and time.monotonic() > deadline:
+            self.complete = False
+            return
+        if self.best_key == self.upper_key:
+            return
+        # Only the requests that still have a free placement can be satisfied
+        remaining, min_waste = self.remaining(k)
+        best_satisfied, best_waste = self.best_key[0], -self.best_key[1]
+        # Even placing every remaining request cannot beat the incumbent
+        if satisfied + remaining < best_satisfied:
+            return
+        # A tie on satisfied requests needs all of them placed, each at its least free waste or more
+        if satisfied + remaining == best_satisfied and waste + min_waste >= best_waste:
+            return
+        if k == len(self.order):
+            self._record(satisfied, waste)
+            return
+
+        index = self.order[k]
+        for cand in self.cands[index]:
+            cells = self._cells(index, cand)
+            if any(c in self.used for c in cells):
+                continue
+            self.used.update(cells)
+            self.current[index] = cand
+            self.search(k + 1, satisfied + 1, waste + cand[0], deadline)
+            del self.current[index]
+            self.used.difference_update(cells)
+            if not self.complete:
+                return
+        # Leave this request unsatisfied
+        self.search(k + 1, satisfied, waste, deadline)
+
+def allocate(requests, rooms, busy, timeout=5):
+    """
+    Assigns the requests together. Returns {"assigned": {request index: (room, start, end)},
+    "unassigned": [request index], "waste", "optimal", "nodes"}; optimal is False when
+    the time limit stopped the search (the best allocation found is returned).
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    engine = BatchAllocator(requests, rooms, busy)
+    engine.greedy()
+    if not engine.relax(deadline):
+        # One recursion level per request
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), len(requests) + 100))
+        engine.search(0, 0, 0, deadline)
+
+    assigned = {}
+    for index, (_, room, day, hour) in engine.best.items():
+        start = datetime.combine(day, day_time.min).replace(hour=hour)
+        assigned[index] = (room, start, start + timedelta(hours=requests[index]["hours"]))
+    return {
+        "assigned": assigned,
+        "unassigned": [i for i in range(len(requests)) if i not in assigned],
+        "waste": -engine.best_key[1],
+        "optimal": engine.complete,
+        "nodes": engine.nodes,
+    }
@@ -0,0 +1,202 @@
+"""
+In-process constraint solver for lecture timetabling: every (course, session)
+gets a (room, day, slot), without a PDDL planner subprocess.
+
+- Rooms that fit exactly the same courses form a capacity bucket; variables
+  take (bucket, day, slot) values and the concrete room is picked when the
+  value is assigned, so interchangeable rooms are never branched on.
+- Forward checking: assigning a value removes it from the other domains once
+  the bucket is full at that day and slot, and keeps the sessions of a course
+  in order (session 1 first). The generated PDDL encoding puts them on strictly
+  later days; the static domain allows the same day, so there the order is only
+  symmetry breaking: (day, slot) never decreases, ties allowed.
+- Variable order: fewest values left (MRV), then most competing variables (degree).
+"""
+import sys
+import time
+from schedulers import planner
+from schedulers.model import lecture_model, lecture_violations
+from instrumentation import instrumented
+
+def capacity_buckets(model):
+    """Groups the rooms that fit exactly the same courses: [(rooms, courses), ...]."""
+    fits = {}
+    for room, course in model["capacity_ok"]:
+        fits.setdefault(room, set()).add(course)
+    buckets = {}
+    for room in sorted(fits):
+        buckets.setdefault(frozenset(fits[room]), []).append(room)
+    return [(rooms, courses) for courses, rooms in buckets.items()]
+
+class LectureCSP:
+    """Backtracking search with forward checking over one lecture model."""
+    def __init__(self, model):
+        self.model = model
+        self.buckets = capacity_buckets(model)
+        self.day_index = {d: i for i, d in enumerate(model["days"])}
+        self.slot_index = {s: i for i, s in enumerate(model["slots"])}
+
+        self.variables = [
+            (course, n)
+            for course in model["courses"]
+            for n in range(1, model["sessions"].get(course, 0) + 1)
+        ]
+        # Buckets tried first are those fitting the fewest courses (least constraining)
+        order = sorted(range(len(self.buckets)), key=lambda b: len(self.buckets[b][1]))
+        self.domains = {}
+        for course, n in self.variables:
+            self.domains[(course, n)] = {
+                (b, d, s)
+                for b in order if course in self.buckets[b][1]
+                for d in model["days"] for s in model["slots"]
+            }
+        self.value_order = {b: i for i, b in enumerate(order)}
+
+        # Degree: how many other variables compete for the same buckets
+        users = {}
+        for var in self.variables:
+            for b in {v[0] for v in self.domains[var]}:
+                users[b] = users.get(b, 0) + 1
+        self.degree = {var: sum(users[b] for b in {v[0] for v in self.domains[var]}) for var in self.variables}
+
+        self.free = {}
+        for b, (rooms, _) in enumerate(self.buckets):
+            for d in model["days"]:
+                for s in model["slots"]:
+                    self.free[(b, d, s)] = list(rooms)
+
+        self.assignment = {}
+        self.nodes = 0
+        self.backtracks = 0
+
+    def _select_variable(self):
+        unassigned = [var for var in self.variables if var not in self.assignment]
+        return min(unassigned, key=lambda var: (len(self.domains[var]), -self.degree[var]))
+
+    def _ordered_values(self, var):
+        return sorted(self.domains[var], key=lambda v: (self.value_order[v[0]], self.day_index[v[1]], v[2]))
+
+    def _key(self, value):
+        """Position of a value in the session order: the day, then the slot unless days must differ."""
+        day = self.day_index[value[1]]
+        return (day, 0) if self.model["distinct_days"] else (day, self.slot_index[value[2]])
+
+    def too_many_sessions(self):
+        """Courses whose sessions cannot all get a different day."""
+        if not self.model["distinct_days"]:
+            return []
+        return [c for c in self.model["courses"] if self.model["sessions"].get(c, 0) > len(self.model["days"])]
+
+    def _prune(self, var, value, trail):
+        """Forward checking after var = value. Returns False if some domain became empty."""
+        course, n = var
+        b, d, s = value
+        for other in self.variables:
+            if other in self.assignment:
+                continue
+            removed = set()
+            if not self.free[(b, d, s)]:
+                removed.update({value} & self.domains[other])
+            if other[0] == course:
+                # Earlier sessions before this one and later ones after it (strictly with distinct days)
+                key = self._key(value)
+                strict = self.model["distinct_days"]
+                if other[1] < n:
+                    removed.update(v for v in self.domains[other]
+                                   if self._key(v) > key or (strict and self._key(v) == key))
+                else:
+                    removed.update(v for v in self.domains[other]
+                                   if self._key(v) < key or (strict and self._key(v) == key))
+            if removed:
+                self.domains[other] -= removed
+                trail.append((other, removed))
+                if not self.domains[other]:
+                    return False
+        return True
+
+    def solve(self, deadline=None):
+        """Returns True (solved), False (proven impossible) or None (deadline reached)."""
+        if len(self.assignment) == len(self.variables):
+            return True
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+
+        var = self._select_variable()
+        for value in self._ordered_values(var):
+            self.nodes += 1
+            room = self.free[value].pop()
+            self.assignment[var] = (value, room)
+            trail = []
+            if self._prune(var, value, trail):
+                found = self.solve(deadline)
+                if found is not False:
+                    return found
+            # Undo
+            self.backtracks += 1
+            for other, removed in trail:
+                self.domains[other] |= removed
+            del self.assignment[var]
+            self.free[value].append(room)
+        return False
+
+    def schedule(self):
+        schedule = []
+        for (course, n), ((_, d, s), room) in self.assignment.items():
+            schedule.append({"course": course, "room": room, "day": d, "slot": s, "session": n})
+        schedule.sort(key=planner._day_slot_key)
+        return schedule
+
+@instrumented("csp.solve")
+def solve(mode, timeout=None, problem=None):
+    """
+    Solves a lectures mode (or an already parsed problem) with the constraint solver.
+    Returns a result dictionary like planner.solve(), with planner "csp".
+    """
+    start = time.monotonic()
+    model = lecture_model(problem or planner.load_problem(mode))
+    csp = LectureCSP(model)
+    # One recursion level per session
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), len(csp.variables) + 100))
+    # More sessions than days can never be placed: no search needed to prove it
+    found = False if csp.too_many_sessions() else csp.solve(None if timeout is None else start + timeout)
+
+    outcome = {"mode": mode, "planner": "csp", "schedule": None, "cached": False}
+    if found:
+        outcome["status"] = "SOLVED_SATISFICING"
+        outcome["schedule"] = csp.schedule()
+        # The search should never break a rule; a wrong answer must not look like a plan
+        violations = lecture_violations(model, outcome["schedule"])
+        if violations:
+            outcome["status"] = "INTERNAL_ERROR"
+            outcome["schedule"] = None
+    elif found is False:
+        outcome["status"] = "UNSOLVABLE_PROVEN"
+    else:
+        outcome["status"] = "TIMEOUT"
+    outcome["stats"] = {
+        "variables": len(csp.variables),
+        "buckets": len(csp.buckets),
+        "nodes": csp.nodes,
+        "backtracks": csp.backtracks,
+        "search_time": round(time.monotonic() - start, 6),
+    }
+    return outcome
+
+def run_csp_scheduler(mode, timeout=None):
+    """Menu entry point: solves a lectures mode with the constraint solver and prints the schedule."""
+    print(f"\n[Planning {mode.capitalize()}]\n")
+    print("Solving using the constraint solver...")
+    try:
+        outcome = solve(mode, timeout)
+    except Exception as e:
+        print(f"Error running the constraint solver: {e}")
+        return
+
+    stats = outcome["stats"]
+    print(f"{stats['variables']} sessions, {stats['buckets']} room buckets, "
+          f"{stats['nodes']} nodes, {stats['backtracks']} backtracks in {stats['search_time']:.2f}s.")
+    if outcome["schedule"] is None:
+        print(f"No plan found. Status: {outcome['status']}")
+        return
+    planner.print_schedule(mode, outcome["schedule"])
+    return outcome["schedule"]
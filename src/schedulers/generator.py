@@ -0,0 +1,449 @@
+import re
+import random
+import pathlib
+import datetime
+
+BASE_PATH = pathlib.Path(__file__).parent.resolve()
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+SLOTS = ["slot_09_11", "slot_11_13", "slot_14_16", "slot_16_18", "slot_18_20"]
+
+# Lectures per week when the ontology does not say otherwise (the static domain's value)
+DEFAULT_SESSIONS = 2
+
+# Sentinels of the session encoding: a day after the last day, and a room that is
+# always occupied (the predecessor of the first room of each interchangeable group)
+END_DAY = "EndOfWeek"
+NO_ROOM = "NoRoom"
+
+# Exam epochs: two exams of the same class group need at least this many days between
+# them (problem_exams.pddl marks X+1..X+5 as too close), and two exams fit in a day
+DEFAULT_EXAM_GAP = 6
+DAILY_SLOTS = ["SlotA", "SlotB"]
+END_EPOCH = "EndOfEpoch"
+
+def pddl_name(name):
+    """Turns an ontology name (e.g. 'G.5.1') into a PDDL object name ('G_5_1')."""
+    return re.sub(r"[^A-Za-z0-9_]", "_", name)
+
+# Department data: {"courses": [{"name", "capacity", "sessions"}], "rooms": [{"name", "capacity"}]}
+# (optionally "capacity_pairs": [(room, course)], which then replaces the capacity comparison)
+
+def department_from_ontology(onto, semester=None):
+    """Reads the courses (optionally of one semester) and rooms of the ontology."""
+    courses = []
+    for c in onto.Course.instances():
+        if semester is not None and c.has_semester != semester:
+            continue
+        courses.append({
+            "name": pddl_name(c.has_name),
+            "capacity": c.required_capacity or 0,
+            "sessions": c.has_weekly_sessions or DEFAULT_SESSIONS
+        })
+    rooms = [{"name": pddl_name(r.has_name), "capacity": r.has_capacity or 0} for r in onto.Room.instances()]
+    return {"courses": courses, "rooms": rooms}
+
+def synthetic_department(num_courses, num_rooms, sessions=DEFAULT_SESSIONS, seed=0):
+    """Random but reproducible department for benchmarks (capacities in DEI-like ranges)."""
+    rng = random.Random(seed)
+    rooms = [{"name": f"R{i + 1}", "capacity": rng.choice([15, 50, 90, 120, 160, 280, 320])} for i in range(num_rooms)]
+    largest = max(r["capacity"] for r in rooms)
+    courses = [
+        {"name": f"C{i + 1}", "capacity": rng.randint(10, largest), "sessions": sessions}
+        for i in range(num_courses)
+    ]
+    return {"courses": courses, "rooms": rooms}
+
+def capacity_pairs(department):
+    """(room, course) pairs where the room is big enough for the course."""
+    if "capacity_pairs" in department:
+        # Departments read back from a PDDL problem only know the pairs
+        return department["capacity_pairs"]
+    return [
+        (r["name"], c["name"])
+        for c in department["courses"]
+        for r in department["rooms"]
+        if r["capacity"] >= c["capacity"]
+    ]
+
+def _facts(name, pairs, per_line=4):
+    """Formats facts a few per line, like the hand-written problem files."""
+    facts = [f"({name} {' '.join(args)})" for args in pairs]
+    return "\n".join("        " + " ".join(facts[i:i + per_line]) for i in range(0, len(facts), per_line))
+
+# Baseline encoding: exactly domain_lectures.pddl (two sessions per course)
+
+def lecture_domain_baseline():
+    with open(BASE_PATH / "lectures" / "domain_lectures.pddl", encoding="utf-8") as f:
+        return f.read()
+
+def lecture_problem_baseline(department, days=DAYS, slots=SLOTS):
+    """Problem for domain_lectures.pddl; session counts are ignored (always two)."""
+    courses = " ".join(c["name"] for c in department["courses"])
+    rooms = " ".join(r["name"] for r in department["rooms"])
+    goals = _facts("course_scheduled_2", [(c["name"],) for c in department["courses"]])
+    return f"""(define (problem dei_lectures_problem)
+    (:domain dei_lectures_domain)
+
+    (:objects
+        {courses} - course
+        {rooms} - room
+        {' '.join(days)} - day
+        {' '.join(slots)} - slot
+    )
+
+    (:init
+{_facts("capacity_ok", capacity_pairs(department))}
+    )
+
+    (:goal (and
+{goals}
+    ))
+)
+"""
+
+# Session encoding: N sessions per course
+#  - Rule change, not symmetry breaking: the sessions of a course go on different
+#    days. domain_lectures.pddl allows two sessions of a course on one day; weekly
+#    lectures are meant to be spread over the week, so this encoding solves a
+#    stricter problem. With that rule, taking the sessions in order (session_1,
+#    session_2, ...) on strictly later days only removes session permutations:
+#    each course has a day cursor moving along a precomputed day_next chain, so no
+#    "previous day" parameter is needed, and each session is limited to the days
+#    that still leave room for the sessions after it (course_session_day)
+#  - symmetry breaking: rooms that fit exactly the same courses are interchangeable,
+#    they are filled in a fixed order (room_before), so equivalent room permutations
+#    are never explored
+#  - a course needing more sessions than there are days gets no course_session_day
+#    facts, so the problem is unsolvable (never a smaller goal)
+
+LECTURE_DOMAIN_SESSIONS = """(define (domain dei_lectures_sessions_domain)
+    (:requirements :strips :typing :equality :negative-preconditions)
+
+    (:types course room day slot session - object)
+
+    (:predicates
+        (capacity_ok ?r - room ?c - course)
+        (room_occupied ?r - room ?d - day ?s - slot)
+        (room_before ?r1 - room ?r2 - room)
+        (next_session ?n1 - session ?n2 - session)
+        (session_done ?c - course ?n - session)
+        (course_session_day ?c - course ?n - session ?d - day)
+        (day_next ?d1 - day ?d2 - day)
+        (course_cursor ?c - course ?d - day)
+    )
+
+    (:action schedule_session
+        :parameters (?c - course ?r - room ?d - day ?s - slot ?n - session ?prev - session ?p - room ?next - day)
+        :precondition (and
+            (next_session ?prev ?n)
+            (session_done ?c ?prev)
+            (not (session_done ?c ?n))
+            (course_session_day ?c ?n ?d)
+            (course_cursor ?c ?d)
+            (day_next ?d ?next)
+            (capacity_ok ?r ?c)
+            (room_before ?p ?r)
+            (room_occupied ?p ?d ?s)
+            (not (room_occupied ?r ?d ?s))
+        )
+        :effect (and
+            (session_done ?c ?n)
+            (room_occupied ?r ?d ?s)
+            (not (course_cursor ?c ?d))
+            (course_cursor ?c ?next)
+        )
+    )
+
+    ; Skips a day for a course (its next session goes later in the week)
+    (:action advance_day
+        :parameters (?c - course ?d - day ?next - day)
+        :precondition (and
+            (course_cursor ?c ?d)
+            (day_next ?d ?next)
+        )
+        :effect (and
+            (not (course_cursor ?c ?d))
+            (course_cursor ?c ?next)
+        )
+    )
+)
+"""
+
+def lecture_domain_sessions():
+    return LECTURE_DOMAIN_SESSIONS
+
+def room_groups(department):
+    """Groups rooms that fit exactly the same courses (interchangeable for the planner)."""
+    fits = {}
+    for room, course in capacity_pairs(department):
+        fits.setdefault(room, set()).add(course)
+    groups = {}
+    for r in department["rooms"]:
+        key = frozenset(fits.get(r["name"], set()))
+        if key:
+            groups.setdefault(key, []).append(r["name"])
+    return list(groups.values())
+
+def too_many_sessions(department, days=DAYS):
+    """Courses needing more weekly sessions than there are days (they cannot be scheduled)."""
+    return [c["name"] for c in department["courses"] if c["sessions"] > len(days)]
+
+def lecture_problem_sessions(department, days=DAYS, slots=SLOTS):
+    """Problem for the session encoding; each course needs its own number of sessions."""
+    max_sessions = max([c["sessions"] for c in department["courses"]] + [1])
+    sessions = [f"session_{n}" for n in range(max_sessions + 1)]
+
+    room_order = []
+    for group in room_groups(department):
+        chain = [NO_ROOM] + sorted(group)
+        room_order += list(zip(chain, chain[1:]))
+
+    day_chain = list(days) + [END_DAY]
+    session_days = []
+    done = []
+    for c in department["courses"]:
+        n_sessions = c["sessions"]
+        done.append((c["name"], sessions[0]))
+        for n in range(1, n_sessions + 1):
+            # Session n needs n-1 days before it and n_sessions-n days after it
+            for d in days[n - 1:len(days) - (n_sessions - n)]:
+                session_days.append((c["name"], sessions[n], d))
+
+    goals = []
+    for c in department["courses"]:
+        goals.append((c["name"], sessions[c["sessions"]]))
+
+    courses = " ".join(c["name"] for c in department["courses"])
+    rooms = " ".join([r["name"] for r in department["rooms"]] + [NO_ROOM])
+    return f"""(define (problem dei_lectures_sessions_problem)
+    (:domain dei_lectures_sessions_domain)
+
+    (:objects
+        {courses} - course
+        {rooms} - room
+        {' '.join(day_chain)} - day
+        {' '.join(slots)} - slot
+        {' '.join(sessions)} - session
+    )
+
+    (:init
+        ; Capacity Checks
+{_facts("capacity_ok", capacity_pairs(department))}
+
+        ; Interchangeable rooms are filled in order; NoRoom is always occupied
+{_facts("room_before", room_order)}
+{_facts("room_occupied", [(NO_ROOM, d, s) for d in days for s in slots])}
+
+        ; Session order and the days each session may use
+{_facts("next_session", list(zip(sessions, sessions[1:])))}
+{_facts("session_done", done)}
+{_facts("course_session_day", session_days, per_line=3)}
+
+        ; Day successor chain and the starting day of every course
+{_facts("day_next", list(zip(day_chain, day_chain[1:])))}
+{_facts("course_cursor", [(c["name"], days[0]) for c in department["courses"]])}
+    )
+
+    (:goal (and
+{_facts("session_done", goals)}
+    ))
+)
+"""
+
+def write_generated_lectures(department):
+    """Writes the session encoding files used by the 'lectures_generated' planning mode."""
+    folder = BASE_PATH / "lectures"
+    (folder / "generated_domain_lectures.pddl").write_text(lecture_domain_sessions(), encoding="utf-8")
+    (folder / "generated_problem_lectures.pddl").write_text(lecture_problem_sessions(department), encoding="utf-8")
+
+# Exam data: {"courses": [{"name", "capacity", "class_group"}], "rooms": [{"name", "capacity"}]}
+
+def synthetic_exam_department(num_groups, courses_per_group, num_rooms, seed=0):
+    """Random but reproducible exam season: every class group sits a few course exams."""
+    rng = random.Random(seed)
+    rooms = [{"name": f"R{i + 1}", "capacity": rng.choice([15, 50, 90, 120, 160, 280, 320])} for i in range(num_rooms)]
+    largest = max(r["capacity"] for r in rooms)
+    courses = []
+    for g in range(num_groups):
+        for i in range(courses_per_group):
+            courses.append({
+                "name": f"C{g + 1}_{i + 1}",
+                "capacity": rng.randint(10, largest),
+                "class_group": f"G{g + 1}"
+            })
+    return {"courses": courses, "rooms": rooms}
+
+def epoch_days(start, num_days):
+    """(DayN name, is_weekend) of every day of an epoch; Day1 is the start date."""
+    days = []
+    for i in range(num_days):
+        date = start + datetime.timedelta(days=i)
+        days.append((f"Day{i + 1}", date.weekday() >= 5))
+    return days
+
+def _exam_objects(department):
+    courses = " ".join(c["name"] for c in department["courses"])
+    groups = " ".join(sorted(set(c["class_group"] for c in department["courses"])))
+    rooms = " ".join(r["name"] for r in department["rooms"])
+    return courses, groups, rooms
+
+# Baseline encoding: exactly domain_exams.pddl (conditional spacing effect over every day)
+
+def exam_domain_baseline():
+    with open(BASE_PATH / "exams" / "domain_exams.pddl", encoding="utf-8") as f:
+        return f.read()
+
+def exam_problem_baseline(department, start, num_days, min_gap=DEFAULT_EXAM_GAP, slots=SLOTS):
+    """Problem for domain_exams.pddl: every day of the epoch, weekends and days_too_close facts."""
+    days = epoch_days(start, num_days)
+    names = [d for d, _ in days]
+    too_close = [
+        (names[i], names[j])
+        for i in range(num_days)
+        for j in range(i + 1, min(num_days, i + min_gap))
+    ]
+    courses, groups, rooms = _exam_objects(department)
+    belongs = [(c["name"], c["class_group"]) for c in department["courses"]]
+    goals = _facts("exam_scheduled", [(c["name"],) for c in department["courses"]])
+    return f"""(define (problem dei_exams_problem)
+    (:domain dei_exams_domain)
+
+    (:objects
+        {courses} - course
+        {groups} - class_group
+        {rooms} - room
+        {' '.join(names)} - day
+        {' '.join(slots)} - slot
+        {' '.join(DAILY_SLOTS)} - daily_slot
+    )
+
+    (:init
+        ; Mappings
+{_facts("course_belongs_to", belongs)}
+
+        ; Capacity
+{_facts("capacity_ok", capacity_pairs(department))}
+
+        ; Weekend Definition
+{_facts("is_weekend", [(d,) for d, weekend in days if weekend])}
+
+        ; Spacing Logic
+{_facts("days_too_close", too_close, per_line=5)}
+    )
+
+    (:goal (and
+{goals}
+    ))
+)
+"""
+
+# Compact encoding: the conditional effect is compiled out
+#  - each class group has a day cursor; its exams are taken in chronological order,
+#    and scheduling on day d moves the cursor straight to gap_successor(d), the first
+#    weekday at least min_gap days later (precomputed, one fact per day)
+#  - advance_day skips a day for a class group along the day_next chain
+#  - weekend days are not objects at all, so nothing is grounded for them
+# Any valid schedule of the baseline, sorted by day, is a plan here and vice versa.
+
+EXAM_DOMAIN_COMPACT = """(define (domain dei_exams_compact_domain)
+    (:requirements :strips :typing :equality :negative-preconditions)
+
+    (:types
+        course room day slot class_group daily_slot - object
+    )
+
+    (:predicates
+        (capacity_ok ?r - room ?c - course)
+        (course_belongs_to ?c - course ?cg - class_group)
+        (room_occupied ?r - room ?d - day ?s - slot)
+        (exam_scheduled ?c - course)
+        (day_slot_used ?d - day ?ds - daily_slot)
+        (class_cursor ?cg - class_group ?d - day)
+        (day_next ?d1 - day ?d2 - day)
+        (gap_successor ?d1 - day ?d2 - day)
+    )
+
+    (:action schedule_exam
+        :parameters (?c - course ?cg - class_group ?r - room ?d - day ?s - slot ?ds - daily_slot ?next - day)
+        :precondition (and
+            (not (exam_scheduled ?c))
+            (course_belongs_to ?c ?cg)
+            (capacity_ok ?r ?c)
+            (class_cursor ?cg ?d)
+            (gap_successor ?d ?next)
+            (not (room_occupied ?r ?d ?s))
+            (not (day_slot_used ?d ?ds))
+        )
+        :effect (and
+            (exam_scheduled ?c)
+            (room_occupied ?r ?d ?s)
+            (day_slot_used ?d ?ds)
+            (not (class_cursor ?cg ?d))
+            (class_cursor ?cg ?next)
+        )
+    )
+
+    ; Leaves a day without exams for a class group
+    (:action advance_day
+        :parameters (?cg - class_group ?d - day ?next - day)
+        :precondition (and
+            (class_cursor ?cg ?d)
+            (day_next ?d ?next)
+        )
+        :effect (and
+            (not (class_cursor ?cg ?d))
+            (class_cursor ?cg ?next)
+        )
+    )
+)
+"""
+
+def exam_domain_compact():
+    return EXAM_DOMAIN_COMPACT
+
+def exam_problem_compact(department, start, num_days, min_gap=DEFAULT_EXAM_GAP, slots=SLOTS):
+    """Problem for the compact encoding: weekdays only, with day_next and gap_successor chains."""
+    offsets = [i for i, (_, weekend) in enumerate(epoch_days(start, num_days)) if not weekend]
+    names = [f"Day{i + 1}" for i in offsets]
+    chain = names + [END_EPOCH]
+
+    gap_successors = []
+    for k, offset in enumerate(offsets):
+        later = [j for j, o in enumerate(offsets) if o >= offset + min_gap]
+        gap_successors.append((names[k], names[later[0]] if later else END_EPOCH))
+
+    courses, groups, rooms = _exam_objects(department)
+    group_names = sorted(set(c["class_group"] for c in department["courses"]))
+    belongs = [(c["name"], c["class_group"]) for c in department["courses"]]
+    goals = _facts("exam_scheduled", [(c["name"],) for c in department["courses"]])
+    return f"""(define (problem dei_exams_compact_problem)
+    (:domain dei_exams_compact_domain)
+
+    (:objects
+        {courses} - course
+        {groups} - class_group
+        {rooms} - room
+        {' '.join(chain)} - day
+        {' '.join(slots)} - slot
+        {' '.join(DAILY_SLOTS)} - daily_slot
+    )
+
+    (:init
+        ; Mappings
+{_facts("course_belongs_to", belongs)}
+
+        ; Capacity
+{_facts("capacity_ok", capacity_pairs(department))}
+
+        ; Weekday chain, first allowed day after an exam, and where every class group starts
+{_facts("day_next", list(zip(chain, chain[1:])))}
+{_facts("gap_successor", gap_successors)}
+{_facts("class_cursor", [(g, chain[0]) for g in group_names])}
+    )
+
+    (:goal (and
+{goals}
+    ))
+)
+"""
@@ -0,0 +1,179 @@
+import re
+import time
+import queue
+import multiprocessing
+
+# Live progress lines printed by Fast Downward while searching
+PROGRESS_RE = re.compile(r"(\d+) evaluated, (\d+) expanded")
+
+# How often (seconds) a worker reports search progress to the parent
+PROGRESS_INTERVAL = 0.5
+
+class _ProgressStream:
+    """File-like sink for the engine output that forwards progress to the parent process."""
+    def __init__(self, updates):
+        self.updates = updates
+        self.last_report = 0
+
+    def write(self, text):
+        if "Running translator" in text:
+            self.updates.put(("phase", "grounding"))
+        elif "Running search" in text:
+            self.updates.put(("phase", "searching"))
+
+        match = PROGRESS_RE.search(text)
+        if match and time.monotonic() - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = time.monotonic()
+            self.updates.put(("progress", {"evaluated": int(match.group(1)), "expanded": int(match.group(2))}))
+
+    def flush(self):
+        pass
+
+def _job_worker(mode, planner_name, timeout, updates):
+    """Runs one planner job inside a worker process, reporting through the updates queue."""
+    # Imported in the worker, so that importing this module (the interface) stays cheap
+    from schedulers import planner
+    try:
+        # Cancelling a job terminates this process with SIGTERM
+        planner.stop_engines_on_sigterm()
+        updates.put(("phase", "parsing"))
+        outcome = planner.solve(mode, planner_name, timeout=timeout, output_stream=_ProgressStream(updates))
+        updates.put(("done", outcome))
+    except Exception as e:
+        updates.put(("failed", str(e)))
+
+class PlanningJob:
+    """Handle of a planner run executing in a background worker process."""
+    def __init__(self, job_id, mode, planner_name, timeout=None):
+        self.id = job_id
+        self.mode = mode
+        self.planner_name = planner_name
+        self.status = "queued"
+        self.phase = None
+        self.stats = {}
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+
+        self._updates = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_job_worker, args=(mode, planner_name, timeout, self._updates), daemon=True
+        )
+
+    def start(self):
+        self.started = time.monotonic()
+        self.status = "running"
+        self._process.start()
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def is_finished(self):
+        return self.status in ["done", "failed", "cancelled"]
+
+    def poll(self):
+        """Applies the updates sent by the worker so far. Returns the current status."""
+        if self.is_finished():
+            return self.status
+
+        while True:
+            try:
+                kind, payload = self._updates.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "phase":
+                self.phase = payload
+            elif kind == "progress":
+                self.stats.update(payload)
+            elif kind == "done":
+                self.result = payload
+                self.stats.update(payload["stats"])
+                self._finish("done")
+            elif kind == "failed":
+                self.error = payload
+                self._finish("failed")
+
+        # The worker died without reporting back
+        if not self.is_finished() and self._process.exitcode is not None and self._updates.empty():
+            self.error = f"Worker exited with code {self._process.exitcode}."
+            self._finish("failed")
+        return self.status
+
+    def wait(self, timeout=None):
+        """Blocks until the job finishes or the timeout (seconds) expires. Returns the status."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while self.poll() not in ["done", "failed", "cancelled"]:
+            if end is not None and time.monotonic() >= end:
+                break
+            time.sleep(0.1)
+        return self.status
+
+    def cancel(self):
+        if self.poll() in ["done", "failed", "cancelled"]:
+            return False, f"Job {self.id} already {self.status}."
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(5)
+            if self._process.is_alive():
+                self._process.kill()
+        self._finish("cancelled")
+        return True, f"Job {self.id} cancelled."
+
+    def _finish(self, status):
+        self.status = status
+        self.finished = time.monotonic()
+        self.phase = None
+        if self._process.pid is not None:
+            self._process.join(1)
+
+    def summary(self):
+        """One-line description of the job for listings."""
+        line = f"#{self.id} {self.mode:<8} | {self.planner_name:<17} | {self.status:<9} | {self.elapsed:7.1f}s"
+        if self.phase:
+            line += f" | {self.phase}"
+        if self.stats.get("expanded") is not None:
+            line += f" | expanded {self.stats['expanded']}, evaluated {self.stats.get('evaluated', 0)}"
+        if self.result is not None:
+            line += f" | {self.result['status']}"
+        return line
+
+class JobRunner:
+    """Launches planner runs in worker processes and keeps track of their handles."""
+    def __init__(self):
+        self.jobs = {}
+        self._next_id = 1
+
+    def submit(self, mode, planner_name, timeout=None):
+        """Starts a background planner run and returns its PlanningJob handle."""
+        job = PlanningJob(self._next_id, mode, planner_name, timeout)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        job.start()
+        return job
+
+    def get(self, job_id):
+        job = self.jobs.get(job_id)
+        if job:
+            job.poll()
+        return job
+
+    def list_jobs(self):
+        for job in self.jobs.values():
+            job.poll()
+        return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if not job:
+            return False, f"Job {job_id} not found."
+        return job.cancel()
+
+    def shutdown(self):
+        """Cancels every job still running (called on exit)."""
+        for job in self.jobs.values():
+            if not job.is_finished():
+                job.cancel()
@@ -0,0 +1,203 @@
+"""
+Local-search repair engine for exam schedules (the rules of domain_exams.pddl):
+min-conflicts with an annealed random walk. It starts from any partial
+assignment, places what is missing, then keeps moving conflicted exams to
+their least-conflicting (room, day, slot, daily slot). When no perfect
+schedule exists it returns the best one found and the rules it still breaks.
+"""
+import time
+import random
+from schedulers import planner
+from schedulers.model import exam_model, exam_violations, days_clash
+from instrumentation import instrumented
+
+# Random-walk probability at the start and at the end of the run
+START_NOISE = 0.3
+END_NOISE = 0.02
+
+class ExamRepair:
+    """Assignment of every exam with incremental conflict counts."""
+    def __init__(self, model, seed=0):
+        self.model = model
+        self.rng = random.Random(seed)
+        self.courses = [c for c in model["courses"] if c in model["group_of"]]
+
+        # Capacity and weekends are kept as domain limits whenever possible
+        self.rooms_for = {}
+        for c in self.courses:
+            self.rooms_for[c] = [r for r in model["rooms"] if (r, c) in model["capacity_ok"]] or list(model["rooms"])
+        self.days = [d for d in model["days"] if d not in model["weekend"]] or list(model["days"])
+        self.clashing = {d: [d2 for d2 in model["days"] if days_clash(model, d, d2)] for d in model["days"]}
+
+        self.assignment = {}
+        self.room_use = {}
+        self.daily_use = {}
+        self.group_days = {}
+
+    # Conflict bookkeeping
+
+    def _add(self, course, value):
+        r, d, s, ds = value
+        self.assignment[course] = value
+        self.room_use[(r, d, s)] = self.room_use.get((r, d, s), 0) + 1
+        self.daily_use[(d, ds)] = self.daily_use.get((d, ds), 0) + 1
+        days = self.group_days.setdefault(self.model["group_of"][course], {})
+        days[d] = days.get(d, 0) + 1
+
+    def _remove(self, course):
+        r, d, s, ds = self.assignment.pop(course)
+        self.room_use[(r, d, s)] -= 1
+        self.daily_use[(d, ds)] -= 1
+        self.group_days[self.model["group_of"][course]][d] -= 1
+
+    def _spacing(self, course, day):
+        days = self.group_days.get(self.model["group_of"][course], {})
+        return sum(days.get(d2, 0) for d2 in self.clashing[day])
+
+    def conflicts(self, course):
+        """Number of other exams the course's current placement clashes with."""
+        r, d, s, ds = self.assignment[course]
+        return (self.room_use[(r, d, s)] - 1) + (self.daily_use[(d, ds)] - 1) + (self._spacing(course, d) - 1)
+
+    def cost(self):
+        """Clashing pairs of exams (0 means a valid schedule)."""
+        return sum(self.conflicts(c) for c in self.assignment) // 2
+
+    # Moves
+
+    def _best_value(self, course):
+        """Least-conflicting placement of an unplaced course (random among ties)."""
+        # Room/slot, daily slot and spacing conflicts only share the day, so each
+        # day's best placement is the sum of three independent minimums
+        best, best_cost = [], None
+        for d in self.days:
+            spacing = self._spacing(course, d)
+            daily = min(self.daily_use.get((d, ds), 0) for ds in self.model["daily_slots"])
+            rooms = min(self.room_use.get((r, d, s), 0) for r in self.rooms_for[course] for s in self.model["slots"])
+            day_cost = spacing + daily + rooms
+            if best_cost is None or day_cost < best_cost:
+                best, best_cost = [d], day_cost
+            elif day_cost == best_cost:
+                best.append(d)
+
+        d = self.rng.choice(best)
+        daily = min(self.daily_use.get((d, ds), 0) for ds in self.model["daily_slots"])
+        ds = self.rng.choice([ds for ds in self.model["daily_slots"] if self.daily_use.get((d, ds), 0) == daily])
+        rooms = min(self.room_use.get((r, d, s), 0) for r in self.rooms_for[course] for s in self.model["slots"])
+        r, s = self.rng.choice([
+            (r, s) for r in self.rooms_for[course] for s in self.model["slots"]
+            if self.room_use.get((r, d, s), 0) == rooms
+        ])
+        return (r, d, s, ds)
+
+    def _random_value(self, course):
+        return (self.rng.choice(self.rooms_for[course]), self.rng.choice(self.days),
+                self.rng.choice(self.model["slots"]), self.rng.choice(self.model["daily_slots"]))
+
+    def place(self, schedule):
+        """
+        Starts from the given (possibly partial) schedule; missing exams are placed greedily.
+        Exams in a room too small for them or on a weekend are dropped and placed again,
+        since conflicts() only counts clashes between exams.
+        """
+        for item in schedule or []:
+            course = item["course"]
+            if course not in self.rooms_for or course in self.assignment:
+                continue
+            if item["room"] not in self.rooms_for[course] or item["day"] not in self.days:
+                continue
+            if item["slot"] not in self.model["slots"] or item["daily_slot"] not in self.model["daily_slots"]:
+                continue
+            self._add(course, (item["room"], item["day"], item["slot"], item["daily_slot"]))
+        missing = [c for c in self.courses if c not in self.assignment]
+        # Courses with the fewest rooms first, like the MRV order of a CSP
+        missing.sort(key=lambda c: len(self.rooms_for[c]))
+        for course in missing:
+            self._add(course, self._best_value(course))
+
+    def repair(self, deadline, max_steps=None):
+        """Min-conflicts steps until the schedule is valid or time runs out. Returns the best cost."""
+        start = time.monotonic()
+        budget = max(deadline - start, 1e-6)
+        cost = self.cost()
+        best_cost, best = cost, dict(self.assignment)
+        self.steps = 0
+
+        while cost > 0 and time.monotonic() < deadline and (max_steps is None or self.steps < max_steps):
+            self.steps += 1
+            conflicted = [c for c in self.assignment if self.conflicts(c) > 0]
+            course = self.rng.choice(conflicted)
+
+            cost -= self.conflicts(course)
+            self._remove(course)
+            noise = START_NOISE + (END_NOISE - START_NOISE) * min(1.0, (time.monotonic() - start) / budget)
+            value = self._random_value(course) if self.rng.random() < noise else self._best_value(course)
+            self._add(course, value)
+            cost += self.conflicts(course)
+
+            if cost < best_cost:
+                best_cost, best = cost, dict(self.assignment)
+
+        # Go back to the best schedule seen
+        for course in list(self.assignment):
+            self._remove(course)
+        for course, value in best.items():
+            self._add(course, value)
+        return best_cost
+
+    def schedule(self):
+        schedule = []
+        for course, (r, d, s, ds) in self.assignment.items():
+            schedule.append({"course": course, "class": self.model["group_of"][course],
+                             "room": r, "day": d, "slot": s, "daily_slot": ds})
+        schedule.sort(key=planner._day_slot_key)
+        return schedule
+
+@instrumented("local_search.repair")
+def repair(mode="exams", schedule=None, deadline=10, problem=None, seed=0):
+    """
+    Repairs (or builds, when schedule is None) an exam schedule within deadline seconds.
+    Returns a result dictionary like planner.solve(): status SOLVED_SATISFICING when
+    no rule is broken, otherwise VIOLATIONS_LEFT with the best schedule found and its
+    remaining violations.
+    """
+    start = time.monotonic()
+    model = exam_model(problem or planner.load_problem(mode))
+    engine = ExamRepair(model, seed)
+    engine.place(schedule)
+    engine.repair(start + deadline)
+
+    result = engine.schedule()
+    violations = exam_violations(model, result)
+    return {
+        "mode": mode,
+        "planner": "local-search",
+        "status": "VIOLATIONS_LEFT" if violations else "SOLVED_SATISFICING",
+        "schedule": result,
+        "violations": violations,
+        "cached": False,
+        "stats": {"steps": engine.steps, "search_time": round(time.monotonic() - start, 6)},
+    }
+
+def run_local_search_scheduler(mode, deadline, schedule=None):
+    """
+    Menu entry point: repairs the given exams schedule (or builds one) and prints it.
+    Returns the schedule only when it breaks no rule.
+    """
+    print(f"\n[Repairing {mode.capitalize()} (up to {deadline:g}s)]\n")
+    if schedule:
+        print(f"Starting from the last plan ({len(schedule)} exams).")
+    try:
+        outcome = repair(mode, schedule, deadline)
+    except Exception as e:
+        print(f"Error running local search: {e}")
+        return
+
+    print(f"{outcome['stats']['steps']} repair steps in {outcome['stats']['search_time']:.2f}s.")
+    planner.print_schedule(mode, outcome["schedule"])
+    if not outcome["violations"]:
+        return outcome["schedule"]
+
+    print(f"No perfect schedule found. {len(outcome['violations'])} rule(s) still broken:")
+    for rule, detail in outcome["violations"]:
+        print(f" - {rule}: {detail}")
@@ -0,0 +1,148 @@
+"""
+Plain-Python views of the planning problems, used to check schedules and to
+solve them without going through a PDDL planner (decomposition, CSP, local search).
+"""
+import re
+
+def _true_facts(problem, fluent_name):
+    """Name tuples of the true initial facts of a fluent."""
+    facts = set()
+    for fnode, value in problem.explicit_initial_values.items():
+        if value.is_true() and fnode.fluent().name == fluent_name:
+            facts.add(tuple(str(arg) for arg in fnode.args))
+    return facts
+
+def exam_model(problem):
+    """Reads courses, class groups, rooms, days, slots and rules of an exams problem."""
+    def names(type_name):
+        return [str(o) for o in problem.objects(problem.user_type(type_name))]
+
+    return {
+        "courses": names("course"),
+        "rooms": names("room"),
+        "days": names("day"),
+        "slots": names("slot"),
+        "daily_slots": names("daily_slot"),
+        "group_of": {c: cg for c, cg in _true_facts(problem, "course_belongs_to")},
+        "capacity_ok": _true_facts(problem, "capacity_ok"),
+        "weekend": {d for (d,) in _true_facts(problem, "is_weekend")},
+        "too_close": _true_facts(problem, "days_too_close"),
+    }
+
+def days_clash(model, d1, d2):
+    """True if one class group cannot sit exams on both days."""
+    return d1 == d2 or (d1, d2) in model["too_close"] or (d2, d1) in model["too_close"]
+
+def exam_violations(model, schedule):
+    """
+    Lists the rules an exam schedule breaks, as (rule, detail) pairs.
+    An empty list means the schedule is a valid plan of the problem.
+    """
+    violations = []
+    placed = {}
+    rooms = {}
+    daily_slots = {}
+    group_days = {}
+
+    for item in schedule:
+        course = item["course"]
+        if course in placed:
+            violations.append(("duplicate", course))
+        placed[course] = item
+
+        if model["group_of"].get(course) != item["class"]:
+            violations.append(("class_group", course))
+        if (item["room"], course) not in model["capacity_ok"]:
+            violations.append(("capacity", course))
+        if item["day"] in model["weekend"]:
+            violations.append(("weekend", course))
+
+        room_key = (item["room"], item["day"], item["slot"])
+        if room_key in rooms:
+            violations.append(("room", f"{rooms[room_key]}/{course}"))
+        rooms[room_key] = course
+
+        day_key = (item["day"], item["daily_slot"])
+        if day_key in daily_slots:
+            violations.append(("daily_slot", f"{daily_slots[day_key]}/{course}"))
+        daily_slots[day_key] = course
+
+        for other, other_day in group_days.get(item["class"], []):
+            if days_clash(model, item["day"], other_day):
+                violations.append(("spacing", f"{other}/{course}"))
+        group_days.setdefault(item["class"], []).append((course, item["day"]))
+
+    for course in model["courses"]:
+        if course not in placed:
+            violations.append(("missing", course))
+    return violations
+
+def lecture_model(problem):
+    """
+    Reads courses (with their number of weekly sessions), rooms, days, slots and
+    capacities of a lectures problem, in the static or the generated session encoding.
+    "distinct_days" is the same-day rule of the domain: only the generated encoding
+    puts the sessions of a course on different days.
+    """
+    def names(type_name):
+        return [str(o) for o in problem.objects(problem.user_type(type_name))]
+
+    courses = names("course")
+    if problem.has_fluent("session_done"):
+        # Generated encoding: the goal names the last session of every course
+        sessions = {}
+        for goal in problem.goals:
+            for fact in (goal.args if goal.is_and() else [goal]):
+                course, session = (str(arg) for arg in fact.args)
+                sessions[course] = int(session.rsplit("_", 1)[1])
+        # The sentinel day after the last one is not a real day
+        last_days = {d2 for _, d2 in _true_facts(problem, "day_next")} - {d1 for d1, _ in _true_facts(problem, "day_next")}
+        days = [d for d in names("day") if d not in last_days]
+        distinct_days = True
+    else:
+        # Static encoding: one course_scheduled_N fluent per session
+        count = len([f for f in problem.fluents if re.fullmatch(r"course_scheduled_\d+", f.name)])
+        sessions = {c: count for c in courses}
+        days = names("day")
+        distinct_days = False
+
+    return {
+        "courses": courses,
+        "sessions": sessions,
+        "rooms": names("room"),
+        "days": days,
+        "slots": names("slot"),
+        "capacity_ok": _true_facts(problem, "capacity_ok"),
+        "distinct_days": distinct_days,
+    }
+
+def lecture_violations(model, schedule):
+    """
+    Lists the rules a lecture schedule breaks, as (rule, detail) pairs: every
+    session placed once, in a room that fits, with no room booked twice and (when
+    the model's domain requires it) the sessions of a course on different days.
+    """
+    violations = []
+    rooms = {}
+    course_days = {}
+    sessions = {}
+
+    for item in schedule:
+        course = item["course"]
+        if (item["room"], course) not in model["capacity_ok"]:
+            violations.append(("capacity", course))
+
+        room_key = (item["room"], item["day"], item["slot"])
+        if room_key in rooms:
+            violations.append(("room", f"{rooms[room_key]}/{course}"))
+        rooms[room_key] = course
+
+        if model["distinct_days"] and item["day"] in course_days.setdefault(course, set()):
+            violations.append(("same_day", course))
+        course_days.setdefault(course, set()).add(item["day"])
+        sessions[course] = sessions.get(course, 0) + 1
+
+    for course, needed in model["sessions"].items():
+        if sessions.get(course, 0) != needed:
+            violations.append(("sessions", course))
+    return violations
@@ -0,0 +1,59 @@
+import os
+import json
+import hashlib
+import pathlib
+
+BASE_PATH = pathlib.Path(__file__).parent.resolve()
+CACHE_DIR = BASE_PATH / "plan_cache"
+
+# Only plans are worth keeping: a timeout may succeed on the next run
+CACHEABLE_STATUSES = ['SOLVED_SATISFICING', 'SOLVED_OPTIMALLY', 'UNSOLVABLE_PROVEN']
+
+def content_hash(*parts):
+    """SHA-256 over the given strings (kept apart so 'ab'+'c' differs from 'a'+'bc')."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def cache_key(domain_text, problem_text, config):
+    """Key of a planning run: the domain text, the problem text and the planner configuration."""
+    return content_hash(domain_text, problem_text, json.dumps(config, sort_keys=True))
+
+def _entry_path(key):
+    return CACHE_DIR / f"{key}.json"
+
+def get(key):
+    """Returns the stored result dictionary for a key, or None."""
+    path = _entry_path(key)
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A corrupt entry is just a miss
+        return None
+
+def put(key, outcome):
+    """Stores a result dictionary if its status is worth caching."""
+    if outcome["status"] not in CACHEABLE_STATUSES:
+        return False
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Write then rename, so a crash never leaves half an entry behind
+    tmp_path = _entry_path(key).with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(outcome, f)
+    os.replace(tmp_path, _entry_path(key))
+    return True
+
+def clear():
+    """Deletes every stored plan. Returns how many entries were removed."""
+    if not CACHE_DIR.exists():
+        return 0
+    removed = 0
+    for path in CACHE_DIR.glob("*.json"):
+        path.unlink()
+        removed += 1
+    return removed
@@ -1,25 +1,295 @@
 import os
+import re
+import json
 import pathlib
+import signal
+import time
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
 from unified_planning.shortcuts import *
 from unified_planning.io import PDDLReader
+from unified_planning.engines.pddl_planner import terminate_process
+from schedulers import plan_cache
+from schedulers.model import exam_model, exam_violations
+from instrumentation import instrumented, count
 
 BASE_PATH = pathlib.Path(__file__).parent.resolve()
 get_environment().credits_stream = None
 
-def run_scheduler(mode, algo_choice):
-    print(f"\n[Planning {mode.capitalize()}]\n")
-    
+SOLVED_STATUSES = ['SOLVED_SATISFICING', 'SOLVED_OPTIMALLY']
+
+# Bumped whenever schedule items or run metrics change shape, so older cached plans are not reused
+SCHEDULE_FORMAT = 3
+
+# Configurations raced by the portfolio mode: (label, engine name, engine params)
+PORTFOLIO_CONFIGS = [
+    ("lama-first", "fast-downward", {}),
+    ("greedy-ff", "fast-downward", {"fast_downward_search_config": "eager_greedy([ff()])"}),
+    ("lazy-add", "fast-downward", {"fast_downward_search_config": "lazy_greedy([add()])"}),
+    ("optimal", "fast-downward-opt", {}),
+]
+
+def get_problem_files(mode):
+    """Returns the (domain, problem) PDDL paths of a planning mode, or None if unknown."""
     if mode == "lectures":
         domain_file = str(BASE_PATH / mode / "domain_lectures.pddl")
         problem_file = str(BASE_PATH / mode / "problem_lectures.pddl")
     elif mode == "exams":
         domain_file = str(BASE_PATH / mode / "domain_exams.pddl")
         problem_file = str(BASE_PATH / mode / "problem_exams.pddl")
+    elif mode == "lectures_generated":
+        # Written by generator.write_generated_lectures() from the ontology
+        domain_file = str(BASE_PATH / "lectures" / "generated_domain_lectures.pddl")
+        problem_file = str(BASE_PATH / "lectures" / "generated_problem_lectures.pddl")
+    else:
+        return None
+    return domain_file, problem_file
+
+def read_problem_texts(mode):
+    """Returns the (domain, problem) PDDL texts of a planning mode."""
+    texts = []
+    for path in get_problem_files(mode):
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    return tuple(texts)
+
+# Parsed problems, keyed by the hash of their PDDL texts
+_parsed_problems = {}
+
+def load_problem(mode):
+    """
+    Parses the static PDDL files of a planning mode into a unified-planning problem.
+    Problems are memoized by file content, so the returned object is shared:
+    clone it before modifying it.
+    """
+    return parse_problem(*read_problem_texts(mode))
+
+@instrumented("planner.parse_problem")
+def parse_problem(domain_text, problem_text):
+    """Parses PDDL texts into a (shared, memoized) unified-planning problem."""
+    key = plan_cache.content_hash(domain_text, problem_text)
+    if key not in _parsed_problems:
+        reader = PDDLReader()
+        _parsed_problems[key] = reader.parse_problem_string(domain_text, problem_text)
+    return _parsed_problems[key]
+
+def extract_schedule(mode, plan):
+    """Turns the plan actions into a list of schedule items sorted by day and slot."""
+    schedule = []
+    for a in plan.actions:
+        # Bookkeeping actions (e.g. advance_day) do not place anything
+        if not a.action.name.startswith("schedule_"):
+            continue
+        p = a.actual_parameters
+        item = {
+            "course": str(p[0]),
+            "room": str(p[1]),
+            "day": str(p[2]),
+            "slot": str(p[3])
+        }
+        if mode == "exams":
+            item["class"] = str(p[1])
+            item["room"] = str(p[2])
+            item["day"] = str(p[3])
+            item["slot"] = str(p[4])
+            item["daily_slot"] = str(p[5])
+        elif a.action.name == "schedule_session":
+            # Generated encoding: (?c ?r ?d ?s ?n ...) with ?n = session_N
+            item["session"] = int(str(p[4]).rsplit("_", 1)[1])
+        else:
+            # schedule_class_1 / schedule_class_2
+            item["session"] = int(a.action.name.rsplit("_", 1)[1])
+
+        schedule.append(item)
+
+    schedule.sort(key=_day_slot_key)
+    return schedule
+
+def _day_slot_key(x):
+    """Sorter helper: chronological order of 'DayN' or weekday names, then slot."""
+    d_val = x['day'].lower()
+
+    if d_val.startswith("day"):
+        try:
+            return (int(d_val[3:]), x['slot'])
+        except ValueError:
+            return (999, x['slot'])
+    else:
+        days_map = {"mon":1, "tue":2, "wed":3, "thu":4, "fri":5}
+        return (days_map.get(d_val, 99), x['slot'])
+
+def print_schedule(mode, schedule):
+    print("\nPlan found!")
+    print("=" * 50)
+    if mode == "exams":
+        print(f"{'DAY':<6} | {'SLOT':<11} | {'CLASS':<8} | {'COURSE':<7} | {'ROOM'}")
     else:
+        print(f"{'DAY':<6} | {'SLOT':<11} | {'COURSE':<7} | {'ROOM'}")
+    print("-" * 50)
+
+    for item in schedule:
+        if mode == "exams":
+            print(f"{item['day']:<6} | {item['slot']:<11} | {item['class']:<8} | {item['course']:<7} | {item['room']}")
+        else:
+            print(f"{item['day']:<6} | {item['slot']:<11} | {item['course']:<7} | {item['room']}")
+    print("=" * 50)
+
+@instrumented("planner.solve")
+def solve(mode, planner_name, params=None, timeout=None, use_cache=True, output_stream=None):
+    """
+    Runs one engine on a planning mode and returns a result dictionary
+    with the status name and, when solved, the extracted schedule.
+    Results are stored in the plan cache; a repeated request with unchanged
+    PDDL files and configuration is answered from it ("cached" is then True).
+    output_stream receives the engine's output while it runs (e.g. job progress).
+    """
+    key = plan_cache_key(mode, planner_name, params)
+    if use_cache:
+        cached = plan_cache.get(key)
+        if cached is not None:
+            count("planner.cache_hits")
+            cached["cached"] = True
+            return cached
+
+    start = time.monotonic()
+    problem = load_problem(mode)
+    parse_time = time.monotonic() - start
+
+    outcome = solve_problem(mode, problem, planner_name, params, timeout, output_stream)
+    outcome["stats"]["parse_time"] = round(parse_time, 3)
+    outcome["stats"]["wall_time"] = round(time.monotonic() - start, 3)
+    plan_cache.put(key, outcome)
+    outcome["cached"] = False
+    record_metrics(outcome)
+    return outcome
+
+def plan_cache_key(mode, planner_name, params=None):
+    """Plan cache key of a planning mode solved with the given engine configuration."""
+    domain_text, problem_text = read_problem_texts(mode)
+    config = {"planner": planner_name, "params": params or {}, "format": SCHEDULE_FORMAT}
+    return plan_cache.cache_key(domain_text, problem_text, config)
+
+@instrumented("planner.solve_problem")
+def solve_problem(mode, problem, planner_name, params=None, timeout=None, output_stream=None):
+    """Same as solve(), for an already parsed (and possibly modified) problem."""
+    start = time.monotonic()
+    with OneshotPlanner(name=planner_name, params=params or {}) as planner:
+        if _sigterm_stops_engines:
+            stop_engine_on_sigterm(planner)
+        result = planner.solve(problem, timeout=timeout, output_stream=output_stream)
+    outcome = build_outcome(mode, planner_name, result)
+    outcome["stats"]["wall_time"] = round(time.monotonic() - start, 3)
+    return outcome
+
+def build_outcome(mode, planner_name, result):
+    """Converts a PlanGenerationResult into the result dictionary used across the schedulers."""
+    outcome = {
+        "mode": mode,
+        "planner": planner_name,
+        "status": result.status.name,
+        "schedule": None,
+        "stats": search_statistics(result)
+    }
+    if result.status.name in SOLVED_STATUSES:
+        outcome["schedule"] = extract_schedule(mode, result.plan)
+        outcome["stats"].setdefault("plan_length", len(result.plan.actions))
+    return outcome
+
+# Statistics printed by Fast Downward: the translator (grounding) summary,
+# then the search summary, then the driver's total
+STAT_PATTERNS = {
+    "grounded_actions": r"Translator operators: (\d+)",
+    "grounded_facts": r"Translator facts: (\d+)",
+    "grounding_time": r"Done! \[[\d.]+s CPU, ([\d.]+)s wall-clock\]",
+    "expanded": r"Expanded (\d+) state",
+    "evaluated": r"Evaluated (\d+) state",
+    "generated": r"Generated (\d+) state",
+    "plan_length": r"Plan length: (\d+) step",
+    "plan_cost": r"Plan cost: (\d+)",
+    "search_time": r"Search time: ([\d.]+)s",
+    "search_total_time": r"Total time: ([\d.]+)s",
+    "planner_time": r"Planner time: ([\d.]+)s",
+}
+
+# One JSON line per planner run, to follow planning performance over time
+METRICS_FILE = BASE_PATH / "metrics.jsonl"
+
+def record_metrics(outcome):
+    """Appends the metrics of a (non-cached) run to METRICS_FILE."""
+    entry = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": outcome["mode"],
+        "planner": outcome["planner"],
+        "status": outcome["status"],
+        "stats": outcome["stats"],
+    }
+    try:
+        with open(METRICS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Warning: could not record planner metrics ({e}).")
+
+def format_metrics(stats):
+    """One-line summary of the metrics of a run (only the known values)."""
+    parts = []
+    if "parse_time" in stats:
+        parts.append(f"parse {stats['parse_time']:.2f}s")
+    if "grounding_time" in stats:
+        parts.append(f"grounding {stats['grounding_time']:.2f}s "
+                     f"({stats.get('grounded_actions', '?')} actions, {stats.get('grounded_facts', '?')} facts)")
+    if "search_time" in stats:
+        parts.append(f"search {stats['search_time']:.2f}s "
+                     f"({stats.get('expanded', '?')} expanded, {stats.get('evaluated', '?')} evaluated)")
+    if "plan_length" in stats:
+        parts.append(f"plan {stats['plan_length']} steps, cost {stats.get('plan_cost', stats['plan_length'])}")
+    if "wall_time" in stats:
+        parts.append(f"total {stats['wall_time']:.2f}s")
+    return " | ".join(parts)
+
+def search_statistics(result):
+    """Extracts the search statistics from the engine log of a planning result."""
+    log = "".join(m.message for m in (result.log_messages or []))
+    stats = {}
+    for key, pattern in STAT_PATTERNS.items():
+        found = re.findall(pattern, log)
+        if found:
+            stats[key] = float(found[-1]) if "." in found[-1] else int(found[-1])
+    return stats
+
+# Set in worker processes that are stopped with SIGTERM (see stop_engines_on_sigterm)
+_sigterm_stops_engines = False
+
+def stop_engines_on_sigterm():
+    """From now on, SIGTERM also stops the engine this process is running (worker processes)."""
+    global _sigterm_stops_engines
+    _sigterm_stops_engines = True
+
+def stop_engine_on_sigterm(engine):
+    """
+    Makes SIGTERM (how worker processes get cancelled) also stop the Fast Downward
+    subprocess of the engine, which lives in its own session and would survive us.
+    """
+    def cancel(signum, frame):
+        if getattr(engine, "_process", None) is not None:
+            terminate_process(engine._process)
+        os._exit(0)
+    signal.signal(signal.SIGTERM, cancel)
+
+def run_scheduler(mode, algo_choice, decompose=False):
+    """
+    Solves a planning mode and prints the schedule. With decompose (exams only),
+    every class group is solved as its own sub-problem in parallel.
+    """
+    print(f"\n[Planning {mode.capitalize()}]\n")
+
+    files = get_problem_files(mode)
+    if files is None:
         print(f"Interface Error: {mode} does not exist.")
         return
-    
+
     # Check if files exist
+    domain_file, problem_file = files
     if not os.path.exists(domain_file) or not os.path.exists(problem_file):
         print(f"Error: {domain_file} or {problem_file} not found.")
         print("Please ensure you have created the 4 static PDDL files.")
@@ -32,63 +302,591 @@ def run_scheduler(mode, algo_choice):
     else:
         planner_name = "fast-downward-opt"
         print(f"Solving using {planner_name} (Optimal)...")
-    
+
     try:
-        # Load PDDL
-        reader = PDDLReader()
-        problem = reader.parse_problem(domain_file, problem_file)
-        
-        with OneshotPlanner(name=planner_name) as planner:
-            result = planner.solve(problem)
-
-            if result.status.name in ['SOLVED_SATISFICING', 'SOLVED_OPTIMALLY']:
-                print("\nPlan found!")
-                print("=" * 50)
-                schedule = []
-                for a in result.plan.actions:
-                    p = a.actual_parameters
-                    item = {
-                        "course": str(p[0]),
-                        "room": str(p[1]),
-                        "day": str(p[2]),
-                        "slot": str(p[3])
-                    }
-                    if mode == "exams":
-                        item["class"] = str(p[1])
-                        item["room"] = str(p[2])
-                        item["day"] = str(p[3])
-                        item["slot"] = str(p[4])
-                        
-                    schedule.append(item)
-                
-                # Sorter helper
-                def sort_key(x):
-                    d_val = x['day'].lower()
-                    
-                    if d_val.startswith("day"):
-                        try:
-                            return (int(d_val[3:]), x['slot'])
-                        except ValueError:
-                            return (999, x['slot'])
-                    else:
-                        days_map = {"mon":1, "tue":2, "wed":3, "thu":4, "fri":5}
-                        return (days_map.get(d_val, 99), x['slot'])
-
-                schedule.sort(key=sort_key)
-                
-                if mode == "exams":
-                    print(f"{'DAY':<6} | {'SLOT':<11} | {'CLASS':<8} | {'COURSE':<7} | {'ROOM'}")
-                else:
-                    print(f"{'DAY':<6} | {'SLOT':<11} | {'COURSE':<7} | {'ROOM'}")
-                print("-" * 50)
-                
-                for item in schedule:
-                    if mode == "exams":
-                        print(f"{item['day']:<6} | {item['slot']:<11} | {item['class']:<8} | {item['course']:<7} | {item['room']}")
-                    else:
-                        print(f"{item['day']:<6} | {item['slot']:<11} | {item['course']:<7} | {item['room']}")
-                print("=" * 50)
-            else:
-                print(f"No plan found. Status: {result.status.name}")
+        if decompose and mode == "exams":
+            print("Splitting the problem by class group...")
+            outcome = solve_decomposed(mode, planner_name)
+            for group, status in outcome["groups"].items():
+                print(f" - {group}: {status}")
+            if not outcome["decomposed"]:
+                print("The class group plans could not be merged: solved the whole problem instead.")
+        else:
+            outcome = solve(mode, planner_name)
+        if outcome.get("cached"):
+            print("Unchanged problem: using the cached plan.")
+        if outcome.get("stats"):
+            print(f"Metrics: {format_metrics(outcome['stats'])}")
+        if outcome["schedule"] is not None:
+            print_schedule(mode, outcome["schedule"])
+            return outcome["schedule"]
+        print(f"No plan found. Status: {outcome['status']}")
+    except Exception as e:
+        print(f"Error running planner: {e}")
+
+# Portfolio mode: several configurations race on separate cores
+
+def _portfolio_worker(mode, config, timeout, results):
+    """Solves one portfolio configuration inside a worker process."""
+    label, planner_name, params = config
+    try:
+        problem = load_problem(mode)
+        with OneshotPlanner(name=planner_name, params=params) as engine:
+            # Losing runs get cancelled with SIGTERM
+            stop_engine_on_sigterm(engine)
+            result = engine.solve(problem, timeout=timeout)
+
+        outcome = build_outcome(mode, label, result)
+        results.put((label, outcome["status"], outcome["schedule"], None))
+    except Exception as e:
+        results.put((label, "ERROR", None, str(e)))
+
+def _plan_rank(problem, outcome):
+    """Lower is better: schedule quality first, proven optimal plans break ties."""
+    optimal = 0 if outcome["status"] == "SOLVED_OPTIMALLY" else 1
+    return (schedule_score(schedule_cost(problem, outcome["schedule"])), optimal)
+
+def run_portfolio(mode, budget=60, strategy="first", configs=None, max_workers=None):
+    """
+    Races several planner configurations in a pool of worker processes sharing
+    one wall-clock budget (seconds).
+    strategy="first" returns the first valid plan and cancels the other runs;
+    strategy="best" keeps collecting until the budget ends or every run finished
+    and returns the best plan found.
+    Returns a result dictionary like solve(), with the winning configuration in "planner".
+    """
+    if get_problem_files(mode) is None:
+        return {"mode": mode, "planner": None, "status": "UNKNOWN_MODE", "schedule": None}
+
+    configs = list(configs or PORTFOLIO_CONFIGS)
+    max_workers = max_workers or min(len(configs), os.cpu_count() or 1)
+    deadline = time.monotonic() + budget
+
+    results = multiprocessing.Queue()
+    pending = list(configs)
+    running = {}
+    found = []
+    statuses = {}
+
+    def launch():
+        while pending and len(running) < max_workers:
+            config = pending.pop(0)
+            remaining = max(1, deadline - time.monotonic())
+            proc = multiprocessing.Process(
+                target=_portfolio_worker, args=(mode, config, remaining, results), daemon=True
+            )
+            proc.start()
+            running[config[0]] = proc
+
+    try:
+        launch()
+        while running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                label, status, schedule, error = results.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                # Forget workers that died without reporting back
+                for label, proc in list(running.items()):
+                    if not proc.is_alive() and results.empty():
+                        proc.join()
+                        statuses.setdefault(label, "CRASHED")
+                        del running[label]
+                launch()
+                continue
+
+            statuses[label] = error or status
+            proc = running.pop(label, None)
+            if proc is not None:
+                proc.join()
+            if schedule is not None:
+                found.append({"mode": mode, "planner": label, "status": status, "schedule": schedule})
+                if strategy == "first":
+                    break
+            launch()
+    finally:
+        # Cancel the losing runs
+        for proc in running.values():
+            if proc.is_alive():
+                proc.terminate()
+        for proc in running.values():
+            proc.join(5)
+            if proc.is_alive():
+                proc.kill()
+        results.close()
+
+    for label, _, _ in configs:
+        statuses.setdefault(label, "CANCELLED")
+
+    if found:
+        problem = load_problem(mode)
+        best = min(found, key=lambda outcome: _plan_rank(problem, outcome))
+        best["runs"] = statuses
+        return best
+    status = "TIMEOUT" if time.monotonic() >= deadline else "NO_PLAN"
+    return {"mode": mode, "planner": None, "status": status, "schedule": None, "runs": statuses}
+
+def run_portfolio_scheduler(mode, budget=60, strategy="first"):
+    """Menu entry point for the portfolio mode: races the configurations and prints the winner."""
+    print(f"\n[Planning {mode.capitalize()}]\n")
+    labels = ", ".join(c[0] for c in PORTFOLIO_CONFIGS)
+    print(f"Racing {labels} for at most {budget}s...")
+
+    try:
+        outcome = run_portfolio(mode, budget, strategy)
+    except Exception as e:
+        print(f"Error running planner: {e}")
+        return
+
+    for label, status in outcome.get("runs", {}).items():
+        print(f" - {label}: {status}")
+
+    if outcome["schedule"] is not None:
+        print(f"\nWinning configuration: {outcome['planner']} ({outcome['status']})")
+        print_schedule(mode, outcome["schedule"])
+        return outcome["schedule"]
+    print(f"No plan found. Status: {outcome['status']}")
+
+# Schedule quality, shared by the portfolio ranking and the anytime mode
+
+LATE_SLOTS = ["slot_18_20"]
+
+# Weights of (rooms used, capacity waste, late slots) when comparing schedules
+QUALITY_WEIGHTS = (10, 1, 5)
+
+def _facts(problem, fluent_name):
+    """Returns the arguments (as name tuples) of the initially true facts of a fluent."""
+    facts = set()
+    for fnode, value in problem.explicit_initial_values.items():
+        if fnode.is_fluent_exp() and fnode.fluent().name == fluent_name and value.is_true():
+            facts.add(tuple(str(arg) for arg in fnode.args))
+    return facts
+
+# Facts of parsed problems, which are shared and never modified (see load_problem)
+_problem_facts = {}
+
+def _base_facts(mode, fluent_name):
+    """Memoized _facts() of the unmodified problem of a mode."""
+    problem = load_problem(mode)
+    key = (id(problem), fluent_name)
+    if key not in _problem_facts:
+        _problem_facts[key] = _facts(problem, fluent_name)
+    return _problem_facts[key]
+
+def schedule_cost(problem, schedule):
+    """
+    Quality of a schedule, lower is better: (rooms used, capacity waste, late slots).
+    The PDDL files carry no room sizes, so the waste of putting a course in a room is
+    how many more courses that room can host than the tightest room the course fits in.
+    """
+    capacity_ok = _facts(problem, "capacity_ok")
+    room_size = {}
+    for room, _ in capacity_ok:
+        room_size[room] = room_size.get(room, 0) + 1
+
+    rooms_used = len({item["room"] for item in schedule})
+    waste = 0
+    for item in schedule:
+        fitting = [room_size[r] for r, c in capacity_ok if c == item["course"]]
+        if fitting:
+            waste += room_size.get(item["room"], 0) - min(fitting)
+    late = sum(1 for item in schedule if item["slot"] in LATE_SLOTS)
+    return (rooms_used, waste, late)
+
+def schedule_score(cost):
+    """Collapses a schedule_cost() tuple into one comparable number (lower is better)."""
+    return sum(weight * value for weight, value in zip(QUALITY_WEIGHTS, cost))
+
+# Anytime mode: a quick satisficing plan, then improved until the deadline
+
+def _restrict(problem, restriction):
+    """Returns a copy of the problem with one more restriction applied."""
+    kind, value = restriction
+    restricted = problem.clone()
+    capacity_ok = restricted.fluent("capacity_ok")
+
+    if kind == "room":
+        # Stop using a room altogether
+        for room, course in _facts(problem, "capacity_ok"):
+            if room == value:
+                restricted.set_initial_value(capacity_ok(restricted.object(room), restricted.object(course)), False)
+    elif kind == "pair":
+        # Forbid a wasteful course/room pairing
+        room, course = value
+        restricted.set_initial_value(capacity_ok(restricted.object(room), restricted.object(course)), False)
+    elif kind == "slot":
+        # Mark the slot as taken in every room, every day
+        room_occupied = restricted.fluent("room_occupied")
+        slot = restricted.object(value)
+        for room in restricted.objects(restricted.user_type("room")):
+            for day in restricted.objects(restricted.user_type("day")):
+                restricted.set_initial_value(room_occupied(room, day, slot), True)
+    return restricted
+
+def _improvement_moves(problem, schedule):
+    """Candidate restrictions that could improve a schedule, most valuable first."""
+    moves = []
+
+    # 1. Fewer rooms: try to empty the least used rooms first
+    usage = {}
+    for item in schedule:
+        usage[item["room"]] = usage.get(item["room"], 0) + 1
+    for room in sorted(usage, key=lambda r: usage[r]):
+        moves.append(("room", room))
+
+    # 2. Better capacity fit: forbid the most wasteful assignments
+    capacity_ok = _facts(problem, "capacity_ok")
+    room_size = {}
+    for room, _ in capacity_ok:
+        room_size[room] = room_size.get(room, 0) + 1
+    pairs = {(item["room"], item["course"]) for item in schedule}
+    for pair in sorted(pairs, key=lambda p: room_size.get(p[0], 0), reverse=True):
+        moves.append(("pair", pair))
+
+    # 3. Fewer late slots
+    for slot in LATE_SLOTS:
+        if any(item["slot"] == slot for item in schedule):
+            moves.append(("slot", slot))
+    return moves
+
+def run_anytime(mode, deadline, planner_name="fast-downward"):
+    """
+    Generator for the anytime mode. Yields a result dictionary (like solve(), plus
+    "cost" and "elapsed") for the first plan found and then for every plan with a
+    better schedule_score(), until the deadline (seconds) is reached or no improvement is left to try.
+    Each improvement re-solves the problem with one more restriction (a room dropped,
+    a wasteful room/course pair forbidden, a late slot closed) on top of the accepted ones.
+    """
+    start = time.monotonic()
+    end = start + deadline
+    # Restrictions drop capacity_ok facts, so schedules are always scored on the base problem
+    base = load_problem(mode)
+    problem = base
+
+    outcome = solve_problem(mode, problem, planner_name, timeout=deadline)
+    if outcome["schedule"] is None:
+        outcome["elapsed"] = time.monotonic() - start
+        yield outcome
+        return
+
+    best_cost = schedule_cost(base, outcome["schedule"])
+    outcome["cost"] = best_cost
+    outcome["elapsed"] = time.monotonic() - start
+    yield outcome
+
+    tried = set()
+    improved = True
+    while improved:
+        improved = False
+        for move in _improvement_moves(base, outcome["schedule"]):
+            remaining = end - time.monotonic()
+            if remaining <= 1:
+                return
+            if move in tried:
+                continue
+            tried.add(move)
+
+            candidate_problem = _restrict(problem, move)
+            candidate = solve_problem(mode, candidate_problem, planner_name, timeout=remaining)
+            if candidate["schedule"] is None:
+                continue
+            cost = schedule_cost(base, candidate["schedule"])
+            if schedule_score(cost) < schedule_score(best_cost):
+                problem, outcome, best_cost = candidate_problem, candidate, cost
+                outcome["cost"] = cost
+                outcome["elapsed"] = time.monotonic() - start
+                yield outcome
+                improved = True
+                break
+
+def run_anytime_scheduler(mode, deadline):
+    """Menu entry point for the anytime mode: reports every improvement and prints the final plan."""
+    print(f"\n[Planning {mode.capitalize()}]\n")
+    print(f"Improving the schedule for up to {deadline}s (rooms used, capacity waste, late slots)...")
+
+    best = None
+    try:
+        for outcome in run_anytime(mode, deadline):
+            if outcome["schedule"] is None:
+                print(f"No plan found. Status: {outcome['status']}")
+                return
+            rooms, waste, late = outcome["cost"]
+            print(f" [{outcome['elapsed']:6.1f}s] Rooms used: {rooms} | Capacity waste: {waste} | Late slots: {late}")
+            best = outcome
     except Exception as e:
-        print(f"Error running planner: {e}")
\ No newline at end of file
+        print(f"Error running planner: {e}")
+
+    if best is not None:
+        print_schedule(mode, best["schedule"])
+        return best["schedule"]
+
+# Incremental replanning: keep the schedule, re-solve only what a failure displaced
+
+def _freeze(problem, mode, item):
+    """Adds the effects of an already scheduled item to the initial state."""
+    obj = problem.object
+    room_occupied = problem.fluent("room_occupied")
+    problem.set_initial_value(room_occupied(obj(item["room"]), obj(item["day"]), obj(item["slot"])), True)
+
+    if mode == "exams":
+        problem.set_initial_value(problem.fluent("exam_scheduled")(obj(item["course"])), True)
+        problem.set_initial_value(problem.fluent("day_slot_used")(obj(item["day"]), obj(item["daily_slot"])), True)
+        # The class group is blocked on the exam day and on every day too close to it
+        blocked = problem.fluent("class_blocked_on_day")
+        problem.set_initial_value(blocked(obj(item["class"]), obj(item["day"])), True)
+        for d1, d2 in _base_facts(mode, "days_too_close"):
+            if item["day"] in (d1, d2):
+                neighbor = d2 if d1 == item["day"] else d1
+                problem.set_initial_value(blocked(obj(item["class"]), obj(neighbor)), True)
+    else:
+        scheduled = problem.fluent(f"course_scheduled_{item['session']}")
+        problem.set_initial_value(scheduled(obj(item["course"])), True)
+
+def build_replanning_problem(mode, schedule, broken_rooms, day_window=None):
+    """
+    Builds the sub-problem solved by replan(). Every assignment outside the broken
+    rooms is frozen as initial-state facts, then the problem is cut down to the
+    displaced courses (and their class groups), the working rooms they fit in and,
+    for exams, the days their class groups can still use. With a day_window, only
+    days at most that many days away from a displaced item's original day are kept.
+    Returns (problem, kept items, displaced items).
+    """
+    broken_rooms = {r.lower() for r in broken_rooms}
+    displaced = [item for item in schedule if item["room"] in broken_rooms]
+    kept = [item for item in schedule if item["room"] not in broken_rooms]
+
+    frozen = load_problem(mode).clone()
+    for item in kept:
+        _freeze(frozen, mode, item)
+
+    courses = {item["course"] for item in displaced}
+    keep = {
+        "course": courses,
+        "room": {r for r, c in _base_facts(mode, "capacity_ok") if c in courses and r not in broken_rooms},
+    }
+    days = {str(d) for d in frozen.objects(frozen.user_type("day"))}
+    if day_window is not None:
+        original = {_day_slot_key(item)[0] for item in displaced}
+        days = {d for d in days if any(abs(_day_slot_key({"day": d, "slot": ""})[0] - o) <= day_window for o in original)}
+    if mode == "exams":
+        groups = {cg for c, cg in _base_facts(mode, "course_belongs_to") if c in courses}
+        weekend = {d for (d,) in _base_facts(mode, "is_weekend")}
+        blocked = _facts(frozen, "class_blocked_on_day")
+        keep["class_group"] = groups
+        days = {d for d in days if d not in weekend and any((cg, d) not in blocked for cg in groups)}
+    keep["day"] = days
+
+    problem = _project(frozen, keep)
+
+    # Only what was displaced is left to plan (an untouched later session would
+    # otherwise make the original goal look satisfied already)
+    for item in displaced:
+        if mode == "exams":
+            problem.add_goal(problem.fluent("exam_scheduled")(problem.object(item["course"])))
+        else:
+            scheduled = problem.fluent(f"course_scheduled_{item['session']}")
+            problem.add_goal(scheduled(problem.object(item["course"])))
+    return problem, kept, displaced
+
+def _project(problem, keep):
+    """
+    Returns a new problem with the same fluents and actions, keeping only the objects
+    named in keep (type name -> names; unlisted types keep all their objects) and the
+    true initial facts over them. Goals are left empty.
+    """
+    projected = Problem(f"{problem.name}_projected")
+    for fluent in problem.fluents:
+        projected.add_fluent(fluent, default_initial_value=False)
+    for action in problem.actions:
+        projected.add_action(action)
+
+    kept_names = set()
+    for obj in problem.all_objects:
+        allowed = keep.get(obj.type.name)
+        if allowed is None or obj.name in allowed:
+            projected.add_object(obj)
+            kept_names.add(obj.name)
+
+    for fnode, value in problem.explicit_initial_values.items():
+        if value.is_true() and all(str(arg) in kept_names for arg in fnode.args):
+            projected.set_initial_value(fnode, True)
+    return projected
+
+# Day windows tried by replan(), like the relocation priorities: same day first
+REPLAN_DAY_WINDOWS = [0, 3, None]
+
+@instrumented("planner.replan")
+def replan(mode, schedule, broken_rooms, planner_name="fast-downward", timeout=None):
+    """
+    Repairs a schedule after rooms become unusable, keeping every unaffected
+    assignment fixed. The displaced items are first moved on their original days,
+    then within a few days, and only then anywhere (see REPLAN_DAY_WINDOWS).
+    Returns a result dictionary like solve(), whose schedule is the merged one;
+    "replanned" lists the new assignments of the displaced items.
+    """
+    outcome = None
+    for window in REPLAN_DAY_WINDOWS:
+        problem, kept, displaced = build_replanning_problem(mode, schedule, broken_rooms, window)
+        if not displaced:
+            return {"mode": mode, "planner": planner_name, "status": "NOTHING_DISPLACED",
+                    "schedule": list(schedule), "replanned": []}
+
+        outcome = solve_problem(mode, problem, planner_name, timeout=timeout)
+        outcome["replanned"] = []
+        if outcome["schedule"] is not None:
+            outcome["replanned"] = outcome["schedule"]
+            merged = kept + outcome["replanned"]
+            outcome["schedule"] = sorted(merged, key=_day_slot_key)
+            return outcome
+    return outcome
+
+def run_replanning(mode, schedule, broken_rooms, service=None):
+    """
+    Menu entry point for incremental replanning: prints the moved items and the new schedule.
+    With a service (schedulers.service.PlannerService) the sub-problem is solved by its warm worker.
+    """
+    print(f"\n[Replanning {mode.capitalize()}]\n")
+    start = time.monotonic()
+    try:
+        if service is not None:
+            outcome = service.replan(mode, schedule, broken_rooms)
+        else:
+            outcome = replan(mode, schedule, broken_rooms)
+    except Exception as e:
+        print(f"Error running planner: {e}")
+        return
+    elapsed = time.monotonic() - start
+
+    if outcome["status"] == "NOTHING_DISPLACED":
+        print("No scheduled item uses those rooms. The schedule is unchanged.")
+        return outcome["schedule"]
+    if outcome["schedule"] is None:
+        print(f"No plan found. Status: {outcome['status']}")
+        return
+
+    print(f"Replanned {len(outcome['replanned'])} item(s) in {elapsed:.2f}s:")
+    for item in outcome["replanned"]:
+        print(f" - {item['course']} -> {item['room']} on {item['day']} at {item['slot']}")
+    print_schedule(mode, outcome["schedule"])
+    return outcome["schedule"]
+
+# Decomposition: exam class groups only interact through room_occupied and
+# day_slot_used, so each group gets its own share of those resources and its
+# own sub-problem. Sub-problems run in parallel and the merged schedule is
+# checked against the full problem before it is trusted.
+
+def daily_slot_blocks(slots, daily_slots):
+    """Ties every daily slot to a block of consecutive slots (SlotA the earlier ones)."""
+    slots = sorted(slots)
+    daily_slots = sorted(daily_slots)
+    size = -(-len(slots) // len(daily_slots))
+    return {ds: slots[i * size:(i + 1) * size] for i, ds in enumerate(daily_slots)}
+
+def partition_exam_resources(model):
+    """
+    Deals the (weekday, daily slot) pairs to the class groups round-robin, busiest
+    group first. Returns {class group: [(day, daily_slot), ...]}.
+    """
+    sizes = {}
+    for cg in model["group_of"].values():
+        sizes[cg] = sizes.get(cg, 0) + 1
+    groups = sorted(sizes, key=lambda cg: (-sizes[cg], cg))
+
+    days = sorted((d for d in model["days"] if d not in model["weekend"]),
+                  key=lambda d: _day_slot_key({"day": d, "slot": ""}))
+    pairs = [(d, ds) for d in days for ds in sorted(model["daily_slots"])]
+
+    partition = {cg: [] for cg in groups}
+    for i, pair in enumerate(pairs):
+        partition[groups[i % len(groups)]].append(pair)
+    return partition
+
+def build_group_problem(problem, model, group, owned):
+    """
+    Sub-problem of one class group: its courses, the rooms they fit in and the days
+    of its (day, daily slot) pairs. Pairs owned by other groups start as used, and
+    their block of slots starts occupied in every room, so no two sub-plans can
+    ever take the same room, day and slot.
+    """
+    courses = {c for c, cg in model["group_of"].items() if cg == group}
+    days = {d for d, _ in owned}
+    keep = {
+        "class_group": {group},
+        "course": courses,
+        "room": {r for r, c in model["capacity_ok"] if c in courses},
+        "day": days,
+    }
+    sub = _project(problem, keep)
+
+    obj = sub.object
+    used = sub.fluent("day_slot_used")
+    occupied = sub.fluent("room_occupied")
+    blocks = daily_slot_blocks(model["slots"], model["daily_slots"])
+    for d in days:
+        for ds in model["daily_slots"]:
+            if (d, ds) in owned:
+                continue
+            sub.set_initial_value(used(obj(d), obj(ds)), True)
+            for r in keep["room"]:
+                for s in blocks[ds]:
+                    sub.set_initial_value(occupied(obj(r), obj(d), obj(s)), True)
+
+    for c in courses:
+        sub.add_goal(sub.fluent("exam_scheduled")(obj(c)))
+    return sub
+
+def _group_worker(mode, texts, group, owned, planner_name, timeout):
+    """Builds and solves one class group sub-problem (problems are rebuilt from the PDDL texts in each process)."""
+    problem = parse_problem(*texts)
+    sub = build_group_problem(problem, exam_model(problem), group, set(owned))
+    return solve_problem(mode, sub, planner_name, timeout=timeout)
+
+@instrumented("planner.solve_decomposed")
+def solve_decomposed(mode="exams", planner_name="fast-downward", timeout=None, texts=None, max_workers=None):
+    """
+    Solves an exams problem one class group at a time, in a process pool.
+    If a sub-problem fails or the merged schedule breaks a rule of the full
+    problem, the monolithic solve() answers instead ("decomposed" is then False).
+    texts are the (domain, problem) PDDL texts, by default those of the mode.
+    Returns a result dictionary like solve(), with the status of every group.
+    """
+    monolithic = texts is None
+    texts = texts or read_problem_texts(mode)
+    problem = parse_problem(*texts)
+    model = exam_model(problem)
+    partition = partition_exam_resources(model)
+
+    groups = {}
+    merged = []
+    workers = max_workers or min(len(partition), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            cg: pool.submit(_group_worker, mode, texts, cg, owned, planner_name, timeout)
+            for cg, owned in partition.items()
+        }
+        for cg, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"status": f"ERROR ({e})", "schedule": None}
+            groups[cg] = result["status"]
+            merged += result["schedule"] or []
+
+    violations = []
+    if all(status in SOLVED_STATUSES for status in groups.values()):
+        violations = exam_violations(model, merged)
+        if not violations:
+            return {"mode": mode, "planner": planner_name, "status": "SOLVED_SATISFICING",
+                    "schedule": sorted(merged, key=_day_slot_key), "stats": {"sub_problems": len(groups)},
+                    "decomposed": True, "groups": groups, "violations": []}
+
+    # Fall back to the whole problem
+    if monolithic:
+        outcome = solve(mode, planner_name, timeout=timeout)
+    else:
+        outcome = solve_problem(mode, problem, planner_name, timeout=timeout)
+    outcome["decomposed"] = False
+    outcome["groups"] = groups
+    outcome["violations"] = violations
+    return outcome
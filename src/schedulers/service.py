@@ -0,0 +1,150 @@
+"""
+Resident planner service: one long-lived worker process that imports the
+planning engines and parses the PDDL problems once, then answers every
+solve/replan request with that warm state. Only the Fast Downward search
+itself is started per request.
+"""
+import time
+import queue
+import threading
+import multiprocessing
+
+# Modes parsed when the worker starts
+WARM_MODES = ["lectures", "exams"]
+
+# Extra seconds to wait for an answer beyond the planner timeout
+ANSWER_GRACE = 10
+
+# Seconds between checks that the worker is still alive while waiting for an answer
+POLL_INTERVAL = 0.5
+
+def _serve(requests, answers, modes):
+    """Worker loop: warms up, then runs requests until it receives None."""
+    start = time.monotonic()
+    from schedulers import planner
+    from unified_planning.shortcuts import OneshotPlanner
+
+    # stop() terminates a stuck worker: its Fast Downward subprocess must go with it
+    planner.stop_engines_on_sigterm()
+    for mode in modes:
+        planner.load_problem(mode)
+    # Loads the engine plugins (the first factory call imports them)
+    with OneshotPlanner(name="fast-downward"):
+        answers.put((0, "ready", time.monotonic() - start))
+
+    handlers = {
+        "solve": planner.solve,
+        "replan": planner.replan,
+    }
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, kind, args = request
+        try:
+            answers.put((request_id, "ok", handlers[kind](*args)))
+        except Exception as e:
+            answers.put((request_id, "error", str(e)))
+
+class PlannerService:
+    """Handle of the resident planner process. Requests are answered one at a time."""
+    def __init__(self, modes=None):
+        self.modes = list(modes or WARM_MODES)
+        self.warmup_time = None
+        self._process = None
+        self._requests = None
+        self._answers = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Starts the worker (does nothing if it is already running)."""
+        if self.is_running():
+            return
+        # A worker that died (rather than being stopped) leaves the state of its run behind
+        self.warmup_time = None
+        self._next_id = 1
+        self._requests = multiprocessing.Queue()
+        self._answers = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self._requests, self._answers, self.modes), daemon=True
+        )
+        self._process.start()
+
+    def _get(self, timeout=None):
+        """
+        Next answer of the worker. Raises queue.Empty after timeout seconds (None: no
+        limit) and RuntimeError as soon as the worker is found dead.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - time.monotonic())
+            try:
+                return self._answers.get(timeout=max(wait, 0))
+            except queue.Empty:
+                if self._process.is_alive() and (deadline is None or time.monotonic() < deadline):
+                    continue
+            if not self._process.is_alive():
+                # It may have answered just before exiting
+                try:
+                    return self._answers.get_nowait()
+                except queue.Empty:
+                    exitcode = self._process.exitcode
+                    self.stop()
+                    raise RuntimeError(f"Planner service stopped unexpectedly (exit code {exitcode}).")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise queue.Empty
+
+    def wait_ready(self, timeout=None):
+        """Blocks until the worker finished warming up. Returns the warm-up time in seconds."""
+        self.start()
+        if self.warmup_time is None:
+            try:
+                _, _, self.warmup_time = self._get(timeout)
+            except queue.Empty:
+                raise RuntimeError(f"Planner service did not warm up within {timeout:g}s.")
+        return self.warmup_time
+
+    def _call(self, kind, args, timeout=None):
+        with self._lock:
+            self.wait_ready()
+            request_id = self._next_id
+            self._next_id += 1
+            self._requests.put((request_id, kind, args))
+
+            wait = None if timeout is None else timeout + ANSWER_GRACE
+            try:
+                answer_id, status, payload = self._get(wait)
+            except queue.Empty:
+                # The worker is stuck: a fresh one answers the next request
+                self.stop()
+                raise RuntimeError(f"Planner service did not answer within {wait:g}s.")
+            if answer_id != request_id:
+                self.stop()
+                raise RuntimeError("Planner service answered another request.")
+            if status == "error":
+                raise RuntimeError(payload)
+            return payload
+
+    def solve(self, mode, planner_name="fast-downward", params=None, timeout=None):
+        """Same as planner.solve(), run in the warm worker."""
+        return self._call("solve", (mode, planner_name, params, timeout), timeout)
+
+    def replan(self, mode, schedule, broken_rooms, planner_name="fast-downward", timeout=None):
+        """Same as planner.replan(), run in the warm worker."""
+        return self._call("replan", (mode, schedule, broken_rooms, planner_name, timeout), timeout)
+
+    def stop(self):
+        """Stops the worker process (called on exit)."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(5)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._process = None
+        self.warmup_time = None
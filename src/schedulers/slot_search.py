@@ -0,0 +1,59 @@
+"""
+Parallel free-slot search over a Snapshot, for long date ranges (a semester).
+
+The weekdays of the range are cut into shards of consecutive days and searched
+by worker processes. Each worker receives the snapshot once, when it starts,
+and never touches the ontology. Shards come back sorted and in date order, so
+merging them is a concatenation. The hypothesis search (every other start
+hour) only runs, sharded the same way, when the requested hour is full on
+every day.
+
+DEI_SEARCH_WORKERS sets the number of processes (default: one per core).
+"""
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from ontology.snapshot import weekdays, suggestion_hours
+
+# Shorter ranges are searched in this process: starting workers costs more
+PARALLEL_MIN_DAYS = 20
+
+# Shards per worker, so that a slow shard does not leave the others idle
+SHARDS_PER_WORKER = 4
+
+_snapshot = None
+
+def default_workers():
+    return int(os.environ.get("DEI_SEARCH_WORKERS") or os.cpu_count() or 1)
+
+def _start_worker(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+def _search_shard(days, hours, capacity, num_hours, needs_proj, suggestion):
+    return _snapshot.slots_on(days, hours, capacity, num_hours, needs_proj, suggestion)
+
+def shards(days, count):
+    """Splits the days into at most `count` runs of consecutive days."""
+    size = max(1, -(-len(days) // count))
+    return [days[i:i + size] for i in range(0, len(days), size)]
+
+def available_slots(snapshot, capacity, start_date, end_date, start_hour, num_hours, needs_proj, workers=None):
+    """Same slots, in the same order, as Snapshot.available_slots."""
+    workers = workers or default_workers()
+    days = weekdays(start_date, end_date)
+    if workers < 2 or len(days) < PARALLEL_MIN_DAYS:
+        return snapshot.available_slots(capacity, start_date, end_date, start_hour, num_hours, needs_proj)
+
+    parts = shards(days, workers * SHARDS_PER_WORKER)
+    with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(snapshot,)) as pool:
+        def search(hours, suggestion):
+            task = partial(_search_shard, hours=hours, capacity=capacity, num_hours=num_hours,
+                           needs_proj=needs_proj, suggestion=suggestion)
+            found = pool.map(task, parts)
+            return [slot for shard in found for slot in shard]
+
+        slots = search([start_hour], False)
+        if not slots:
+            slots = search(suggestion_hours(start_hour), True)
+    return slots
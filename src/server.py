@@ -0,0 +1,397 @@
+"""
+Local HTTP booking service, so the secretariat and teachers can book at the same time.
+
+Reads are answered by the request threads from the current Snapshot
+(ontology/snapshot.py): concurrently, without locks, always from one
+consistent version. Every write (and every read that needs the live ontology)
+goes to a single committer thread, the only one touching the owlready2 world.
+Writes are optimistic: the client chose its slot from a snapshot, and the
+committer checks it again against the latest committed state; a slot taken in
+the meantime is answered with 409 Conflict. Queued writes are applied together
+with one save(), then the next snapshot is published.
+
+Run from src/:  python server.py [--host 127.0.0.1] [--port 8080]
+
+GET  /health
+GET  /rooms
+GET  /slots?capacity=30&date=2026-11-02&hour=9&hours=2[&end_date=...][&projector=y]
+GET  /rooms/<room>/schedule?date=2026-11-02
+GET  /overbooked
+GET  /reports/<overbooked|teachers|students|maintenance>[?max_age=seconds]
+GET  /maintenance/slots?room=<room>
+POST /bookings              {"teacher", "start", "hours" | "end", "capacity" | "course", ["room"], ["projector"]}
+POST /bookings/cancel       {"teacher", "room", "start", "end"}
+POST /maintenance/broken    {"room"}
+POST /maintenance/bookings  {"room", "start", "end"}
+POST /maintenance/fixed     {"room"}
+Times are ISO 8601 (2026-11-02T09:00). Answers are JSON, with the snapshot "version".
+
+Reports read a replica (reports.ReportReplica) that follows the committed
+snapshots with a bounded staleness (--staleness), and can be computed in
+worker processes (--report-workers) so long reports never slow the service.
+"""
+import re
+import sys
+import json
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+from datetime import datetime, date, timedelta
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from ontology.snapshot import Snapshot, booking_record, room_record
+from reports import ReportReplica, REPORTS, STALENESS
+
+# Writes applied together before one save()
+BATCH_SIZE = 50
+
+# Seconds a request waits for the committer
+ANSWER_TIMEOUT = 60
+
+class Conflict(Exception):
+    """The slot was taken after the client read it (HTTP 409)."""
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+def _flag(value):
+    return value in (True, "y", "yes", "true", "1", 1)
+
+def _time(value):
+    return datetime.fromisoformat(value)
+
+class Committer:
+    """Single writer: owns the ontology, applies writes in order and publishes snapshots."""
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.jobs = queue.Queue()
+        self.snapshot = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="committer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+
+    def submit(self, kind, payload, timeout=ANSWER_TIMEOUT):
+        """Queues an operation and waits for its result (exceptions are raised here)."""
+        future = Future()
+        self.jobs.put((kind, payload, future))
+        return future.result(timeout)
+
+    def stop(self):
+        self.jobs.put(None)
+        self._thread.join(ANSWER_TIMEOUT)
+
+    def _run(self):
+        # The world is loaded and only ever used in this thread
+        from ontology import dei_department
+        from agents.agent_room_booking import BookingAgent
+        from agents.agent_room_maintenance import MaintenanceAgent
+
+        self.dei = dei_department
+        self.onto = dei_department.onto
+        self.agent = BookingAgent(self.onto)
+        self.maintenance = MaintenanceAgent(self.onto)
+        self.snapshot = Snapshot.from_ontology(self.onto)
+        self._ready.set()
+
+        handlers = {
+            "book": self._book,
+            "cancel": self._cancel,
+            "broken": self._broken,
+            "maintenance_booking": self._maintenance_booking,
+            "fixed": self._fixed,
+            "maintenance_slots": self._maintenance_slots,
+        }
+        running = True
+        while running:
+            batch = [self.jobs.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            work = self.snapshot
+            answers = []
+            changed = False
+            for job in batch:
+                if job is None:
+                    running = False
+                    continue
+                kind, payload, future = job
+                try:
+                    result, change = handlers[kind](payload, work)
+                except Exception as e:
+                    answers.append((future, None, e))
+                    continue
+                if change == "all":
+                    work = Snapshot.from_ontology(self.onto, work.version + 1)
+                elif change:
+                    work = work.with_changes(**change)
+                changed = changed or bool(change)
+                answers.append((future, result, None))
+
+            # Answers only leave once the batch is on disk
+            if changed:
+                self.dei.save()
+                self.snapshot = work
+            for future, result, error in answers:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(dict(result, version=work.version))
+
+    # Operations (committer thread only). Each returns (result, change):
+    # change is None, "all" (rebuild the snapshot) or with_changes() arguments.
+
+    def _room(self, name):
+        room = self.agent.get_room(name)
+        if not room:
+            raise LookupError(f"Room '{name}' does not exist.")
+        return room
+
+    def _book(self, p, work):
+        prof = self.onto.search_one(type=self.onto.Teacher, has_id=int(p["teacher"]))
+        if not prof:
+            raise PermissionError("Only registered Teachers/Professors can book.")
+        course = None
+        if p.get("course"):
+            course = self.onto.search_one(type=self.onto.Course, has_name=p["course"].upper())
+            if not course:
+                raise LookupError("Course not found.")
+            capacity, needs_proj = course.required_capacity, True
+        else:
+            capacity, needs_proj = int(p["capacity"]), _flag(p.get("projector", False))
+
+        start = _time(p["start"])
+        end = _time(p["end"]) if p.get("end") else start + timedelta(hours=int(p["hours"]))
+        if start.date() <= date.today():
+            raise ValueError("Bookings must be made at least one day in advance.")
+        is_valid, msg = self.agent.validate_time_slots(start, end)
+        if not is_valid:
+            raise ValueError(msg)
+
+        if p.get("room"):
+            record = work.rooms.get(p["room"])
+            if not record:
+                raise LookupError(f"Room '{p['room']}' does not exist.")
+            if record["capacity"] < capacity or (needs_proj and not record["working_projector"]):
+                raise ValueError(f"Room '{p['room']}' does not fit this booking.")
+            if work.is_busy(record["name"], start, end):
+                raise Conflict(f"{record['name']} was booked in the meantime.")
+        else:
+            free = work.available_rooms(capacity, start, end, needs_proj)
+            if not free:
+                raise Conflict("No room is free for this slot any more.")
+            record = free[0]
+
+        b_type = "Course" if course else "Meeting"
+        booking = self.agent._build_booking(prof, self._room(record["name"]), start, end, b_type, capacity, needs_proj, course)
+        created = booking_record(booking)
+        return {"booking": created}, {"added": [created]}
+
+    def _cancel(self, p, work):
+        room = self._room(p["room"])
+        start, end = _time(p["start"]), _time(p["end"])
+        if start.date() <= date.today():
+            raise ValueError("Cancelling Bookings must be made at least one day in advance.")
+        teacher = int(p["teacher"])
+        ids = [b["id"] for b in work.bookings(room.has_name)
+               if b["start"] == start and b["end"] == end and b["teacher"] == teacher]
+        deleted, msg = self.agent._remove_booking(room, start.isoformat(timespec='milliseconds'),
+                                                  end.isoformat(timespec='milliseconds'), teacher)
+        if not deleted:
+            raise LookupError(msg)
+        return {"message": msg}, {"removed": [(room.has_name, i) for i in ids]}
+
+    def _broken(self, p, work):
+        room = self._room(p["room"])
+        if not room.has_equipment:
+            raise ValueError("This Room has no Equipment.")
+        for eq in room.has_equipment:
+            eq.is_broken = True
+        # The reasoner marks the bookings that lose their projector
+        self.dei.save()
+        relocated = self.maintenance.auto_relocate_affected(room)
+        return {"relocated": [booking_record(b) for b in relocated]}, "all"
+
+    def _maintenance_booking(self, p, work):
+        room = self._room(p["room"])
+        start, end = _time(p["start"]), _time(p["end"])
+        if start.date() <= date.today() or start.weekday() >= 5:
+            raise ValueError("Maintenance must be booked on a future weekday.")
+        if work.is_busy(room.has_name, start, end):
+            raise Conflict(f"{room.has_name} was booked in the meantime.")
+        created = booking_record(self.maintenance.create_maintenance_booking(room, start, end))
+        return {"booking": created}, {"added": [created]}
+
+    def _fixed(self, p, work):
+        room = self._room(p["room"])
+        broken_eq = [eq for eq in room.has_equipment if eq.is_broken]
+        if not broken_eq:
+            raise ValueError(f"Room '{room.has_name}' has no reported broken equipment.")
+        maintenance_bookings = [b for b in self.onto.search(type=self.onto.RoomBooking, booked_in_room=room)
+                                if isinstance(b.for_activity, self.onto.MaintenanceActivity)]
+        if not maintenance_bookings:
+            raise ValueError(f"No maintenance booking found for Room '{room.has_name}'. "
+                             "Repair cannot be finalized without a record.")
+        for eq in broken_eq:
+            eq.is_broken = False
+        if self.onto.BrokenRoom in room.is_a:
+            room.is_a.remove(self.onto.BrokenRoom)
+        for b in maintenance_bookings:
+            self.dei.destroy_entity(b)
+        return {"room": room_record(room)}, "all"
+
+    def _maintenance_slots(self, p, work):
+        slots = self.maintenance.get_maintenance_slots(self._room(p["room"]))
+        return {"slots": [{"start": s["start"], "end": s["end"]} for s in slots]}, None
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "DEIRoomService/1.0"
+
+    def _reply(self, status, body):
+        data = json.dumps(body, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, routes, body=None):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        for pattern, handler in routes:
+            match = re.fullmatch(pattern, url.path)
+            if match:
+                break
+        else:
+            return self._reply(404, {"error": f"Unknown path {url.path}"})
+
+        try:
+            args = [unquote(g) for g in match.groups()]
+            self._reply(200, handler(self.server.committer, query if body is None else body, *args))
+        except Conflict as e:
+            self._reply(409, {"error": str(e), "version": self.server.committer.snapshot.version})
+        except PermissionError as e:
+            self._reply(403, {"error": str(e)})
+        except KeyError as e:
+            # A field missing from the body or the query (KeyError is also a LookupError)
+            self._reply(400, {"error": f"Missing field '{e.args[0]}'"})
+        except LookupError as e:
+            self._reply(404, {"error": str(e)})
+        except (ValueError, TypeError) as e:
+            self._reply(400, {"error": f"Invalid request: {e}"})
+        except TimeoutError:
+            self._reply(503, {"error": "The service is busy, try again."})
+
+    def do_GET(self):
+        self._handle(GET_ROUTES)
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "The body must be a JSON object."})
+        self._handle(POST_ROUTES, body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+# Reads served from the snapshot by the request threads
+
+def get_health(committer, q):
+    snap = committer.snapshot
+    return {"version": snap.version, "since": snap.created, "rooms": len(snap.rooms),
+            "bookings": sum(len(items) for items in snap.by_room.values()), "queued": committer.jobs.qsize()}
+
+def get_rooms(committer, q):
+    snap = committer.snapshot
+    return {"version": snap.version, "rooms": sorted(snap.rooms.values(), key=lambda r: r["name"])}
+
+def get_slots(committer, q):
+    snap = committer.snapshot
+    start_date = date.fromisoformat(q["date"])
+    end_date = date.fromisoformat(q["end_date"]) if q.get("end_date") else start_date
+    if end_date < start_date:
+        raise ValueError("end_date must be equal or greater then date")
+    slots = snap.available_slots(int(q["capacity"]), start_date, end_date, int(q.get("hour", 9)),
+                                 int(q.get("hours", 1)), _flag(q.get("projector")))
+    return {"version": snap.version, "slots": slots}
+
+def get_schedule(committer, q, room):
+    snap = committer.snapshot
+    if room not in snap.rooms:
+        raise LookupError(f"Room '{room}' does not exist.")
+    return {"version": snap.version, "room": snap.rooms[room],
+            "bookings": snap.room_schedule(room, date.fromisoformat(q["date"]))}
+
+def get_overbooked(committer, q):
+    return get_report(committer, q, "overbooked")
+
+def get_report(committer, q, name):
+    if name not in REPORTS:
+        raise LookupError(f"Unknown report '{name}'.")
+    max_age = float(q["max_age"]) if q.get("max_age") else None
+    result, snap = committer.replica.run(name, max_age)
+    return {"version": snap.version, "age": round(snap.age(), 3), name: result}
+
+GET_ROUTES = [
+    (r"/health", get_health),
+    (r"/rooms", get_rooms),
+    (r"/slots", get_slots),
+    (r"/rooms/([^/]+)/schedule", get_schedule),
+    (r"/overbooked", get_overbooked),
+    (r"/reports/([^/]+)", get_report),
+    (r"/maintenance/slots", lambda c, q: c.submit("maintenance_slots", q)),
+]
+
+POST_ROUTES = [
+    (r"/bookings", lambda c, body: c.submit("book", body)),
+    (r"/bookings/cancel", lambda c, body: c.submit("cancel", body)),
+    (r"/maintenance/broken", lambda c, body: c.submit("broken", body)),
+    (r"/maintenance/bookings", lambda c, body: c.submit("maintenance_booking", body)),
+    (r"/maintenance/fixed", lambda c, body: c.submit("fixed", body)),
+]
+
+def make_server(host="127.0.0.1", port=8080, batch_size=BATCH_SIZE, verbose=False,
+                staleness=STALENESS, report_workers=0):
+    """Loads the ontology in the committer and binds the HTTP server (not serving yet)."""
+    committer = Committer(batch_size)
+    committer.start()
+    committer.replica = ReportReplica(lambda: committer.snapshot, staleness, report_workers)
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.committer = committer
+    server.verbose = verbose
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DEI Room Management System - booking service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="writes saved together")
+    parser.add_argument("--staleness", type=float, default=STALENESS, help="seconds reports may lag behind")
+    parser.add_argument("--report-workers", type=int, default=0, help="processes for reports (0: in the request thread)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.batch_size, args.verbose, args.staleness, args.report_workers)
+    print(f"[Service] Serving on http://{args.host}:{server.server_port} (snapshot version {server.committer.snapshot.version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.committer.stop()
+        server.committer.replica.close()
+        print("[Service] Stopped.")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
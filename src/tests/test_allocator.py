@@ -0,0 +1,56 @@
+"""
+Batch allocator against brute force on small random instances.
+
+Run from src/:  python -m pytest tests
+"""
+import random
+import itertools
+from datetime import date, datetime
+from schedulers import allocator
+
+DAY = date(2026, 11, 2)
+
+def instance(seed):
+    """A few rooms (some partly booked) and requests whose windows and durations overlap."""
+    rng = random.Random(seed)
+    rooms = [{"name": f"R{i}", "capacity": rng.choice([20, 30, 40, 60, 80]), "projector": rng.random() < 0.7}
+             for i in range(rng.randint(1, 3))]
+    busy = {}
+    for r in rooms:
+        if rng.random() < 0.4:
+            hour = rng.choice([9, 10, 14])
+            busy[r["name"]] = [(datetime(2026, 11, 2, hour), datetime(2026, 11, 2, hour + 1))]
+    requests = []
+    for _ in range(rng.randint(2, 4)):
+        hour = rng.choice([9, 10, 11, 14])
+        requests.append({"capacity": rng.choice([10, 15, 25, 35, 50, 70]), "projector": rng.random() < 0.3,
+                         "date": DAY, "end_date": DAY, "hour": hour, "to_hour": hour + rng.randint(0, 2),
+                         "hours": rng.randint(1, 2)})
+    return requests, rooms, busy
+
+def brute_force(requests, rooms, busy):
+    """Best (satisfied, waste) over every combination of placements."""
+    engine = allocator.BatchAllocator(requests, rooms, busy)
+    best = (0, 0)
+    for choice in itertools.product(*[[None] + cands for cands in engine.cands]):
+        assignment = {i: cand for i, cand in enumerate(choice) if cand}
+        if not engine.overlapping(assignment):
+            best = max(best, (len(assignment), -sum(cand[0] for cand in assignment.values())))
+    return best[0], -best[1]
+
+def test_allocate_matches_brute_force():
+    for seed in range(1000):
+        requests, rooms, busy = instance(seed)
+        result = allocator.allocate(requests, rooms, busy, timeout=None)
+        assert result["optimal"]
+        assert (len(result["assigned"]), result["waste"]) == brute_force(requests, rooms, busy), f"seed {seed}"
+
+def test_allocate_never_overlaps():
+    for seed in range(200):
+        requests, rooms, busy = instance(seed)
+        result = allocator.allocate(requests, rooms, busy, timeout=None)
+        cells = set(allocator.busy_cells(busy))
+        for room, start, end in result["assigned"].values():
+            block = allocator.busy_cells({room: [(start, end)]})
+            assert not block & cells
+            cells |= block